@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: join save latency during a MongoDB outage, with and without the breaker.
+
+Swaps the Emails collection for a stand-in that either hangs until server
+selection times out and then raises (``--mode unavailable``, like Atlas
+going away after startup) or answers very slowly (``--mode slow``), then
+drives concurrent saves through server.save_dual_storage_batch. Without a
+breaker every save waits out the full timeout before falling back to
+JSON; with it, the first few calls time out quickly, the breaker opens and
+the rest go straight to the JSON backup. Run from the backend directory:
+
+    python bench_circuit_breaker.py [--requests 200] [--concurrency 20] [--selection-timeout 2]
+
+The selection timeout is scaled down from the real 10s to keep runs short.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+
+from pymongo.errors import ServerSelectionTimeoutError
+
+import server
+from circuit_breaker import CircuitBreaker
+from waitlist_journal import WaitlistJournal
+
+
+class OutageCollection:
+    """Emails collection stand-in for an unreachable or overloaded cluster"""
+
+    def __init__(self, mode: str, delay: float):
+        self.mode = mode
+        self.delay = delay
+
+    async def _respond(self, result=None):
+        await asyncio.sleep(self.delay)
+        if self.mode == "unavailable":
+            raise ServerSelectionTimeoutError("stand-in: No servers available")
+        return result
+
+    async def bulk_write(self, operations, ordered=True):
+        return await self._respond(SimpleNamespace(upserted_ids={i: i for i in range(len(operations))}))
+
+    async def update_one(self, *args, **kwargs):
+        return await self._respond(SimpleNamespace(upserted_id=1))
+
+    async def estimated_document_count(self):
+        return await self._respond(0)
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_scenario(label: str, breaker: CircuitBreaker, args) -> None:
+    server.mongo_breaker = breaker
+    latencies = []
+    fell_back = 0
+    queue = asyncio.Queue()
+    for i in range(args.requests):
+        queue.put_nowait({"name": f"User {i}", "email": f"{label}{i}@example.com",
+                          "timestamp": "2026-03-01T00:00:00"})
+
+    async def client():
+        nonlocal fell_back
+        while not queue.empty():
+            entry = queue.get_nowait()
+            start = time.perf_counter()
+            (_, mongo_ok, json_ok, _), = await server.save_dual_storage_batch([entry])
+            latencies.append((time.perf_counter() - start) * 1000)
+            fell_back += int(json_ok and not mongo_ok)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:>12} {statistics.median(latencies):>9.1f} {percentile(latencies, 95):>9.1f} "
+          f"{percentile(latencies, 99):>9.1f} {max(latencies):>9.1f} {args.requests / elapsed:>9.1f} "
+          f"{fell_back:>6}/{args.requests}  {breaker.snapshot()['state']}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--mode", choices=["unavailable", "slow"], default="unavailable")
+    parser.add_argument("--selection-timeout", type=float, default=2.0,
+                        help="seconds the stand-in hangs per call (real Atlas: 10)")
+    parser.add_argument("--call-timeout", type=float, default=0.25, help="breaker per-call timeout")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_breaker_")
+    server.waitlist_journal = WaitlistJournal(os.path.join(workdir, "waitlist.json"),
+                                              os.path.join(workdir, "waitlist.jsonl"))
+    server.mongo_collection = OutageCollection(args.mode, args.selection_timeout)
+    server.rollup_collection = None
+
+    print(f"🚀 MongoDB outage benchmark ({args.mode}, {args.selection_timeout}s per call, "
+          f"{args.requests} saves x {args.concurrency} concurrent)")
+    print("=" * 84)
+    print(f"{'scenario':>12} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'saves/s':>9} "
+          f"{'JSON-only':>10}  breaker")
+
+    # Threshold too high to ever trip and no per-call timeout: the old behaviour
+    await run_scenario("no breaker", CircuitBreaker("mongodb", failure_threshold=10 ** 9), args)
+    await run_scenario("breaker", CircuitBreaker(
+        "mongodb", failure_threshold=server.MONGO_BREAKER_FAILURES, reset_timeout=60,
+        call_timeout=args.call_timeout, is_failure=server.mongo_breaker.is_failure
+    ), args)
+    print("=" * 84)
+    print("✅ With the breaker open, saves skip MongoDB and land in the JSON backup immediately")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
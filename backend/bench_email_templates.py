@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: welcome email render cost per recipient.
+
+Compares three ways of producing the welcome email body:
+  - legacy:   the old inline f-string (full inline-styled, unminified HTML)
+  - uncached: inline CSS + minify + text alternative on every send
+  - cached:   slot substitution into the pre-compiled template
+
+Run from the backend directory:
+
+    python bench_email_templates.py [--emails 20000]
+"""
+import argparse
+import html
+import time
+
+from email_templates import COMMENT_PATTERN, SLOT_PATTERN, CompiledTemplate, TemplateCache, inline_css
+
+
+def make_legacy_render(source: str):
+    """Build an f-string function equivalent to the old build_welcome_email body"""
+    # Only the {{slot}} markers contain braces once the <style> block is inlined
+    legacy_html = SLOT_PATTERN.sub(r"{\1}", inline_css(COMMENT_PATTERN.sub("", source)))
+    namespace = {}
+    exec(f"def render(name, unsubscribe_url):\n    return f'''{legacy_html}'''\n", namespace)
+    return namespace["render"]
+
+
+def time_renders(fn, emails: int) -> float:
+    start = time.perf_counter()
+    for i in range(emails):
+        fn(f"User {i}", f"mailto:info@recalibratepain.com?subject=Unsubscribe%20user{i}%40example.com")
+    return (time.perf_counter() - start) / emails * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--emails", type=int, default=20_000, help="renders per approach")
+    args = parser.parse_args()
+
+    cache = TemplateCache()
+    template = cache.get("welcome_email")
+    with open(cache._path("welcome_email"), "r", encoding="utf-8") as f:
+        source = f.read()
+
+    legacy_render = make_legacy_render(source)
+
+    def legacy(name, unsubscribe_url):
+        return legacy_render(html.escape(name), unsubscribe_url)
+
+    def uncached(name, unsubscribe_url):
+        return CompiledTemplate("welcome_email", source).render(name=name, unsubscribe_url=unsubscribe_url)
+
+    def cached(name, unsubscribe_url):
+        return cache.render("welcome_email", name=name, unsubscribe_url=unsubscribe_url)
+
+    sample = cached("Alex", "mailto:info@recalibratepain.com")
+    legacy_bytes = len(legacy("Alex", "mailto:info@recalibratepain.com").encode("utf-8"))
+    cached_bytes = len(sample["html"].encode("utf-8"))
+
+    print("🚀 Welcome email render benchmark")
+    print("=" * 60)
+    print(f"📄 Template version {template.version}, slots: {', '.join(template.slots)}")
+    print(f"{'approach':>10} {'µs/email':>12} {'emails/sec':>14}")
+    results = {}
+    for label, fn, count in (
+        ("legacy", legacy, args.emails),
+        ("uncached", uncached, max(1, args.emails // 20)),
+        ("cached", cached, args.emails),
+    ):
+        results[label] = time_renders(fn, count)
+        print(f"{label:>10} {results[label]:>12.2f} {1e6 / results[label]:>14,.0f}")
+
+    print("=" * 60)
+    print(f"📦 HTML payload: legacy {legacy_bytes:,} bytes -> minified {cached_bytes:,} bytes "
+          f"({100 * (1 - cached_bytes / legacy_bytes):.0f}% smaller)")
+    print(f"📝 Plain-text alternative: {len(sample['text'].encode('utf-8')):,} bytes")
+    print(f"✅ Cached render is {results['uncached'] / results['cached']:.0f}x cheaper than rendering per send "
+          f"and stays within {results['cached'] - results['legacy']:.1f} µs of the legacy f-string "
+          f"(which has no text part)")
+
+
+if __name__ == "__main__":
+    main()
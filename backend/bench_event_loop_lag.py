@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Event-loop lag test: other requests while a 100k-entry JSON backup is rewritten.
+
+A small ASGI app with a cheap endpoint (an in-memory count, like
+/api/waitlist/count) is polled every --interval-ms while the backup is
+rewritten and reloaded --rounds times. "inline" does the file work on the
+event loop, as the old handlers did; "executor" hands it to FileIOExecutor.
+Reported: latency of the polled requests and the event loop's scheduling
+lag. Run from the backend directory:
+
+    python bench_event_loop_lag.py [--entries 100000] [--rounds 3] [--interval-ms 10]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import httpx
+from fastapi import FastAPI
+
+from file_storage import FileIOExecutor
+from waitlist_journal import WaitlistJournal
+
+START = datetime(2025, 6, 29)
+
+
+def make_entries(n: int) -> list:
+    return [{"name": f"User {i}", "email": f"user{i}@example.com",
+             "timestamp": (START + timedelta(seconds=i)).isoformat()} for i in range(n)]
+
+
+def make_app(count: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/waitlist/count")
+    async def waitlist_count():
+        return {"count": count}
+
+    return app
+
+
+async def poll(client: httpx.AsyncClient, interval: float, stop: asyncio.Event, latencies: list, lags: list):
+    """One request per interval; latency runs from when the request was due (its arrival),
+    lag is how late the loop got round to it"""
+    next_tick = time.perf_counter()
+    while not stop.is_set():
+        next_tick += interval
+        await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+        lags.append(max(0.0, time.perf_counter() - next_tick))
+        response = await client.get("/api/waitlist/count")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - next_tick)
+        # Requests that arrived while the loop was blocked were queued, not dropped
+        while next_tick + interval < time.perf_counter() and not stop.is_set():
+            next_tick += interval
+            lags.append(time.perf_counter() - next_tick)
+            response = await client.get("/api/waitlist/count")
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - next_tick)
+
+
+async def run(mode: str, journal: WaitlistJournal, entries: list, args) -> None:
+    io = FileIOExecutor(max_workers=2, max_queue=16) if mode == "executor" else None
+    app = make_app(len(entries))
+    latencies, lags = [], []
+    stop = asyncio.Event()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://localhost") as client:
+        # Warm up the client and app before measuring
+        await client.get("/api/waitlist/count")
+        poller = asyncio.create_task(poll(client, args.interval_ms / 1000, stop, latencies, lags))
+        await asyncio.sleep(0.1)
+
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            if io is None:
+                journal.rewrite(entries)
+                loaded = journal.load()
+            else:
+                await io.run(journal.rewrite, entries)
+                loaded = await io.run(journal.load)
+            assert len(loaded) == len(entries)
+            await asyncio.sleep(0)
+        work_seconds = time.perf_counter() - started
+
+        await asyncio.sleep(0.1)
+        stop.set()
+        await poller
+    if io is not None:
+        io.shutdown()
+
+    def pct(samples: list, q: int) -> float:
+        return statistics.quantiles(samples, n=100)[q - 1] * 1000 if len(samples) > 1 else samples[0] * 1000
+
+    print(f"{mode:>9} {work_seconds * 1000:>9,.0f} {len(latencies):>8} {pct(latencies, 50):>8.2f} "
+          f"{pct(latencies, 99):>8.2f} {max(latencies) * 1000:>9.1f} {pct(lags, 99):>9.2f} {max(lags) * 1000:>9.1f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=3, help="rewrite + reload cycles")
+    parser.add_argument("--interval-ms", type=float, default=10, help="gap between polled requests")
+    args = parser.parse_args()
+
+    entries = make_entries(args.entries)
+    print(f"🚀 Event-loop lag while rewriting a {args.entries:,}-entry backup ({args.rounds} rewrite+load rounds)")
+    print("=" * 80)
+    print(f"{'mode':>9} {'work ms':>9} {'requests':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>9} "
+          f"{'lag p99':>9} {'lag max':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = WaitlistJournal(os.path.join(tmp, "waitlist.json"), os.path.join(tmp, "waitlist.jsonl"))
+        for mode in ("inline", "executor"):
+            await run(mode, journal, entries, args)
+    print("=" * 80)
+    print("✅ On the I/O executor, other requests keep being served while the backup is rewritten")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
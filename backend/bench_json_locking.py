@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Stress test: JSON backups written by several worker processes at once.
+
+Each process plays a gunicorn worker: it appends signups to the waitlist
+journal (compacting it every few writes, as the background compaction does)
+and records a partner inquiry in partners.json per signup. Afterwards the
+files are checked for lost and corrupted entries, and throughput is
+reported. The "legacy" writers are the pre-locking code paths (unlocked
+journal compaction, partners.json opened with 'w'); "locked" goes through
+file_storage. Run from the backend directory:
+
+    python bench_json_locking.py [--workers 1 4 8] [--writes 200] [--compact-every 25]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from file_storage import update_json
+from waitlist_journal import WaitlistJournal
+
+
+def make_entry(worker_id: int, i: int) -> dict:
+    return {"name": f"User {worker_id}-{i}", "email": f"w{worker_id}-{i}@example.com",
+            "timestamp": "2026-03-01T00:00:00"}
+
+
+def legacy_append(journal: WaitlistJournal, entry: dict):
+    with open(journal.journal_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def legacy_compact(journal: WaitlistJournal):
+    """Old compaction: load, rewrite through a fixed temp name, truncate - no lock"""
+    entries = journal.load_snapshot() + journal.load_journal()
+    tmp_path = f"{journal.snapshot_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, indent=2)
+    os.replace(tmp_path, journal.snapshot_path)
+    open(journal.journal_path, 'w').close()
+
+
+def legacy_partner_write(path: str, entry: dict):
+    """Mirror of the old partner_contact file write"""
+    partners = []
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                partners = json.load(f)
+        except Exception:
+            partners = []
+    partners.append(entry)
+    with open(path, 'w') as f:
+        json.dump(partners, f, indent=2)
+
+
+def worker(mode: str, directory: str, worker_id: int, writes: int, compact_every: int, start, errors):
+    journal = WaitlistJournal(os.path.join(directory, "waitlist.json"), os.path.join(directory, "waitlist.jsonl"))
+    partners_path = os.path.join(directory, "partners.json")
+    start.wait()
+    for i in range(writes):
+        entry = make_entry(worker_id, i)
+        try:
+            if mode == "locked":
+                journal.append(entry)
+                update_json(partners_path, lambda partners: (partners or []) + [entry], default=[])
+                if (i + 1) % compact_every == 0:
+                    journal.compact()
+            else:
+                legacy_append(journal, entry)
+                legacy_partner_write(partners_path, entry)
+                if (i + 1) % compact_every == 0:
+                    legacy_compact(journal)
+        except Exception:
+            errors.value += 1
+
+
+def verify(directory: str, expected: set) -> dict:
+    journal = WaitlistJournal(os.path.join(directory, "waitlist.json"), os.path.join(directory, "waitlist.jsonl"))
+    try:
+        waitlist = {entry["email"] for entry in journal.load()}
+        waitlist_corrupt = False
+    except json.JSONDecodeError:
+        waitlist, waitlist_corrupt = set(), True
+    try:
+        with open(os.path.join(directory, "partners.json"), 'r') as f:
+            partners = {entry["email"] for entry in json.load(f)}
+        partners_corrupt = False
+    except (json.JSONDecodeError, FileNotFoundError):
+        partners, partners_corrupt = set(), True
+    return {
+        "waitlist_lost": len(expected - waitlist),
+        "partners_lost": len(expected - partners),
+        "corrupt": waitlist_corrupt or partners_corrupt,
+    }
+
+
+def run(mode: str, workers: int, args) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        start = multiprocessing.Event()
+        errors = multiprocessing.Value("i", 0)
+        processes = [multiprocessing.Process(target=worker, args=(mode, directory, worker_id, args.writes,
+                                                                  args.compact_every, start, errors))
+                     for worker_id in range(workers)]
+        for process in processes:
+            process.start()
+        started = time.perf_counter()
+        start.set()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+        expected = {make_entry(worker_id, i)["email"] for worker_id in range(workers) for i in range(args.writes)}
+        result = verify(directory, expected)
+        ok = not result["corrupt"] and result["waitlist_lost"] == 0 and result["partners_lost"] == 0 \
+            and errors.value == 0
+        print(f"{mode:>7} {workers:>8} {len(expected) / elapsed:>10,.0f} {result['waitlist_lost']:>14} "
+              f"{result['partners_lost']:>14} {errors.value:>7} {'yes' if result['corrupt'] else 'no':>8}  "
+              f"{'✅' if ok else '❌'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--writes", type=int, default=200, help="signups per worker")
+    parser.add_argument("--compact-every", type=int, default=25, help="journal compaction every N writes")
+    parser.add_argument("--modes", nargs="+", choices=["legacy", "locked"], default=["legacy", "locked"])
+    args = parser.parse_args()
+
+    print(f"🚀 Multi-process JSON storage stress test ({args.writes} signups per worker)")
+    print("=" * 78)
+    print(f"{'mode':>7} {'workers':>8} {'signups/s':>10} {'waitlist lost':>14} {'partners lost':>14} "
+          f"{'errors':>7} {'corrupt':>8}")
+    for mode in args.modes:
+        for workers in args.workers:
+            run(mode, workers, args)
+    print("=" * 78)
+    print("✅ Locked writers lose nothing; throughput is bounded by one writer at a time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark: MongoDB full-waitlist reads, legacy loop vs projected vs raw BSON.
+
+"legacy" mirrors the old load_mongo_waitlist: find({}) with no projection,
+every document decoded into a dict, then _id popped from each one.
+"projected" is MongoBackend.iter_since() (3 fields, server-side projection),
+"raw" is the same with MONGO_RAW_READS (RawBSONDocument rows), and
+"raw+export" also decodes them for the export encoders (decode_raw_rows).
+Throughput and held memory are measured in separate passes.
+
+Without --mongo-url the driver's batch decoding is replayed offline: the
+documents are BSON-encoded into batches as a server reply would carry them
+and decoded with the same codec options the cursor uses. With --mongo-url
+(or MONGO_URL) a scratch collection is seeded and read through Motor for
+each --batch-sizes value. Run from the backend directory:
+
+    python bench_mongo_reads.py [--rows 100000] [--batch-sizes 1000 5000] [--mongo-url mongodb://...]
+"""
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List
+
+import bson
+from bson import ObjectId
+from bson.codec_options import DEFAULT_CODEC_OPTIONS
+
+from storage_backends import MONGO_PROJECTION, RAW_CODEC_OPTIONS, MongoBackend, decode_raw_rows
+from waitlist_export import project
+
+START = datetime(2025, 6, 29)
+
+
+def make_document(i: int) -> dict:
+    """A stored signup, including the fields a full find() drags along"""
+    signed_up_at = START + timedelta(seconds=i)
+    return {"_id": ObjectId(), "name": f"User {i}", "email": f"user{i}@example.com",
+            "timestamp": signed_up_at.isoformat(), "signed_up_at": signed_up_at,
+            "source": "landing_page", "ip_hash": f"{i:064x}"}
+
+
+def legacy_rows(documents: List[dict]) -> List[dict]:
+    for document in documents:
+        document.pop("_id", None)
+    return documents
+
+
+def export_fields(rows) -> int:
+    return sum(len(project(row)["email"]) for row in decode_raw_rows(rows))
+
+
+def measure(fn: Callable[[], object]) -> tuple:
+    """(seconds, MB still held by the result) - tracing would skew the timing, so two passes"""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = fn()
+    held = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    del result
+    return elapsed, held
+
+
+async def measure_async(fn: Callable[[], Awaitable]) -> tuple:
+    start = time.perf_counter()
+    await fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = await fn()
+    held = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    del result
+    return elapsed, held
+
+
+def report(label: str, batch_size: int, rows: int, elapsed: float, held_mb: float):
+    print(f"{label:>11} {batch_size:>7,} {rows / elapsed:>12,.0f} {elapsed * 1000:>10,.0f} {held_mb:>9,.1f}")
+
+
+def offline(args):
+    documents = [make_document(i) for i in range(args.rows)]
+    projected = [{field: document[field] for field in ("name", "email", "timestamp")} for document in documents]
+    for batch_size in args.batch_sizes:
+        # One reply payload per getMore, as the driver receives it
+        full_batches = [b"".join(bson.encode(d) for d in documents[i:i + batch_size])
+                        for i in range(0, len(documents), batch_size)]
+        projected_batches = [b"".join(bson.encode(d) for d in projected[i:i + batch_size])
+                             for i in range(0, len(projected), batch_size)]
+
+        def decode(batches, codec_options) -> list:
+            rows = []
+            for batch in batches:
+                rows.extend(bson.decode_all(batch, codec_options))
+            return rows
+
+        modes = [
+            ("legacy", lambda: legacy_rows(decode(full_batches, DEFAULT_CODEC_OPTIONS))),
+            ("projected", lambda: decode(projected_batches, DEFAULT_CODEC_OPTIONS)),
+            ("raw", lambda: decode(projected_batches, RAW_CODEC_OPTIONS)),
+            ("raw+export", lambda: export_fields(decode(projected_batches, RAW_CODEC_OPTIONS))),
+        ]
+        for label, fn in modes:
+            elapsed, held = measure(fn)
+            report(label, batch_size, args.rows, elapsed, held)
+
+
+async def online(args):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(args.mongo_url)
+    collection = client["ReadBenchmark"]["Emails"]
+    try:
+        await collection.drop()
+        for offset in range(0, args.rows, 10_000):
+            await collection.insert_many([make_document(i) for i in range(offset, min(offset + 10_000, args.rows))])
+        await collection.create_index([("timestamp", 1), ("email", 1)])
+        print(f"🌱 Seeded {args.rows:,} documents")
+
+        for batch_size in args.batch_sizes:
+            async def legacy() -> list:
+                return legacy_rows([document async for document in collection.find({}).batch_size(batch_size)])
+
+            async def backend_rows(raw: bool) -> list:
+                backend = MongoBackend(lambda: collection, batch_size=batch_size, raw=raw)
+                return [row async for row in backend.iter_since()]
+
+            async def raw_export() -> int:
+                return export_fields(await backend_rows(True))
+
+            for label, fn in (("legacy", legacy), ("projected", lambda: backend_rows(False)),
+                              ("raw", lambda: backend_rows(True)), ("raw+export", raw_export)):
+                elapsed, held = await measure_async(fn)
+                report(label, batch_size, args.rows, elapsed, held)
+    finally:
+        await collection.drop()
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL"))
+    args = parser.parse_args()
+
+    source = f"MongoDB at {args.mongo_url.split('@')[-1]}" if args.mongo_url else "offline batch decoding"
+    print(f"🚀 Full-waitlist read benchmark ({args.rows:,} rows, {source})")
+    print(f"   projection: {MONGO_PROJECTION}")
+    print("=" * 56)
+    print(f"{'mode':>11} {'batch':>7} {'docs/s':>12} {'total ms':>10} {'held MB':>9}")
+    if args.mongo_url:
+        asyncio.run(online(args))
+    else:
+        offline(args)
+    print("=" * 56)
+    print("✅ Projection removes the _id loop and unused fields; raw rows trade CPU for memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: email send throughput, sync SDK in threads vs pooled async client.
+
+Starts fake_resend_server.py in-process (or uses --url), then sends the
+same number of emails with N concurrent senders through:
+  - legacy: resend.Emails.send via asyncio.to_thread (a thread and a new
+    connection per send)
+  - pooled: AsyncResendClient over one keep-alive connection pool
+
+Run from the backend directory:
+
+    python bench_resend_client.py [--emails 2000] [--concurrency 50] [--latency-ms 150]
+"""
+import argparse
+import asyncio
+import socket
+import threading
+import time
+
+import resend
+import uvicorn
+
+from fake_resend_server import create_app
+from resend_client import AsyncResendClient
+
+PARAMS = {
+    "from": "Recalibrate <info@recalibratepain.com>",
+    "subject": "Benchmark",
+    "html": "<p>Hello</p>",
+}
+
+
+def start_fake_server(latency_ms: float) -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    config = uvicorn.Config(create_app(latency_ms, jitter_ms=0), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+async def run_senders(send, emails: int, concurrency: int) -> float:
+    queue = asyncio.Queue()
+    for i in range(emails):
+        queue.put_nowait({**PARAMS, "to": [f"user{i}@example.com"]})
+
+    async def sender():
+        while not queue.empty():
+            await send(queue.get_nowait())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(sender() for _ in range(concurrency)))
+    return emails / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--emails", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="fake server latency (Resend is typically 100-300ms)")
+    parser.add_argument("--url", help="use an already running fake Resend server")
+    args = parser.parse_args()
+
+    url = args.url or start_fake_server(args.latency_ms)
+    print("🚀 Resend send throughput benchmark")
+    print("=" * 60)
+    print(f"📭 Fake Resend API: {url} ({args.emails} emails, {args.concurrency} concurrent senders)")
+
+    resend.api_key = "re_benchmark"
+    resend.api_url = url
+
+    async def legacy_send(params):
+        return await asyncio.to_thread(resend.Emails.send, params)
+
+    client = AsyncResendClient("re_benchmark", base_url=url, pool_size=args.concurrency)
+    await client.start()
+    try:
+        legacy = await run_senders(legacy_send, args.emails, args.concurrency)
+        pooled = await run_senders(client.send, args.emails, args.concurrency)
+    finally:
+        await client.aclose()
+
+    print(f"{'legacy (to_thread SDK)':>26}: {legacy:>10,.0f} emails/sec")
+    print(f"{'pooled (AsyncResendClient)':>26}: {pooled:>10,.0f} emails/sec")
+    print("=" * 60)
+    print(f"✅ Pooled client is {pooled / legacy:.1f}x the legacy throughput")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: single-flight coalescing of concurrent full-waitlist reads.
+
+Simulates bursts of requests that each need the full waitlist (a MongoDB
+scan of --scan-ms) arriving within --spread-ms of each other, with and
+without SingleFlight, and reports how many scans actually ran, the
+coalescing ratio and caller latency. Run from the backend directory:
+
+    python bench_single_flight.py [--callers 1 10 100 500] [--scan-ms 200] [--spread-ms 50] [--cache-seconds 0 1]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from single_flight import SingleFlight
+
+
+class FakeCollection:
+    """Counts full scans; each one takes scan_ms"""
+
+    def __init__(self, scan_ms: float, rows: int = 10_000):
+        self.scan_seconds = scan_ms / 1000
+        self.rows = [{"email": f"user{i}@example.com"} for i in range(rows)]
+        self.scans = 0
+
+    async def load_all(self) -> list:
+        self.scans += 1
+        await asyncio.sleep(self.scan_seconds)
+        return self.rows
+
+
+async def burst(callers: int, spread_seconds: float, read) -> list:
+    """callers requests arriving uniformly over spread_seconds; returns per-caller latency in ms"""
+    async def caller(delay: float) -> float:
+        await asyncio.sleep(delay)
+        start = time.perf_counter()
+        rows = await read()
+        assert len(rows) == 10_000
+        return (time.perf_counter() - start) * 1000
+
+    return await asyncio.gather(*(caller(random.uniform(0, spread_seconds)) for _ in range(callers)))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--callers", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument("--scan-ms", type=float, default=200, help="duration of one full scan")
+    parser.add_argument("--spread-ms", type=float, default=50, help="window the burst arrives in")
+    parser.add_argument("--cache-seconds", type=float, nargs="+", default=[0, 1])
+    args = parser.parse_args()
+    random.seed(42)
+
+    print(f"🚀 Single-flight benchmark ({args.scan_ms:.0f}ms scans, bursts over {args.spread_ms:.0f}ms)")
+    print("=" * 72)
+    print(f"{'callers':>8} {'mode':>12} {'scans':>6} {'ratio':>6} {'p50 ms':>9} {'p99 ms':>9} {'wall ms':>9}")
+
+    for callers in args.callers:
+        modes = [("direct", None)] + [(f"sf ttl={ttl:g}s", ttl) for ttl in args.cache_seconds]
+        for label, ttl in modes:
+            collection = FakeCollection(args.scan_ms)
+            flight = SingleFlight(cache_ttl_seconds=ttl or 0.0)
+            read = collection.load_all if ttl is None else (lambda: flight.do("mongodb", collection.load_all))
+
+            start = time.perf_counter()
+            latencies = await burst(callers, args.spread_ms / 1000, read)
+            # A second burst right after the first, to show the cache
+            latencies += await burst(callers, args.spread_ms / 1000, read)
+            wall_ms = (time.perf_counter() - start) * 1000
+
+            ratio = flight.metrics()["coalescing_ratio"] if ttl is not None else 0.0
+            p99 = statistics.quantiles(latencies, n=100)[98] if len(latencies) > 1 else latencies[0]
+            print(f"{callers:>8} {label:>12} {collection.scans:>6} {ratio or 0:>6.2f} "
+                  f"{statistics.median(latencies):>9,.1f} {p99:>9,.1f} {wall_ms:>9,.0f}")
+
+    print("=" * 72)
+    print("✅ Coalesced callers share one scan instead of each hitting MongoDB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
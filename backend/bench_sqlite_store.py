@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SQLite fallback store vs the JSON snapshot + journal.
+
+For each waitlist size both stores are seeded with the same entries, then
+timed on the operations the API performs against its fallback: single
+signup appends, a full load (startup), the subscriber count, and an export
+page of the newest 1% of signups (a "since" range query). Run from the
+backend directory:
+
+    python bench_sqlite_store.py [--sizes 10000 100000 1000000] [--writes 500]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlite_store import SQLiteWaitlistStore
+from storage_backends import select_rows
+from waitlist_journal import WaitlistJournal
+
+START = datetime(2025, 6, 29)
+
+
+def make_entry(i: int) -> dict:
+    return {"name": f"User {i}", "email": f"user{i}@example.com",
+            "timestamp": (START + timedelta(seconds=i)).isoformat()}
+
+
+def timed(fn) -> tuple:
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--writes", type=int, default=500, help="single-entry appends per store")
+    args = parser.parse_args()
+
+    print("🚀 Fallback store benchmark: JSON snapshot + journal vs SQLite (WAL)")
+    print("=" * 92)
+    print(f"{'rows':>10} {'store':>7} {'seed ms':>10} {'appends/s':>10} {'load ms':>10} "
+          f"{'count ms':>9} {'since ms':>9} {'since rows':>11}")
+
+    for size in args.sizes:
+        entries = [make_entry(i) for i in range(size)]
+        since = make_entry(int(size * 0.99))["timestamp"]
+        new_entries = [make_entry(size + i) for i in range(args.writes)]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = WaitlistJournal(os.path.join(tmp, "waitlist.json"), os.path.join(tmp, "waitlist.jsonl"))
+            store = SQLiteWaitlistStore(os.path.join(tmp, "waitlist.sqlite3"))
+            try:
+                for label, backend, seed, query in (
+                    ("json", journal, lambda: journal.rewrite(entries),
+                     # What JSONBackend.iter_since does for an export page
+                     lambda: select_rows(journal.load(), since, None, None, "timestamp")),
+                    ("sqlite", store, lambda: store.append_many(entries),
+                     lambda: store.page(since=since)),
+                ):
+                    _, seed_ms = timed(seed)
+                    start = time.perf_counter()
+                    for entry in new_entries:
+                        backend.append(entry)
+                    append_rate = args.writes / (time.perf_counter() - start)
+                    loaded, load_ms = timed(backend.load)
+                    count, count_ms = timed(backend.count)
+                    rows, since_ms = timed(query)
+                    assert len(loaded) == count == size + args.writes
+                    print(f"{size:>10,} {label:>7} {seed_ms:>10,.0f} {append_rate:>10,.0f} {load_ms:>10,.1f} "
+                          f"{count_ms:>9,.2f} {since_ms:>9,.2f} {len(rows):>11,}")
+            finally:
+                store.close()
+
+    print("=" * 92)
+    print("✅ SQLite answers counts and range queries from its indexes instead of loading every row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark: the same workload against every StorageBackend.
+
+Each backend is seeded with the same signups, then timed on what the API and
+the maintenance scripts ask of storage: batched adds, exists() lookups, the
+subscriber count, an iter_since() page over the newest 1% of signups, and a
+batch delete. "dual" is the API's setup (primary + fallback, written
+together); with --mongo-url (or MONGO_URL) MongoDB joins as a backend and as
+the dual primary. Run from the backend directory:
+
+    python bench_storage_backends.py [--size 100000] [--ops 500] [--batch 100] [--mongo-url mongodb://...]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List
+
+from sqlite_store import SQLiteWaitlistStore
+from storage_backends import (DualWriteBackend, JSONBackend, MemoryBackend, SQLiteBackend, StorageBackend,
+                              open_mongo_backend)
+from waitlist_journal import WaitlistJournal
+
+START = datetime(2025, 6, 29)
+
+
+def make_entry(i: int) -> dict:
+    return {"name": f"User {i}", "email": f"user{i}@example.com",
+            "timestamp": (START + timedelta(seconds=i)).isoformat()}
+
+
+async def timed_ops(ops: List[Callable[[], Awaitable]]) -> List[float]:
+    """Per-op latency in ms"""
+    latencies = []
+    for op in ops:
+        start = time.perf_counter()
+        await op()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def percentile(latencies: List[float], q: int) -> float:
+    if len(latencies) == 1:
+        return latencies[0]
+    return statistics.quantiles(latencies, n=100, method="inclusive")[q - 1]
+
+
+def report(label: str, operation: str, latencies: List[float], items_per_op: int = 1):
+    total = sum(latencies) / 1000
+    rate = len(latencies) * items_per_op / total if total else float("inf")
+    print(f"{label:>8} {operation:>8} {len(latencies):>6} {rate:>12,.0f} "
+          f"{percentile(latencies, 50):>9,.2f} {percentile(latencies, 99):>9,.2f}")
+
+
+async def iterate(backend: StorageBackend, since: str) -> int:
+    return sum([1 async for _ in backend.iter_since(since)])
+
+
+async def bench(label: str, backend: StorageBackend, args):
+    seed = [make_entry(i) for i in range(args.size)]
+    start = time.perf_counter()
+    for offset in range(0, len(seed), 10_000):
+        await backend.add(seed[offset:offset + 10_000])
+    print(f"🌱 {label}: seeded {args.size:,} rows in {time.perf_counter() - start:.1f}s")
+
+    fresh = [make_entry(args.size + i) for i in range(args.ops * args.batch)]
+    batches = [fresh[i:i + args.batch] for i in range(0, len(fresh), args.batch)]
+    report(label, "add", await timed_ops([lambda b=b: backend.add(b) for b in batches]), args.batch)
+
+    probes = [make_entry((i * 7919) % (args.size * 2))["email"] for i in range(args.ops)]
+    report(label, "exists", await timed_ops([lambda e=e: backend.exists(e) for e in probes]))
+
+    report(label, "count", await timed_ops([backend.count for _ in range(min(args.ops, 50))]))
+
+    since = make_entry(int(args.size * 0.99))["timestamp"]
+    rows = await iterate(backend, since)
+    latencies = await timed_ops([lambda: iterate(backend, since) for _ in range(min(args.ops, 20))])
+    report(label, "since", latencies, rows)
+
+    doomed = [entry["email"] for entry in fresh]
+    chunks = [doomed[i:i + args.batch] for i in range(0, len(doomed), args.batch)]
+    report(label, "delete", await timed_ops([lambda c=c: backend.delete(c) for c in chunks[:20]]), args.batch)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=100_000, help="rows seeded into each backend")
+    parser.add_argument("--ops", type=int, default=500, help="operations timed per kind")
+    parser.add_argument("--batch", type=int, default=100, help="entries per add/delete call")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL"))
+    args = parser.parse_args()
+
+    print(f"🚀 StorageBackend benchmark ({args.size:,} rows, {args.ops} ops, batches of {args.batch})")
+    print("=" * 60)
+    print(f"{'backend':>8} {'op':>8} {'calls':>6} {'rows/s':>12} {'p50 ms':>9} {'p99 ms':>9}")
+
+    client = None
+    with tempfile.TemporaryDirectory() as tmp:
+        def journal(name: str) -> WaitlistJournal:
+            return WaitlistJournal(os.path.join(tmp, f"{name}.json"), os.path.join(tmp, f"{name}.jsonl"))
+
+        stores = [SQLiteWaitlistStore(os.path.join(tmp, f"{name}.sqlite3")) for name in ("sqlite", "dual")]
+        backends = [("memory", MemoryBackend()), ("json", JSONBackend(journal("json"))),
+                    ("sqlite", SQLiteBackend(stores[0]))]
+        dual_primary = SQLiteBackend(stores[1])
+        if args.mongo_url:
+            mongo, client = open_mongo_backend(args.mongo_url)
+            collection = client["StorageBenchmark"]["Emails"]
+            await collection.drop()
+            await collection.create_index("email", unique=True)
+            await collection.create_index([("timestamp", 1), ("email", 1)])
+            mongo._get_collection = lambda: collection
+            backends.append(("mongodb", mongo))
+            dual_primary = mongo
+        backends.append(("dual", DualWriteBackend(dual_primary, JSONBackend(journal("dual"), dedupe_on_add=False))))
+
+        try:
+            for label, backend in backends:
+                if label == "dual" and client is not None:
+                    await collection.delete_many({})
+                await bench(label, backend, args)
+        finally:
+            for store in stores:
+                store.close()
+            if client is not None:
+                await client["StorageBenchmark"]["Emails"].drop()
+                client.close()
+
+    print("=" * 60)
+    print("✅ Same interface, same workload - pick the fallback by FALLBACK_STORE")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
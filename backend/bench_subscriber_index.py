@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: join_waitlist duplicate check + count, legacy scan vs subscriber index.
+
+The legacy path materializes the waitlist and scans it linearly for the
+email (twice per new signup). The index path is one set lookup plus one
+insert. Run from the backend directory:
+
+    python bench_subscriber_index.py [--max 1000000]
+"""
+import argparse
+import time
+
+from subscriber_index import SubscriberIndex, normalize_email
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+JOINS = 200
+
+
+def make_entries(n: int):
+    return [
+        {"name": f"User {i}", "email": f"user{i}@example.com", "timestamp": "2025-06-29T00:00:00"}
+        for i in range(n)
+    ]
+
+
+def legacy_join(waitlist: list, email: str) -> int:
+    """Mirror of the old join path: linear scan, append, re-count"""
+    email_lower = email.lower().strip()
+    for existing in waitlist:
+        if existing.get("email", "").lower() == email_lower:
+            return len(waitlist)
+    waitlist.append({"name": "New", "email": email_lower, "timestamp": "2025-06-29T00:00:00"})
+    return len(waitlist)
+
+
+def index_join(index: SubscriberIndex, email: str) -> int:
+    """New join path: O(1) reserve in the index"""
+    index.add(normalize_email(email))
+    return index.count
+
+
+def time_joins(fn, target, joins: int) -> float:
+    start = time.perf_counter()
+    for i in range(joins):
+        fn(target, f"new{i}@example.com")
+    return (time.perf_counter() - start) / joins * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max", type=int, default=SIZES[-1], help="largest waitlist size to test")
+    args = parser.parse_args()
+
+    print("🚀 Subscriber index join benchmark")
+    print("=" * 60)
+    print(f"{'subscribers':>12} {'legacy µs/join':>16} {'index µs/join':>16} {'speedup':>10}")
+
+    for size in [s for s in SIZES if s <= args.max]:
+        entries = make_entries(size)
+
+        legacy = time_joins(legacy_join, list(entries), JOINS)
+
+        index = SubscriberIndex()
+        index.load(entries)
+        indexed = time_joins(index_join, index, JOINS)
+
+        print(f"{size:>12,} {legacy:>16.1f} {indexed:>16.2f} {legacy / indexed:>9.0f}x")
+
+    print("=" * 60)
+    print("✅ Index join latency is independent of waitlist size")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: JSON backup writes/sec, legacy full rewrite vs append-only journal.
+
+The legacy path parses waitlist.json, appends one entry and re-serializes
+the whole list with indent=2 for every signup. The journal path appends a
+single JSONL line. Run from the backend directory:
+
+    python bench_waitlist_journal.py [--base 10000] [--writes 500]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from waitlist_journal import WaitlistJournal
+
+
+def make_entry(i: int) -> dict:
+    return {"name": f"User {i}", "email": f"user{i}@example.com", "timestamp": "2025-06-29T00:00:00"}
+
+
+def legacy_write(path: str, entry: dict):
+    """Mirror of the old save_dual_storage JSON path"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not any(e.get("email", "").lower() == entry["email"] for e in data):
+        data.append(entry)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def seed(path: str, base: int):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([make_entry(i) for i in range(base)], f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="existing waitlist sizes to start from")
+    parser.add_argument("--writes", type=int, default=200, help="signups per run")
+    args = parser.parse_args()
+
+    print("🚀 JSON backup write benchmark")
+    print("=" * 60)
+    print(f"{'base size':>10} {'legacy writes/s':>16} {'journal writes/s':>18} {'speedup':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for base in args.base:
+            snapshot = os.path.join(tmp, "waitlist.json")
+            journal_path = os.path.join(tmp, "waitlist.jsonl")
+
+            seed(snapshot, base)
+            start = time.perf_counter()
+            for i in range(args.writes):
+                legacy_write(snapshot, make_entry(base + i))
+            legacy_rate = args.writes / (time.perf_counter() - start)
+
+            seed(snapshot, base)
+            journal = WaitlistJournal(snapshot, journal_path)
+            start = time.perf_counter()
+            for i in range(args.writes):
+                journal.append(make_entry(base + i))
+            journal_rate = args.writes / (time.perf_counter() - start)
+
+            assert len(journal.load()) == base + args.writes
+            journal.compact()
+            assert journal.pending_entries() == 0
+
+            print(f"{base:>10,} {legacy_rate:>16,.0f} {journal_rate:>18,.0f} {journal_rate / legacy_rate:>8.0f}x")
+
+    print("=" * 60)
+    print("✅ Journal appends cost O(1) regardless of waitlist size")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,34 @@
 import asyncio
 import os
-from motor.motor_asyncio import AsyncIOMotorClient
+import sys
 from dotenv import load_dotenv
 
+from storage_backends import open_fallback_backend, open_mongo_backend
+
 load_dotenv("/app/backend/.env")
 
 MONGO_URL = os.environ.get("MONGO_URL")
-DB_NAME = "RecalibrateWebsite"
-COLLECTION_NAME = "Emails"
 
-async def check_email():
+async def check_email(email: str):
     print(f"Connecting to MongoDB...")
-    client = AsyncIOMotorClient(MONGO_URL)
-    db = client[DB_NAME]
-    collection = db[COLLECTION_NAME]
+    mongo, client = open_mongo_backend(MONGO_URL)
     
-    email = "info@recalibratepain.com"
     print(f"Searching for {email}...")
     
-    doc = await collection.find_one({"email": email})
-    
-    if doc:
+    if await mongo.exists(email):
         print("✅ FOUND in MongoDB!")
-        print(doc)
     else:
         print("❌ NOT FOUND in MongoDB.")
         
     # Check total count
-    count = await collection.count_documents({})
-    print(f"Total documents in collection: {count}")
+    print(f"Total documents in collection: {await mongo.count()}")
+    
+    # Same checks against the local fallback store
+    fallback = open_fallback_backend()
+    found = await fallback.exists(email)
+    print(f"{'✅ FOUND' if found else '❌ NOT FOUND'} in the {fallback.name} fallback "
+          f"({await fallback.count()} entries)")
+    client.close()
 
 if __name__ == "__main__":
-    asyncio.run(check_email())
\ No newline at end of file
+    asyncio.run(check_email(sys.argv[1] if len(sys.argv) > 1 else "info@recalibratepain.com"))
@@ -0,0 +1,155 @@
+"""
+Circuit breaker for calls to MongoDB and Resend.
+
+closed    -> calls go through; consecutive failures are counted
+open      -> calls fail immediately with CircuitOpenError until the reset
+             timeout passes, so callers take their fallback without waiting
+             on a dead dependency
+half_open -> a limited number of trial calls go through; one success
+             closes the breaker, one failure opens it again
+
+An optional per-call timeout turns a hanging call (e.g. MongoDB server
+selection during an Atlas outage) into a fast failure that counts
+towards opening the breaker.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Sentinel: use the breaker's call_timeout
+DEFAULT_TIMEOUT = object()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open"""
+
+    # The email outbox reschedules on retry_after without spending an attempt
+    retryable = True
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit is open (retry in {retry_after:.1f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """closed / open / half-open breaker around one dependency"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 call_timeout: Optional[float] = None, half_open_max_calls: int = 1,
+                 is_failure: Callable[[BaseException], bool] = lambda e: True):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.call_timeout = call_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.is_failure = is_failure
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_monotonic: Optional[float] = None
+        self._half_open_in_flight = 0
+        self.opened_at: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.calls = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_monotonic >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._half_open_in_flight = 0
+            logger.info(f"🟡 {self.name} circuit half-open, allowing a trial call")
+        return self._state
+
+    def retry_after(self) -> float:
+        if self._opened_monotonic is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_monotonic))
+
+    def allow(self) -> bool:
+        """Would a call go through right now? (doesn't reserve a half-open slot)"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN:
+            return self._half_open_in_flight < self.half_open_max_calls
+        return False
+
+    def _open(self, error: BaseException):
+        self._state = OPEN
+        self._opened_monotonic = time.monotonic()
+        self.opened_at = datetime.now().isoformat()
+        self.times_opened += 1
+        logger.error(f"🔴 {self.name} circuit opened after {self._consecutive_failures} failures: {error!r}")
+
+    def record_success(self):
+        if self._state != CLOSED:
+            logger.info(f"🟢 {self.name} circuit closed")
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_monotonic = None
+
+    def record_failure(self, error: BaseException):
+        self.failures += 1
+        self._consecutive_failures += 1
+        self.last_error = repr(error)[:300]
+        if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            self._open(error)
+
+    async def call(self, fn: Callable[..., Awaitable[T]], *args, timeout=DEFAULT_TIMEOUT, **kwargs) -> T:
+        """Run fn through the breaker; pass timeout=None to disable the per-call timeout"""
+        state = self.state
+        if state == OPEN or (state == HALF_OPEN and self._half_open_in_flight >= self.half_open_max_calls):
+            self.short_circuited += 1
+            raise CircuitOpenError(self.name, self.retry_after())
+
+        trial = state == HALF_OPEN
+        if trial:
+            self._half_open_in_flight += 1
+        self.calls += 1
+        call_timeout = self.call_timeout if timeout is DEFAULT_TIMEOUT else timeout
+        try:
+            if call_timeout:
+                result = await asyncio.wait_for(fn(*args, **kwargs), timeout=call_timeout)
+            else:
+                result = await fn(*args, **kwargs)
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError) or self.is_failure(e):
+                self.record_failure(e)
+            else:
+                # The dependency answered (e.g. a duplicate key) - it's reachable
+                self.record_success()
+            raise
+        finally:
+            if trial:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+        self.record_success()
+        return result
+
+    def snapshot(self) -> dict:
+        state = self.state
+        return {
+            "state": state,
+            "consecutive_failures": self._consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout_seconds": self.reset_timeout,
+            "retry_in_seconds": round(self.retry_after(), 2) if state == OPEN else None,
+            "opened_at": self.opened_at if state != CLOSED else None,
+            "times_opened": self.times_opened,
+            "calls": self.calls,
+            "failures": self.failures,
+            "short_circuited": self.short_circuited,
+            "last_error": self.last_error,
+        }
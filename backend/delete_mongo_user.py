@@ -1,29 +1,32 @@
 import asyncio
 import os
-from motor.motor_asyncio import AsyncIOMotorClient
+import sys
 from dotenv import load_dotenv
 
+from storage_backends import open_fallback_backend, open_mongo_backend
+
 load_dotenv("/app/backend/.env")
 
 MONGO_URL = os.environ.get("MONGO_URL")
-DB_NAME = "RecalibrateWebsite"
-COLLECTION_NAME = "Emails"
 
-async def delete_info_email():
+async def delete_email(email: str, include_fallback: bool = False):
     print(f"Connecting to MongoDB...")
-    client = AsyncIOMotorClient(MONGO_URL)
-    db = client[DB_NAME]
-    collection = db[COLLECTION_NAME]
+    mongo, client = open_mongo_backend(MONGO_URL)
     
-    email = "info@recalibratepain.com"
     print(f"Deleting {email}...")
     
-    result = await collection.delete_one({"email": email})
-    
-    if result.deleted_count > 0:
+    if await mongo.delete([email]) > 0:
         print("✅ DELETED from MongoDB.")
     else:
         print("⚠️ Not found to delete.")
+    
+    if include_fallback:
+        fallback = open_fallback_backend()
+        removed = await fallback.delete([email])
+        print(f"{'✅ DELETED' if removed else '⚠️ Not found'} in the {fallback.name} fallback.")
+    client.close()
 
 if __name__ == "__main__":
-    asyncio.run(delete_info_email())
\ No newline at end of file
+    # python delete_mongo_user.py [email] [--fallback]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    asyncio.run(delete_email(args[0] if args else "info@recalibratepain.com", "--fallback" in sys.argv))
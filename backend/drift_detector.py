@@ -0,0 +1,271 @@
+"""
+Drift detection between MongoDB and the JSON backup.
+
+Each side keeps per-bucket digests of its emails: an email's SHA-1 picks its
+bucket (the first hex digits) and is XORed into that bucket's digest, so
+digests are order-independent and updated in O(1) per write. A root hash
+over all buckets (Merkle-style) tells in one comparison whether the sides
+agree; only when it differs are the buckets compared, and only the rows of
+differing buckets are fetched. Every row stores its hash prefix
+(email_bucket, indexed in MongoDB and SQLite), so that fetch is an index
+range per bucket rather than a scan of both stores.
+
+Digests are built from a full pass at startup, kept current from this
+worker's write path, and rebuilt periodically (or after out-of-band changes
+such as a replay or a cleanup). Writes made by other workers and scripts
+don't reach this worker's digests, so a bucket that looks out of sync is
+re-read from both stores before it is reported: drift is only ever what the
+stores themselves disagree on.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Hex digits of the email hash stored with every row - enough for up to 16^4 buckets
+STORED_BUCKET_DIGITS = 4
+
+
+def email_digest(email: str) -> bytes:
+    return hashlib.sha1(email.encode("utf-8")).digest()
+
+
+def email_bucket(email: str) -> str:
+    """The stored email_bucket field: a prefix of the email's SHA-1"""
+    return email_digest(email).hex()[:STORED_BUCKET_DIGITS]
+
+
+def in_buckets(email: str, prefixes: Optional[Iterable[str]]) -> bool:
+    """Does the email fall into one of the bucket prefixes? (all buckets when None)"""
+    return prefixes is None or email_bucket(email).startswith(tuple(prefixes))
+
+
+def bucket_ranges(prefixes: Iterable[str]) -> List[tuple]:
+    """[low, high) email_bucket ranges, one per prefix - "g" sorts after every hex digit"""
+    return [(prefix, prefix + "g") for prefix in prefixes]
+
+
+class BucketDigests:
+    """XOR digest + count per email-hash bucket"""
+
+    def __init__(self, hex_digits: int = 2):
+        if not 1 <= hex_digits <= STORED_BUCKET_DIGITS:
+            raise ValueError(f"bucket hex digits must be between 1 and {STORED_BUCKET_DIGITS}")
+        self.hex_digits = hex_digits
+        self.digests = [0] * (16 ** hex_digits)
+        self.counts = [0] * (16 ** hex_digits)
+
+    def bucket_of(self, email: str) -> int:
+        return int(email_digest(email).hex()[:self.hex_digits], 16)
+
+    def prefix(self, bucket: int) -> str:
+        return f"{bucket:0{self.hex_digits}x}"
+
+    def add(self, email: str):
+        digest = email_digest(email)
+        bucket = int(digest.hex()[:self.hex_digits], 16)
+        self.digests[bucket] ^= int.from_bytes(digest, "big")
+        self.counts[bucket] += 1
+
+    def bucket_hash(self, bucket: int) -> str:
+        return f"{self.digests[bucket]:040x}:{self.counts[bucket]}"
+
+    def root(self) -> str:
+        """Hash over every bucket digest - equal roots mean equal buckets"""
+        hasher = hashlib.sha1()
+        for digest, count in zip(self.digests, self.counts):
+            hasher.update(digest.to_bytes(20, "big") + count.to_bytes(8, "big"))
+        return hasher.hexdigest()
+
+    def differing_buckets(self, other: "BucketDigests") -> List[int]:
+        return [bucket for bucket in range(len(self.digests))
+                if self.digests[bucket] != other.digests[bucket] or self.counts[bucket] != other.counts[bucket]]
+
+    def replace_bucket(self, bucket: int, emails: Iterable[str]):
+        """Recompute one bucket from its actual rows"""
+        self.digests[bucket] = 0
+        self.counts[bucket] = 0
+        for email in emails:
+            self.add(email)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+
+class DriftDetector:
+    """Keeps JSON and MongoDB bucket digests and reports where they disagree
+
+    json_store and mongo_store are storage backends; only their
+    iter_emails(prefixes) is used.
+    """
+
+    def __init__(self, json_store, mongo_store,
+                 mongo_ready: Callable[[], bool],
+                 bucket_hex_digits: int = 2,
+                 check_interval_seconds: float = 60.0,
+                 rebuild_interval_seconds: float = 3600.0):
+        self.json_store = json_store
+        self.mongo_store = mongo_store
+        self._mongo_ready = mongo_ready
+        self.bucket_hex_digits = bucket_hex_digits
+        self.check_interval_seconds = check_interval_seconds
+        self.rebuild_interval_seconds = rebuild_interval_seconds
+        self.json: Optional[BucketDigests] = None
+        self.mongo: Optional[BucketDigests] = None
+        self._stale = True
+        self._built_monotonic = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.built_at: Optional[str] = None
+        self.last_build_seconds: Optional[float] = None
+        self.rebuilds = 0
+        self.checks = 0
+        self.drift_detected = 0
+        self.last_error: Optional[str] = None
+
+    @staticmethod
+    async def _emails(store, prefixes: Optional[List[str]] = None) -> set:
+        return {email async for email in store.iter_emails(prefixes) if email}
+
+    async def rebuild(self):
+        """Full pass over both sides (the only step that reads every row)"""
+        if not self._mongo_ready():
+            return
+        async with self._lock:
+            started = time.perf_counter()
+            json_digests = BucketDigests(self.bucket_hex_digits)
+            for email in await self._emails(self.json_store):
+                json_digests.add(email)
+            mongo_digests = BucketDigests(self.bucket_hex_digits)
+            for email in await self._emails(self.mongo_store):
+                mongo_digests.add(email)
+            self.json, self.mongo = json_digests, mongo_digests
+            self._stale = False
+            self._built_monotonic = time.monotonic()
+            self.built_at = datetime.now().isoformat()
+            self.last_build_seconds = round(time.perf_counter() - started, 3)
+            self.rebuilds += 1
+            logger.info(f"🧮 Drift digests rebuilt in {self.last_build_seconds}s "
+                        f"({json_digests.total} JSON / {mongo_digests.total} MongoDB)")
+
+    def record_write(self, email: str, mongo_saved: bool, json_saved: bool):
+        """Fold a new subscriber into the digests of the sides it reached"""
+        if self.json is None or self.mongo is None:
+            return
+        if mongo_saved:
+            self.mongo.add(email)
+        if json_saved:
+            self.json.add(email)
+
+    def invalidate(self):
+        """Digests may be off (bulk change elsewhere) - rebuild on the next pass"""
+        self._stale = True
+
+    def compare(self) -> dict:
+        """Digest-only comparison: root first, then buckets if the roots differ"""
+        self.checks += 1
+        if self.json is None or self.mongo is None:
+            return {"checked": False, "reason": "digests not built (MongoDB unavailable?)"}
+        json_root, mongo_root = self.json.root(), self.mongo.root()
+        buckets = [] if json_root == mongo_root else self.json.differing_buckets(self.mongo)
+        return {
+            "checked": True,
+            "in_sync": not buckets,
+            "json_root": json_root,
+            "mongo_root": mongo_root,
+            "json_count": self.json.total,
+            "mongo_count": self.mongo.total,
+            "bucket_count": len(self.json.digests),
+            "drifting_buckets": len(buckets),
+            "buckets": [{"bucket": f"{bucket:0{self.bucket_hex_digits}x}",
+                         "json_count": self.json.counts[bucket],
+                         "mongo_count": self.mongo.counts[bucket]} for bucket in buckets],
+        }
+
+    def _group(self, emails: Iterable[str], wanted: Iterable[int]) -> Dict[int, set]:
+        rows: Dict[int, set] = {bucket: set() for bucket in wanted}
+        for email in emails:
+            bucket = self.json.bucket_of(email)
+            if bucket in rows:
+                rows[bucket].add(email)
+        return rows
+
+    async def inspect(self, limit: int = 100) -> dict:
+        """Re-read only the drifting buckets from both stores and name the emails on one side"""
+        report = self.compare()
+        if not report.get("checked") or report["in_sync"]:
+            return report
+        async with self._lock:
+            wanted = sorted(int(bucket["bucket"], 16) for bucket in report["buckets"])
+            prefixes = [self.json.prefix(bucket) for bucket in wanted]
+            json_rows = self._group(await self._emails(self.json_store, prefixes), wanted)
+            mongo_rows = self._group(await self._emails(self.mongo_store, prefixes), wanted)
+
+            only_in_json, only_in_mongo = [], []
+            for bucket in wanted:
+                only_in_json.extend(sorted(json_rows[bucket] - mongo_rows[bucket]))
+                only_in_mongo.extend(sorted(mongo_rows[bucket] - json_rows[bucket]))
+                # Pick up other workers' writes and heal digests an incremental update got wrong
+                self.json.replace_bucket(bucket, json_rows[bucket])
+                self.mongo.replace_bucket(bucket, mongo_rows[bucket])
+
+        report = self.compare()
+        report.update({
+            "only_in_json_count": len(only_in_json),
+            "only_in_mongo_count": len(only_in_mongo),
+            "only_in_json": only_in_json[:limit],
+            "only_in_mongo": only_in_mongo[:limit],
+        })
+        return report
+
+    async def check(self) -> dict:
+        """Digest comparison; buckets that differ are confirmed against the stores before they're reported"""
+        report = await self.inspect(limit=0)
+        report.pop("only_in_json", None)
+        report.pop("only_in_mongo", None)
+        return report
+
+    async def _run(self):
+        while True:
+            try:
+                due = time.monotonic() - self._built_monotonic >= self.rebuild_interval_seconds
+                if self._stale or due:
+                    await self.rebuild()
+                report = await self.check()
+                if report.get("checked") and not report["in_sync"]:
+                    self.drift_detected += 1
+                    logger.warning(f"🔀 Storage drift: {report['drifting_buckets']} buckets differ "
+                                   f"({report['json_count']} JSON / {report['mongo_count']} MongoDB)")
+            except Exception as e:
+                self.last_error = str(e)[:300]
+                logger.error(f"❌ Drift check failed: {e}")
+            await asyncio.sleep(self.check_interval_seconds)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def metrics(self) -> dict:
+        return {
+            "built_at": self.built_at,
+            "last_build_seconds": self.last_build_seconds,
+            "stale": self._stale,
+            "rebuilds": self.rebuilds,
+            "checks": self.checks,
+            "drift_detected": self.drift_detected,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Bulk email campaigns (e.g. the Cohort 1 launch announcement).
+
+Recipients are streamed from the Emails collection in email order with a
+keyset cursor and sent through Resend's batch API, up to 100 per request,
+with a bounded number of batches in flight. Progress is checkpointed after
+every batch as the last email of the longest fully-sent prefix, so a
+crashed or stopped campaign resumes right after the last confirmed batch.
+Every batch carries an idempotency key derived from its recipients, and
+the checkpoint records the recipients of every batch in flight before it
+is sent. A resume replays exactly those batches first, with the same keys,
+so Resend drops any it already delivered (keys are remembered for 24 hours)
+even if new signups have since landed between them. Fresh batches then
+pick up everyone else after the checkpoint, including those new signups.
+A --dry-run is checkpointed under its own key ("<campaign>:dry-run"), so a
+rehearsal never marks recipients of the real campaign as sent.
+Batches go through the Resend circuit breaker: while it is open they wait
+for it to close instead of spending their retries.
+
+CLI (run from the backend directory):
+
+    python email_campaign.py run --campaign cohort1-launch [--dry-run]
+    python email_campaign.py status --campaign cohort1-launch [--dry-run]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from email_outbox import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Resend's batch endpoint accepts at most 100 emails per request
+MAX_CHUNK_SIZE = 100
+
+RUNNING = "running"
+PAUSED = "paused"
+FAILED = "failed"
+COMPLETED = "completed"
+
+# recipients(after_email) yields {"email", "name"} dicts in email order, starting after after_email
+RecipientSource = Callable[[Optional[str]], AsyncIterator[dict]]
+# build(recipient) returns Resend params for one email
+MessageBuilder = Callable[[dict], dict]
+
+
+class CampaignStateError(Exception):
+    """The stored checkpoint can't be resumed by this run"""
+
+
+def campaign_state_id(campaign_id: str, dry_run: bool) -> str:
+    """Checkpoint key: dry runs never share progress with the real campaign"""
+    return f"{campaign_id}:dry-run" if dry_run else campaign_id
+
+
+def chunk_idempotency_key(campaign_id: str, emails: List[str]) -> str:
+    """Stable key for a batch: the same recipients always produce the same key"""
+    digest = hashlib.sha256("\n".join(emails).encode("utf-8")).hexdigest()[:32]
+    return f"{campaign_id}/{digest}"
+
+
+def new_campaign_state(campaign_id: str, template: str, subject: str, dry_run: bool) -> dict:
+    now = datetime.now().isoformat()
+    return {
+        "_id": campaign_state_id(campaign_id, dry_run),
+        "template": template,
+        "subject": subject,
+        "dry_run": dry_run,
+        "status": RUNNING,
+        "cursor": None,
+        # Batches dispatched but not yet committed: [{"seq", "recipients"}]
+        "in_flight": [],
+        "sent": 0,
+        "batches": 0,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+        "completed_at": None,
+    }
+
+
+class MongoCampaignStore:
+    """Campaign checkpoints in a MongoDB collection"""
+
+    name = "mongodb"
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def load(self, campaign_id: str) -> Optional[dict]:
+        return await self.collection.find_one({"_id": campaign_id})
+
+    async def save(self, state: dict):
+        await self.collection.replace_one({"_id": state["_id"]}, state, upsert=True)
+
+
+class FileCampaignStore:
+    """Campaign checkpoints in a local JSON file (used without MongoDB)"""
+
+    name = "file"
+
+    def __init__(self, path: str, io=None):
+        self.path = path
+        # Optional FileIOExecutor: read/write on its threads instead of the event loop
+        self.io = io
+        self._lock = asyncio.Lock()
+
+    async def _run(self, fn: Callable, *args):
+        if self.io is None:
+            return fn(*args)
+        return await self.io.run(fn, *args)
+
+    def _read(self) -> Dict[str, dict]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def _write(self, campaigns: Dict[str, dict]):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(campaigns, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    async def load(self, campaign_id: str) -> Optional[dict]:
+        return (await self._run(self._read)).get(campaign_id)
+
+    async def save(self, state: dict):
+        async with self._lock:
+            campaigns = await self._run(self._read)
+            campaigns[state["_id"]] = state
+            await self._run(self._write, campaigns)
+
+
+class CampaignRunner:
+    """Sends one campaign in checkpointed batches"""
+
+    def __init__(self, campaign_id: str, client, build_message: MessageBuilder, store,
+                 template: str = "welcome_email", subject: str = "",
+                 chunk_size: int = MAX_CHUNK_SIZE, concurrency: int = 2,
+                 rate_per_second: float = 2.0, max_batch_attempts: int = 5,
+                 retry_base_seconds: float = 2.0, dry_run: bool = False,
+                 progress_interval: float = 5.0, breaker: Optional[CircuitBreaker] = None):
+        self.campaign_id = campaign_id
+        self.state_id = campaign_state_id(campaign_id, dry_run)
+        self.client = client
+        # The API passes its resend_breaker, so an outage seen by the outbox pauses campaigns too
+        self.breaker = breaker
+        self.build_message = build_message
+        self.store = store
+        self.template = template
+        self.subject = subject
+        self.chunk_size = max(1, min(chunk_size, MAX_CHUNK_SIZE))
+        self.concurrency = max(1, concurrency)
+        self.max_batch_attempts = max_batch_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.dry_run = dry_run
+        self.progress_interval = progress_interval
+        self._bucket = TokenBucket(rate_per_second)
+        self._stop = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self.state: Optional[dict] = None
+        self.total: Optional[int] = None
+        self._started: Optional[float] = None
+        self._sent_this_run = 0
+        self._last_report = 0.0
+
+    def stop(self):
+        """Finish in-flight batches, checkpoint and pause"""
+        self._stop.set()
+
+    async def _send_batch(self, messages: List[dict], key: str):
+        attempt = 0
+        while True:
+            await self._bucket.acquire()
+            try:
+                if not self.dry_run:
+                    if self.breaker is not None:
+                        await self.breaker.call(self.client.send_batch, messages, idempotency_key=key)
+                    else:
+                        await self.client.send_batch(messages, idempotency_key=key)
+                return
+            except CircuitOpenError as e:
+                # Resend is known to be down: wait it out without using an attempt
+                logger.warning(f"⚠️ Campaign {self.campaign_id} waiting {e.retry_after:.1f}s for Resend: {e}")
+                await asyncio.sleep(max(e.retry_after, self.retry_base_seconds))
+            except Exception as e:
+                attempt += 1
+                if attempt >= self.max_batch_attempts or not getattr(e, "retryable", True):
+                    raise
+                delay = self.retry_base_seconds * (2 ** (attempt - 1))
+                logger.warning(f"⚠️ Campaign {self.campaign_id} batch attempt {attempt} failed, "
+                               f"retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+
+    def progress(self) -> dict:
+        state = self.state or {}
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        rate = self._sent_this_run / elapsed if elapsed > 0 else 0.0
+        remaining = max(0, self.total - state.get("sent", 0)) if self.total is not None else None
+        eta = remaining / rate if rate > 0 and remaining is not None else None
+        return {
+            "campaign_id": self.campaign_id,
+            "status": state.get("status"),
+            "dry_run": self.dry_run,
+            "sent": state.get("sent", 0),
+            "total": self.total,
+            "cursor": state.get("cursor"),
+            "batches": state.get("batches", 0),
+            "emails_per_second": round(rate, 1),
+            "elapsed_seconds": round(elapsed, 1),
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "error": state.get("error"),
+        }
+
+    def _report(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_report < self.progress_interval:
+            return
+        self._last_report = now
+        p = self.progress()
+        eta = f"{p['eta_seconds']:.0f}s" if p["eta_seconds"] is not None else "?"
+        logger.info(f"📨 Campaign {self.campaign_id}: {p['sent']}/{p['total'] if p['total'] is not None else '?'} sent, "
+                    f"{p['emails_per_second']:.1f} emails/sec, ETA {eta}")
+
+    async def _checkpoint(self):
+        self.state["updated_at"] = datetime.now().isoformat()
+        await self.store.save(self.state)
+
+    async def load_state(self) -> Optional[dict]:
+        """Stored checkpoint for this run, if any; raises CampaignStateError if it can't be resumed"""
+        state = await self.store.load(self.state_id)
+        if state is not None and bool(state.get("dry_run")) != self.dry_run:
+            kind = "a dry run" if state.get("dry_run") else "a real send"
+            raise CampaignStateError(f"Campaign {self.state_id} was checkpointed by {kind}; "
+                                     f"it can't be resumed with dry_run={self.dry_run}")
+        return state
+
+    async def run(self, recipients: RecipientSource, total: Optional[int] = None) -> dict:
+        """Send (or resume) the campaign; returns its final progress"""
+        self.total = total
+        self.state = await self.load_state()
+        if self.state is None:
+            self.state = new_campaign_state(self.campaign_id, self.template, self.subject, self.dry_run)
+        elif self.state["status"] == COMPLETED:
+            logger.info(f"✅ Campaign {self.campaign_id} already completed ({self.state['sent']} sent)")
+            return self.progress()
+        else:
+            logger.info(f"🔁 Resuming campaign {self.campaign_id} after {self.state['cursor']} "
+                        f"({self.state['sent']} already sent)")
+        self.state.update({"status": RUNNING, "error": None})
+        await self._checkpoint()
+
+        # Batches the last run had in flight are re-sent with the same recipients (and so the same key)
+        replay = [entry["recipients"] for entry in self.state.get("in_flight") or []]
+        replayed = {recipient["email"] for batch in replay for recipient in batch}
+        self.state["in_flight"] = []
+
+        self._started = time.monotonic()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        finished: Dict[int, tuple] = {}  # seq -> (last_email, count)
+        next_commit = 0
+        tasks = set()
+        failure: List[BaseException] = []
+
+        async def commit():
+            # Advance the checkpoint over the contiguous run of finished batches
+            nonlocal next_commit
+            async with self._lock:
+                advanced = False
+                while next_commit in finished:
+                    last_email, count = finished.pop(next_commit)
+                    self.state["in_flight"] = [entry for entry in self.state["in_flight"]
+                                               if entry["seq"] != next_commit]
+                    # Never backwards: a late signup behind replayed batches can end a fresh one
+                    self.state["cursor"] = max(self.state["cursor"] or "", last_email)
+                    self.state["sent"] += count
+                    self.state["batches"] += 1
+                    self._sent_this_run += count
+                    next_commit += 1
+                    advanced = True
+                if advanced:
+                    await self._checkpoint()
+            self._report()
+
+        async def send(seq: int, chunk: List[dict]):
+            try:
+                emails = [recipient["email"] for recipient in chunk]
+                messages = [self.build_message(recipient) for recipient in chunk]
+                await self._send_batch(messages, chunk_idempotency_key(self.campaign_id, emails))
+                finished[seq] = (emails[-1], len(chunk))
+                await commit()
+            except Exception as e:
+                failure.append(e)
+                self._stop.set()
+            finally:
+                semaphore.release()
+
+        seq = 0
+        chunk: List[dict] = []
+
+        async def dispatch(batch: List[dict]):
+            nonlocal seq
+            await semaphore.acquire()
+            if self._stop.is_set():
+                semaphore.release()
+                return False
+            # Record the membership before sending, so a resume re-sends exactly this batch
+            async with self._lock:
+                self.state["in_flight"].append({
+                    "seq": seq,
+                    "recipients": [{"email": r["email"], "name": r.get("name", "")} for r in batch]
+                })
+                await self._checkpoint()
+            task = asyncio.create_task(send(seq, batch))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            seq += 1
+            return True
+
+        exhausted = False
+        for index, batch in enumerate(replay):
+            if not await dispatch(batch):
+                # Stopped before re-sending these: keep them for the next resume
+                self.state["in_flight"].extend({"seq": seq + offset, "recipients": pending}
+                                               for offset, pending in enumerate(replay[index:]))
+                break
+        else:
+            async for recipient in recipients(self.state["cursor"]):
+                if recipient["email"] in replayed:
+                    continue
+                chunk.append(recipient)
+                if len(chunk) >= self.chunk_size:
+                    if not await dispatch(chunk):
+                        break
+                    chunk = []
+            else:
+                exhausted = not chunk or await dispatch(chunk)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if failure:
+            self.state["status"] = FAILED
+            self.state["error"] = str(failure[0])[:500]
+            logger.error(f"❌ Campaign {self.campaign_id} stopped after a failed batch "
+                         f"(resume continues after {self.state['cursor']}): {failure[0]}")
+        elif not exhausted:
+            self.state["status"] = PAUSED
+            logger.info(f"⏸️ Campaign {self.campaign_id} paused after {self.state['cursor']}")
+        else:
+            self.state["status"] = COMPLETED
+            self.state["completed_at"] = datetime.now().isoformat()
+        await self._checkpoint()
+        self._report(force=True)
+        return self.progress()
+
+
+async def main():
+    from dotenv import load_dotenv
+
+    from email_templates import TemplateCache, personalized_message
+    from resend_client import AsyncResendClient, is_outage
+    from storage_backends import DB_NAME, open_mongo_backend
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Send a bulk email campaign to the waitlist")
+    parser.add_argument("command", choices=["run", "status"])
+    parser.add_argument("--campaign", required=True, help="campaign id (the checkpoint key)")
+    parser.add_argument("--template", default="welcome_email")
+    parser.add_argument("--subject", default="Recalibrate Cohort 1 is launching")
+    parser.add_argument("--chunk-size", type=int, default=MAX_CHUNK_SIZE)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--rate", type=float, default=float(os.environ.get("EMAIL_RATE_PER_SECOND", "2")),
+                        help="batch requests per second")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="render every email but send nothing (checkpointed separately)")
+    args = parser.parse_args()
+
+    mongo_url = os.environ.get("MONGO_URL")
+    if not mongo_url:
+        print("❌ MONGO_URL is not set")
+        return
+    subscribers, mongo_client = open_mongo_backend(mongo_url)
+    store = MongoCampaignStore(mongo_client[DB_NAME]["EmailCampaigns"])
+
+    if args.command == "status":
+        state = await store.load(campaign_state_id(args.campaign, args.dry_run))
+        print(json.dumps(state, indent=2, default=str) if state else f"No campaign named {args.campaign}")
+        return
+
+    if not args.dry_run and not os.environ.get("RESEND_API_KEY"):
+        print("❌ RESEND_API_KEY is not set (use --dry-run to rehearse)")
+        return
+
+    templates = TemplateCache()
+    build = personalized_message(
+        templates, args.template, args.subject,
+        sender=f"Recalibrate <{os.environ.get('MAIL_FROM', 'info@recalibratepain.com')}>",
+        unsubscribe_url_template=os.environ.get(
+            "UNSUBSCRIBE_URL_TEMPLATE", "mailto:info@recalibratepain.com?subject=Unsubscribe%20{email}"
+        )
+    )
+    client = AsyncResendClient(
+        os.environ.get("RESEND_API_KEY"),
+        base_url=os.environ.get("RESEND_API_URL", "https://api.resend.com"),
+        pool_size=args.concurrency
+    )
+    breaker = CircuitBreaker(
+        "resend",
+        failure_threshold=int(os.environ.get("RESEND_BREAKER_FAILURES", "5")),
+        reset_timeout=float(os.environ.get("RESEND_BREAKER_RESET_SECONDS", "30")),
+        is_failure=is_outage
+    )
+    runner = CampaignRunner(
+        args.campaign, client, build, store,
+        template=args.template, subject=args.subject,
+        chunk_size=args.chunk_size, concurrency=args.concurrency,
+        rate_per_second=args.rate, dry_run=args.dry_run, breaker=breaker
+    )
+    try:
+        total = await subscribers.count()
+        # Email order, read off the unique email index
+        result = await runner.run(
+            lambda after: subscribers.iter_since(after=(after,) if after else None, order="email"), total
+        )
+    finally:
+        await client.aclose()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,437 @@
+"""
+Durable email outbox.
+
+Emails are enqueued into a persistent queue (a MongoDB collection, or a
+local JSONL file while MongoDB is unavailable) and drained by a bounded
+pool of async workers. Sends are rate limited with a token bucket,
+retried with exponential backoff, and dead-lettered after too many
+failures. Delivery is at-least-once: a message whose worker dies mid-send
+is picked up again once its lease expires.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ASCENDING, ReturnDocument
+
+from file_storage import atomic_write_unlocked, file_lock
+from latency_stats import latency_summary
+
+logger = logging.getLogger(__name__)
+
+# deliver(message) sends one message and raises on failure
+Deliver = Callable[[dict], Awaitable[object]]
+
+PENDING = "pending"
+SENDING = "sending"
+DEAD = "dead"
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class MongoOutboxStore:
+    """Outbox queue in a MongoDB collection
+
+    Calls go through the MongoDB circuit breaker when one is given, so a
+    hung cluster costs one call timeout rather than a server-selection wait.
+    """
+
+    name = "mongodb"
+
+    def __init__(self, collection, lease_seconds: float = 60.0, breaker=None):
+        self.collection = collection
+        self.lease_seconds = lease_seconds
+        self.breaker = breaker
+
+    async def _call(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        if self.breaker is None:
+            return await fn(*args, **kwargs)
+        return await self.breaker.call(fn, *args, **kwargs)
+
+    async def ensure_indexes(self):
+        await self.collection.create_index(
+            [("status", ASCENDING), ("next_attempt_at", ASCENDING)], name="status_next_attempt_idx"
+        )
+
+    async def enqueue(self, message: dict):
+        await self._call(self.collection.insert_one, dict(message))
+
+    async def claim(self) -> Optional[dict]:
+        now = datetime.now()
+        return await self._call(
+            self.collection.find_one_and_update,
+            {"$or": [
+                {"status": PENDING, "next_attempt_at": {"$lte": now}},
+                # Lease expired: the worker that claimed it died mid-send
+                {"status": SENDING, "lease_until": {"$lt": now}}
+            ]},
+            {"$set": {"status": SENDING, "lease_until": now + timedelta(seconds=self.lease_seconds)}},
+            sort=[("next_attempt_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def complete(self, message: dict):
+        await self._call(self.collection.delete_one, {"_id": message["_id"]})
+
+    async def retry(self, message: dict, next_attempt_at: datetime, error: str):
+        await self._call(
+            self.collection.update_one,
+            {"_id": message["_id"]},
+            {"$set": {"status": PENDING, "attempts": message["attempts"], "next_attempt_at": next_attempt_at,
+                      "last_error": error}, "$unset": {"lease_until": ""}}
+        )
+
+    async def dead_letter(self, message: dict, error: str):
+        await self._call(
+            self.collection.update_one,
+            {"_id": message["_id"]},
+            {"$set": {"status": DEAD, "attempts": message["attempts"], "last_error": error,
+                      "dead_at": datetime.now()}, "$unset": {"lease_until": ""}}
+        )
+
+    async def depth(self) -> Dict[str, int]:
+        return {
+            "pending": await self._call(self.collection.count_documents, {"status": {"$in": [PENDING, SENDING]}}),
+            "dead": await self._call(self.collection.count_documents, {"status": DEAD}),
+        }
+
+
+class FileOutboxStore:
+    """Outbox queue in a local JSONL event log, shared by every worker process
+
+    Each operation takes the log's exclusive file lock, first applies the
+    events other processes appended since this one last read, then appends
+    its own. Claims are logged with a lease like the MongoDB store's, so two
+    workers never send the same message and a message claimed by a process
+    that died is picked up again once the lease expires. Compaction rewrites
+    the log atomically (temp file + fsync + rename) under the same lock.
+
+    File work goes through the io executor when one is given (the API's
+    FileIOExecutor), so the event loop never waits on the disk or the lock.
+    """
+
+    name = "file"
+
+    def __init__(self, path: str, io=None, lease_seconds: float = 60.0):
+        self.path = path
+        self.io = io
+        self.lease_seconds = lease_seconds
+        self._messages: Dict[str, dict] = {}
+        # How far into which log file (inode) _messages is up to date
+        self._inode: Optional[int] = None
+        self._offset = 0
+
+    async def _run(self, fn: Callable[..., Any], *args) -> Any:
+        if self.io is None:
+            return fn(*args)
+        return await self.io.run(fn, *args)
+
+    def _apply(self, event: dict):
+        op, message_id = event.get("op"), event.get("_id")
+        if op == "enqueue":
+            self._messages[message_id] = event["message"]
+        elif op == "complete":
+            self._messages.pop(message_id, None)
+        elif op in ("claim", "retry", "dead") and message_id in self._messages:
+            self._messages[message_id].update(event["fields"])
+
+    def _sync_unlocked(self):
+        """Apply events appended since the last read; the caller holds the lock"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._messages, self._inode, self._offset = {}, None, 0
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # Compacted by another process: replay the new file from the start
+            self._messages, self._inode, self._offset = {}, stat.st_ino, 0
+        if stat.st_size == self._offset:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+        # A torn last line (crash mid-append) stays unread
+        complete = data[:data.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            try:
+                self._apply(json.loads(line))
+            except (json.JSONDecodeError, KeyError, AttributeError):
+                continue
+        self._offset += len(complete)
+
+    def _append_unlocked(self, event: dict):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+            f.flush()
+        self._sync_unlocked()
+
+    def _append(self, event: dict):
+        with file_lock(self.path):
+            self._sync_unlocked()
+            self._append_unlocked(event)
+
+    def load(self):
+        """Replay the event log, then rewrite it with only live messages"""
+        with file_lock(self.path):
+            self._messages, self._inode, self._offset = {}, None, 0
+            self._sync_unlocked()
+            self._compact_unlocked()
+
+    def _compact_unlocked(self):
+        def write(f):
+            for message_id, message in self._messages.items():
+                f.write(json.dumps({"op": "enqueue", "_id": message_id, "message": message},
+                                   ensure_ascii=False, default=str) + "\n")
+        atomic_write_unlocked(self.path, write)
+        stat = os.stat(self.path)
+        self._inode, self._offset = stat.st_ino, stat.st_size
+
+    async def load_async(self):
+        await self._run(self.load)
+
+    async def enqueue(self, message: dict):
+        message = dict(message)
+        message["next_attempt_at"] = message["next_attempt_at"].timestamp()
+        await self._run(self._append, {"op": "enqueue", "_id": message["_id"], "message": message})
+
+    def _claim(self) -> Optional[dict]:
+        with file_lock(self.path):
+            self._sync_unlocked()
+            now = time.time()
+            due = [m for m in self._messages.values()
+                   if (m["status"] == PENDING and m["next_attempt_at"] <= now)
+                   # Lease expired: the worker that claimed it died mid-send
+                   or (m["status"] == SENDING and m.get("lease_until", 0) < now)]
+            if not due:
+                return None
+            message_id = min(due, key=lambda m: m["next_attempt_at"])["_id"]
+            fields = {"status": SENDING, "lease_until": now + self.lease_seconds}
+            self._append_unlocked({"op": "claim", "_id": message_id, "fields": fields})
+            return dict(self._messages[message_id])
+
+    async def claim(self) -> Optional[dict]:
+        return await self._run(self._claim)
+
+    async def complete(self, message: dict):
+        await self._run(self._append, {"op": "complete", "_id": message["_id"]})
+
+    async def retry(self, message: dict, next_attempt_at: datetime, error: str):
+        fields = {"status": PENDING, "attempts": message["attempts"],
+                  "next_attempt_at": next_attempt_at.timestamp(), "last_error": error}
+        await self._run(self._append, {"op": "retry", "_id": message["_id"], "fields": fields})
+
+    async def dead_letter(self, message: dict, error: str):
+        fields = {"status": DEAD, "attempts": message["attempts"], "last_error": error,
+                  "dead_at": datetime.now().isoformat()}
+        await self._run(self._append, {"op": "dead", "_id": message["_id"], "fields": fields})
+
+    def _depth(self) -> Dict[str, int]:
+        # Exclusive: syncing updates this process's view, which the io threads share
+        with file_lock(self.path):
+            self._sync_unlocked()
+            statuses = [m["status"] for m in self._messages.values()]
+        return {"pending": sum(1 for s in statuses if s != DEAD), "dead": statuses.count(DEAD)}
+
+    async def depth(self) -> Dict[str, int]:
+        return await self._run(self._depth)
+
+
+class EmailOutbox:
+    """Persistent email queue drained by a bounded worker pool"""
+
+    def __init__(self, deliver: Deliver, file_store: FileOutboxStore, workers: int = 4,
+                 rate_per_second: float = 2.0, max_attempts: int = 5,
+                 retry_base_seconds: float = 2.0, retry_max_seconds: float = 600.0,
+                 idle_poll_seconds: float = 5.0):
+        self._deliver = deliver
+        self.file_store = file_store
+        self.mongo_store: Optional[MongoOutboxStore] = None
+        self._mongo_available: Callable[[], bool] = lambda: True
+        self.workers = max(1, workers)
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.idle_poll_seconds = idle_poll_seconds
+        self._bucket = TokenBucket(rate_per_second)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+        # Metrics
+        self.enqueued = 0
+        self.sent = 0
+        self.failed_attempts = 0
+        self.dead_lettered = 0
+        self.deferred = 0
+        self._send_latencies = deque(maxlen=1000)
+
+    def attach_mongo(self, collection, breaker=None, available: Optional[Callable[[], bool]] = None):
+        """Use a MongoDB collection as the primary queue
+
+        While available() is False (disconnected, or its breaker is open) the
+        outbox goes straight to the local file instead of waiting on MongoDB.
+        """
+        self.mongo_store = MongoOutboxStore(collection, breaker=breaker)
+        self._mongo_available = available or (lambda: True)
+
+    def _mongo_usable(self) -> bool:
+        return self.mongo_store is not None and self._mongo_available()
+
+    def _stores(self) -> list:
+        return [self.mongo_store, self.file_store] if self._mongo_usable() else [self.file_store]
+
+    async def enqueue(self, kind: str, payload: dict) -> str:
+        """Persist a message, returning its id; MongoDB first, then the local file"""
+        message = {
+            "_id": uuid.uuid4().hex,
+            "kind": kind,
+            "payload": payload,
+            "status": PENDING,
+            "attempts": 0,
+            "created_at": datetime.now().isoformat(),
+            "next_attempt_at": datetime.now(),
+        }
+        if self._mongo_usable():
+            try:
+                await self.mongo_store.enqueue(message)
+            except Exception as e:
+                logger.error(f"❌ Outbox MongoDB enqueue failed, using local file: {e}")
+                await self.file_store.enqueue(message)
+        else:
+            await self.file_store.enqueue(message)
+        self.enqueued += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return message["_id"]
+
+    async def _claim(self):
+        for store in self._stores():
+            try:
+                message = await store.claim()
+            except Exception as e:
+                logger.error(f"❌ Outbox claim from {store.name} failed: {e}")
+                continue
+            if message is not None:
+                return store, message
+        return None, None
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.retry_max_seconds, self.retry_base_seconds * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _process(self, store, message: dict):
+        await self._bucket.acquire()
+        start = time.perf_counter()
+        try:
+            await self._deliver(message)
+        except Exception as e:
+            retry_after = getattr(e, "retry_after", None)
+            if retry_after is not None:
+                # The provider is known to be down (open circuit): wait it out without using an attempt
+                self.deferred += 1
+                await store.retry(message, datetime.now() + timedelta(seconds=max(retry_after, 1.0)), str(e)[:500])
+                return
+            self.failed_attempts += 1
+            message["attempts"] = message.get("attempts", 0) + 1
+            error = str(e)[:500]
+            # Errors may mark themselves permanent (e.g. a 4xx from the provider)
+            if message["attempts"] >= self.max_attempts or not getattr(e, "retryable", True):
+                self.dead_lettered += 1
+                logger.error(f"☠️ Email {message['_id']} ({message['kind']}) dead-lettered after "
+                             f"{message['attempts']} attempts: {error}")
+                await store.dead_letter(message, error)
+            else:
+                delay = self._backoff(message["attempts"])
+                logger.warning(f"⚠️ Email {message['_id']} ({message['kind']}) attempt {message['attempts']} "
+                               f"failed, retrying in {delay:.1f}s: {error}")
+                await store.retry(message, datetime.now() + timedelta(seconds=delay), error)
+            return
+        self._send_latencies.append(time.perf_counter() - start)
+        self.sent += 1
+        await store.complete(message)
+
+    async def _worker(self, number: int):
+        while True:
+            try:
+                # Clear before claiming so an enqueue racing with the claim still wakes us
+                self._wakeup.clear()
+                store, message = await self._claim()
+                if message is None:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=self.idle_poll_seconds)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self._process(store, message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Outbox worker {number} error: {e}")
+                await asyncio.sleep(1)
+
+    async def start(self):
+        """Load the local queue, prepare MongoDB indexes and start the workers"""
+        self._wakeup = asyncio.Event()
+        await self.file_store.load_async()
+        if self.mongo_store is not None:
+            try:
+                await self.mongo_store.ensure_indexes()
+            except Exception as e:
+                logger.error(f"❌ Could not create outbox indexes: {e}")
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"📬 Email outbox started with {self.workers} workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def metrics(self) -> dict:
+        depth = {}
+        for store in self._stores():
+            try:
+                depth[store.name] = await store.depth()
+            except Exception as e:
+                depth[store.name] = {"error": str(e)}
+        return {
+            "workers": self.workers,
+            "rate_per_second": self._bucket.rate,
+            "queue_depth": depth,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "failed_attempts": self.failed_attempts,
+            "dead_lettered": self.dead_lettered,
+            "deferred": self.deferred,
+            "send_latency_ms": latency_summary(self._send_latencies),
+        }
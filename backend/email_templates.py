@@ -0,0 +1,201 @@
+"""
+Pre-rendered email templates.
+
+Templates live in backend/templates/*.html. Each one is processed once:
+class rules from its <style> block are inlined (email clients ignore
+<style>), comments and whitespace are stripped, a plain-text alternative
+is derived, and both are split into static chunks around ``{{slot}}``
+markers. Rendering an email is then a join of the precomputed chunks
+with the recipient's values, so bulk sends never repeat the HTML work.
+
+Compiled templates are cached by (name, version), where the version is a
+hash of the template source: reloading an unchanged file reuses the
+compiled copy, and an edited file gets a fresh version.
+"""
+import hashlib
+import html
+import os
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+SLOT_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+STYLE_BLOCK_PATTERN = re.compile(r"<style[^>]*>(.*?)</style>", re.S | re.I)
+CSS_RULE_PATTERN = re.compile(r"\.([\w-]+)\s*\{([^}]*)\}")
+COMMENT_PATTERN = re.compile(r"<!--.*?-->", re.S)
+CLASS_ATTR_PATTERN = re.compile(r'\sclass="([^"]*)"')
+STYLE_ATTR_PATTERN = re.compile(r'\sstyle="([^"]*)"')
+TAG_PATTERN = re.compile(r"<(\w+)\b[^>]*>")
+
+
+def parse_css_classes(css: str) -> Dict[str, str]:
+    """Map class name -> declarations for simple ``.class { ... }`` rules"""
+    rules = {}
+    for name, body in CSS_RULE_PATTERN.findall(css):
+        declarations = "; ".join(part.strip() for part in body.split(";") if part.strip())
+        rules[name] = declarations
+    return rules
+
+
+def inline_css(source: str) -> str:
+    """Move class rules from <style> blocks onto each element's style attribute"""
+    rules = {}
+    for css in STYLE_BLOCK_PATTERN.findall(source):
+        rules.update(parse_css_classes(css))
+    source = STYLE_BLOCK_PATTERN.sub("", source)
+    if not rules:
+        return source
+
+    def inline_tag(match: re.Match) -> str:
+        tag = match.group(0)
+        class_attr = CLASS_ATTR_PATTERN.search(tag)
+        if not class_attr:
+            return tag
+        declarations = [rules[name] for name in class_attr.group(1).split() if name in rules]
+        tag = tag[:class_attr.start()] + tag[class_attr.end():]
+        if not declarations:
+            return tag
+        # Class rules go first so an element's own inline style still wins
+        style_attr = STYLE_ATTR_PATTERN.search(tag)
+        if style_attr:
+            merged = "; ".join(declarations + [style_attr.group(1).strip().rstrip(";")])
+            return tag[:style_attr.start()] + f' style="{merged};"' + tag[style_attr.end():]
+        end = len(tag) - 1
+        return tag[:end] + f' style="{"; ".join(declarations)};"' + tag[end:]
+
+    return TAG_PATTERN.sub(inline_tag, source)
+
+
+def minify_html(source: str) -> str:
+    """Drop comments and collapse whitespace (templates contain no <pre>)"""
+    source = COMMENT_PATTERN.sub("", source)
+    source = re.sub(r">\s+<", "><", source)
+    source = re.sub(r"\s+", " ", source)
+    return source.strip()
+
+
+def html_to_text(source: str) -> str:
+    """Plain-text alternative: keep headings, paragraphs, list items and link targets"""
+    text = COMMENT_PATTERN.sub("", STYLE_BLOCK_PATTERN.sub("", source))
+    text = re.sub(r'<a\b[^>]*href="([^"]*)"[^>]*>(.*?)</a>',
+                  lambda m: f"{m.group(2).strip()} ({m.group(1)})", text, flags=re.S)
+    text = re.sub(r"<br\s*/?>", "\n", text, flags=re.I)
+    text = re.sub(r"<li\b[^>]*>", "\n- ", text, flags=re.I)
+    text = re.sub(r"</(p|div|h\d|li|ul|tr|table)>", "\n", text, flags=re.I)
+    text = re.sub(r"</td>", " ", text, flags=re.I)
+    text = re.sub(r"<[^>]+>", "", text)
+    text = html.unescape(text)
+    lines = [re.sub(r"[ \t]+", " ", line).strip() for line in text.splitlines()]
+    text = "\n".join(lines)
+    return re.sub(r"\n{3,}", "\n\n", text).strip() + "\n"
+
+
+def compile_slots(source: str) -> Tuple[List[str], List[str]]:
+    """Split text into static chunks and the slot names between them"""
+    parts = SLOT_PATTERN.split(source)
+    return parts[0::2], parts[1::2]
+
+
+class CompiledTemplate:
+    """A template with HTML and text bodies ready for slot substitution"""
+
+    def __init__(self, name: str, source: str):
+        self.name = name
+        self.version = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+        source = COMMENT_PATTERN.sub("", source)
+        self.html = minify_html(inline_css(source))
+        self.text = html_to_text(source)
+        self._html_chunks, self._html_slots = compile_slots(self.html)
+        self._text_chunks, self._text_slots = compile_slots(self.text)
+        self.slots = sorted(set(self._html_slots) | set(self._text_slots))
+
+    @staticmethod
+    def _fill(chunks: List[str], slots: List[str], values: Dict[str, str]) -> str:
+        out = [chunks[0]]
+        for slot, chunk in zip(slots, chunks[1:]):
+            out.append(values.get(slot, ""))
+            out.append(chunk)
+        return "".join(out)
+
+    def render(self, **values: str) -> Dict[str, str]:
+        """HTML and text bodies for one recipient"""
+        plain = {key: str(value) for key, value in values.items()}
+        escaped = {key: html.escape(value) for key, value in plain.items()}
+        return {
+            "html": self._fill(self._html_chunks, self._html_slots, escaped),
+            "text": self._fill(self._text_chunks, self._text_slots, plain),
+        }
+
+
+class TemplateCache:
+    """Compiled templates keyed by (name, version)"""
+
+    def __init__(self, template_dir: str = TEMPLATE_DIR):
+        self.template_dir = template_dir
+        self._compiled: Dict[Tuple[str, str], CompiledTemplate] = {}
+        self._current: Dict[str, CompiledTemplate] = {}
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.template_dir, f"{name}.html")
+
+    def load(self, name: str) -> CompiledTemplate:
+        """(Re)compile a template from disk, reusing the cached version if unchanged"""
+        path = self._path(name)
+        with open(path, "r", encoding="utf-8") as f:
+            source = f.read()
+        version = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+        template = self._compiled.get((name, version))
+        if template is None:
+            template = CompiledTemplate(name, source)
+            self._compiled[(name, version)] = template
+        self._current[name] = template
+        return template
+
+    def preload(self) -> List[str]:
+        """Compile every template in the template directory"""
+        names = sorted(
+            filename[:-5] for filename in os.listdir(self.template_dir) if filename.endswith(".html")
+        )
+        for name in names:
+            self.load(name)
+        return names
+
+    def get(self, name: str) -> CompiledTemplate:
+        """Current compiled template (compiled on first use if not preloaded)"""
+        template = self._current.get(name)
+        if template is None:
+            return self.load(name)
+        return template
+
+    def render(self, template_name: str, /, **values: str) -> Dict[str, str]:
+        """Render a template; values fill its slots (e.g. name, unsubscribe_url)"""
+        return self.get(template_name).render(**values)
+
+    def versions(self) -> Dict[str, Optional[str]]:
+        return {name: template.version for name, template in self._current.items()}
+
+
+def personalized_message(templates: TemplateCache, template_name: str, subject: str, sender: str,
+                         unsubscribe_url_template: str) -> Callable[[dict], dict]:
+    """Builder for Resend params from a subscriber ({"email", "name"})"""
+
+    def build(recipient: dict) -> dict:
+        to_email = recipient["email"]
+        unsubscribe_url = unsubscribe_url_template.format(email=quote(to_email))
+        body = templates.render(
+            template_name,
+            name=(recipient.get("name") or "").strip() or "there",
+            unsubscribe_url=unsubscribe_url
+        )
+        return {
+            "from": sender,
+            "to": [to_email],
+            "subject": subject,
+            "html": body["html"],
+            "text": body["text"],
+            "headers": {"List-Unsubscribe": f"<{unsubscribe_url}>"},
+        }
+
+    return build
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Stand-in Resend API for local email throughput tests.
+
+Accepts POST /emails and POST /emails/batch like api.resend.com, waits a
+configurable latency to mimic the real round trip, and returns fake ids.
+Nothing is delivered. Point the waitlist API at it with:
+
+    python fake_resend_server.py --port 8025 --latency-ms 80
+    RESEND_API_URL=http://127.0.0.1:8025 RESEND_API_KEY=re_test uvicorn server:app
+
+Batch requests honour the Idempotency-Key header like the real API.
+GET /stats reports how many emails it has accepted.
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, HTTPException, Request
+
+MAX_BATCH_SIZE = 100
+
+
+def create_app(latency_ms: float = 50.0, jitter_ms: float = 10.0, error_rate: float = 0.0) -> FastAPI:
+    app = FastAPI(title="Fake Resend API")
+    stats = {"emails": 0, "requests": 0, "errors": 0, "replayed": 0, "started": time.time()}
+    idempotent_responses = {}
+
+    async def respond_like_resend(request: Request):
+        stats["requests"] += 1
+        if not request.headers.get("authorization", "").startswith("Bearer "):
+            stats["errors"] += 1
+            raise HTTPException(status_code=401, detail="Missing API key")
+        delay = max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        if error_rate and random.random() < error_rate:
+            stats["errors"] += 1
+            raise HTTPException(status_code=500, detail="Simulated Resend failure")
+
+    @app.post("/emails")
+    async def send_email(request: Request):
+        params = await request.json()
+        if not params.get("to") or not params.get("from"):
+            raise HTTPException(status_code=422, detail="`to` and `from` are required")
+        await respond_like_resend(request)
+        stats["emails"] += 1
+        return {"id": str(uuid.uuid4())}
+
+    @app.post("/emails/batch")
+    async def send_batch(request: Request):
+        batch = await request.json()
+        if not isinstance(batch, list) or len(batch) > MAX_BATCH_SIZE:
+            raise HTTPException(status_code=422, detail=f"batch must be a list of at most {MAX_BATCH_SIZE} emails")
+        key = request.headers.get("idempotency-key")
+        if key in idempotent_responses:
+            # Same key within Resend's 24h window: answer again without sending
+            stats["replayed"] += 1
+            return idempotent_responses[key]
+        await respond_like_resend(request)
+        stats["emails"] += len(batch)
+        response = {"data": [{"id": str(uuid.uuid4())} for _ in batch]}
+        if key:
+            idempotent_responses[key] = response
+        return response
+
+    @app.get("/stats")
+    async def get_stats():
+        elapsed = time.time() - stats["started"]
+        return {**stats, "emails_per_second": round(stats["emails"] / elapsed, 1) if elapsed else 0}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="simulated API round trip")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    args = parser.parse_args()
+
+    print(f"📭 Fake Resend API on http://{args.host}:{args.port} "
+          f"({args.latency_ms:.0f}ms latency, {args.error_rate:.0%} errors)")
+    uvicorn.run(create_app(args.latency_ms, args.jitter_ms, args.error_rate),
+                host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Multi-process-safe JSON file writes.
+
+Several gunicorn/uvicorn workers share the JSON backups, so every writer
+takes an advisory fcntl lock on a sidecar "<file>.lock" (exclusive for
+writers, shared for readers) and replaces files atomically: the new content
+goes to a temp file in the same directory, is fsynced, then renamed over
+the original. A crash mid-write leaves the previous file intact, and two
+workers can no longer truncate or interleave each other's writes.
+
+The lock is not re-entrant: code that already holds it must call the
+*_unlocked variants rather than taking it again.
+
+All of this blocks, so async code runs it on a FileIOExecutor: a few
+dedicated threads behind a bounded queue. Loading or rewriting a large
+backup then never stalls the event loop, and a burst of file work waits
+for a slot instead of piling up unbounded.
+"""
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import IO, Any, Callable, Iterator, TypeVar
+
+from latency_stats import latency_summary
+
+T = TypeVar("T")
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single process, no advisory locks
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: str, exclusive: bool = True) -> Iterator[None]:
+    """Hold an advisory lock on path's sidecar lock file (blocks until granted)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write_unlocked(path: str, write: Callable[[IO[str]], None]):
+    """temp file + fsync + rename, with write(f) filling the temp file; the caller holds the exclusive lock"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    # Persist the rename itself
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def atomic_write_json_unlocked(path: str, data: Any, indent: int = 2):
+    """Replace path with data; the caller holds the exclusive lock"""
+    atomic_write_unlocked(path, lambda f: json.dump(data, f, indent=indent, ensure_ascii=False))
+
+
+def atomic_write_json(path: str, data: Any, indent: int = 2):
+    """Replace path with data under the exclusive lock"""
+    with file_lock(path):
+        atomic_write_json_unlocked(path, data, indent)
+
+
+def read_json(path: str, default: Any = None) -> Any:
+    """Read path under a shared lock (default if it doesn't exist)"""
+    with file_lock(path, exclusive=False):
+        if not os.path.exists(path):
+            return default
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def update_json(path: str, mutate: Callable[[Any], Any], default: Any = None) -> Any:
+    """Read-modify-write under one exclusive lock, so concurrent updates can't be lost"""
+    with file_lock(path):
+        data = default
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        result = mutate(data)
+        if result is not None:
+            data = result
+        atomic_write_json_unlocked(path, data)
+        return data
+
+
+class FileIOExecutor:
+    """Dedicated threads for blocking file-store work, with a bounded queue"""
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 256, name: str = "file-io"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        # Running + queued operations; callers past the limit wait for a slot (backpressure)
+        self._slots = asyncio.Semaphore(max_workers + max_queue)
+        self.depth = 0
+        self.max_depth_seen = 0
+        self.completed = 0
+        self.failed = 0
+        self.waited_for_slot = 0
+        self._wait_latencies = deque(maxlen=1000)
+        self._run_latencies = deque(maxlen=1000)
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Run fn(*args, **kwargs) on an I/O thread without blocking the event loop"""
+        if self._slots.locked():
+            self.waited_for_slot += 1
+        queued_at = time.perf_counter()
+        async with self._slots:
+            self.depth += 1
+            self.max_depth_seen = max(self.max_depth_seen, self.depth)
+            try:
+                started_at = None
+
+                def call():
+                    nonlocal started_at
+                    started_at = time.perf_counter()
+                    return fn(*args, **kwargs)
+
+                result = await asyncio.wrap_future(self._executor.submit(call))
+                self.completed += 1
+                return result
+            except BaseException:
+                self.failed += 1
+                raise
+            finally:
+                self.depth -= 1
+                finished_at = time.perf_counter()
+                if started_at is not None:
+                    self._wait_latencies.append(started_at - queued_at)
+                    self._run_latencies.append(finished_at - started_at)
+
+    def metrics(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "depth": self.depth,
+            "max_depth_seen": self.max_depth_seen,
+            "completed": self.completed,
+            "failed": self.failed,
+            "waited_for_slot": self.waited_for_slot,
+            "queue_wait_ms": latency_summary(self._wait_latencies),
+            "run_ms": latency_summary(self._run_latencies),
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,81 @@
+"""
+Background health prober.
+
+Runs each registered probe on an interval and caches the result with a
+timestamp, so health endpoints answer from memory instead of pinging
+MongoDB or touching the disk on every request.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# A probe returns {"ok": bool, "status": str, ...extra fields}
+Probe = Callable[[], Awaitable[dict]]
+
+
+class HealthProber:
+    """Periodically runs health probes and caches their results"""
+
+    def __init__(self, probes: Dict[str, Probe], interval_seconds: float = 15.0):
+        self._probes = probes
+        self.interval_seconds = interval_seconds
+        self._results: Dict[str, dict] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run_probe(self, name: str, probe: Probe) -> dict:
+        start = time.perf_counter()
+        try:
+            result = await probe()
+        except Exception as e:
+            result = {"ok": False, "status": f"❌ Probe error: {e}"}
+        result["checked_at"] = datetime.now().isoformat()
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        result["_checked_monotonic"] = time.monotonic()
+        self._results[name] = result
+        return result
+
+    async def probe_all(self):
+        """Run every probe now (concurrently)"""
+        await asyncio.gather(*(self._run_probe(name, probe) for name, probe in self._probes.items()))
+
+    async def _run(self):
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.error(f"❌ Health probe cycle failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def result(self, name: str) -> Optional[dict]:
+        """Cached result for one probe, with its age in seconds"""
+        cached = self._results.get(name)
+        if cached is None:
+            return None
+        result = {key: value for key, value in cached.items() if not key.startswith("_")}
+        result["age_seconds"] = round(time.monotonic() - cached["_checked_monotonic"], 3)
+        return result
+
+    def is_fresh(self, name: str, max_age_seconds: Optional[float] = None) -> bool:
+        """True if the probe ran within max_age (default: three intervals)"""
+        cached = self._results.get(name)
+        if cached is None:
+            return False
+        max_age = max_age_seconds if max_age_seconds is not None else self.interval_seconds * 3
+        return time.monotonic() - cached["_checked_monotonic"] <= max_age
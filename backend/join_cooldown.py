@@ -0,0 +1,145 @@
+"""
+Per-email join cooldown.
+
+After an email joins (or re-joins) the waitlist, further joins for it are
+short-circuited for a configurable window, so repeated submits and bots
+cannot trigger repeat welcome emails or storage work. Cooldowns live in a
+bounded in-memory TTL/LRU map; with a MongoDB collection attached they are
+also shared between workers, using an upsert guarded by the unique _id so
+exactly one worker wins each window. A TTL index removes expired rows, so
+expiries are stored in UTC (MongoDB reads every stored date as UTC). While
+MongoDB is unavailable or its breaker is open, joins use the local map only.
+"""
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+
+class JoinCooldown:
+    """TTL/LRU cooldown map keyed by normalized email"""
+
+    def __init__(self, window_seconds: float = 600.0, max_entries: int = 100_000):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._until: "OrderedDict[str, float]" = OrderedDict()
+        self.collection = None
+        self.breaker = None
+        self._available: Callable[[], bool] = lambda: True
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.shared_errors = 0
+
+    async def attach_mongo(self, collection, breaker=None, available: Optional[Callable[[], bool]] = None):
+        """Share cooldowns between workers through a MongoDB collection (calls go through breaker)"""
+        await collection.create_index("until", name="until_ttl_idx", expireAfterSeconds=0)
+        self.collection = collection
+        self.breaker = breaker
+        self._available = available or (lambda: True)
+
+    def detach_mongo(self):
+        self.collection = None
+
+    def _shared(self) -> bool:
+        return self.collection is not None and self._available()
+
+    async def _call(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        if self.breaker is None:
+            return await fn(*args, **kwargs)
+        return await self.breaker.call(fn, *args, **kwargs)
+
+    def _local_hit(self, email: str, now: float) -> bool:
+        until = self._until.get(email)
+        if until is None:
+            return False
+        if until <= now:
+            del self._until[email]
+            return False
+        return True
+
+    def _remember(self, email: str, until: float):
+        self._until[email] = until
+        self._until.move_to_end(email)
+        while len(self._until) > self.max_entries:
+            self._until.popitem(last=False)
+            self.evictions += 1
+
+    async def _claim_shared(self, email: str) -> Optional[float]:
+        """Claim the window in MongoDB; returns the holder's expiry if another worker has it"""
+        now = datetime.now(timezone.utc)
+        try:
+            await self._call(
+                self.collection.update_one,
+                {"_id": email, "until": {"$lte": now}},
+                {"$set": {"until": now + timedelta(seconds=self.window_seconds)}},
+                upsert=True
+            )
+            return None
+        except DuplicateKeyError:
+            # A live row exists for this email: someone else holds the window
+            doc = await self._call(self.collection.find_one, {"_id": email}, {"until": 1})
+            until = doc.get("until") if doc else None
+            if until is None:
+                remaining = self.window_seconds
+            else:
+                # Read back naive unless the client is tz_aware; either way it's UTC
+                remaining = (until.replace(tzinfo=timezone.utc) - now).total_seconds()
+            return time.monotonic() + max(0.0, remaining)
+
+    async def check(self, email: str) -> bool:
+        """True if the email is cooling down (skip the join); otherwise start its window"""
+        if self.window_seconds <= 0:
+            return False
+        now = time.monotonic()
+        if self._local_hit(email, now):
+            self.hits += 1
+            return True
+
+        if self._shared():
+            try:
+                held_until = await self._claim_shared(email)
+            except Exception as e:
+                self.shared_errors += 1
+                logger.warning(f"⚠️ Shared join cooldown unavailable, using local only: {e}")
+                held_until = None
+            if held_until is not None:
+                self._remember(email, held_until)
+                self.hits += 1
+                self.shared_hits += 1
+                return True
+
+        self._remember(email, now + self.window_seconds)
+        self.misses += 1
+        return False
+
+    async def release(self, email: str):
+        """Drop an email's window (e.g. when its save failed) so a retry goes through"""
+        self._until.pop(email, None)
+        if self._shared():
+            try:
+                await self._call(self.collection.delete_one, {"_id": email})
+            except Exception as e:
+                self.shared_errors += 1
+                logger.warning(f"⚠️ Could not release shared join cooldown for {email}: {e}")
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "window_seconds": self.window_seconds,
+            "shared": self.collection is not None,
+            "entries": len(self._until),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "shared_errors": self.shared_errors,
+        }
@@ -0,0 +1,27 @@
+"""
+Latency summaries for the /api/admin/metrics sections.
+
+The write batcher, email outbox, file I/O executor and loop monitor each
+keep a bounded deque of recent samples in seconds; this turns one into the
+p50/p99/max milliseconds they all report.
+"""
+from typing import Iterable, Optional
+
+
+def latency_summary(samples: Iterable[float], max_seconds: Optional[float] = None) -> dict:
+    """p50/p99/max in ms over samples in seconds (None while there are none)
+
+    max_seconds overrides the window's maximum, for callers that track an
+    all-time maximum beyond the samples they keep.
+    """
+    latencies = sorted(samples)
+
+    def percentile(p: float) -> Optional[float]:
+        if not latencies:
+            return None
+        return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 3)
+
+    if max_seconds is None and latencies:
+        max_seconds = latencies[-1]
+    return {"p50": percentile(0.50), "p99": percentile(0.99),
+            "max": round(max_seconds * 1000, 3) if max_seconds is not None else None}
@@ -0,0 +1,166 @@
+"""
+Event-loop lag monitor and blocking-call detector.
+
+A sampler task asks the loop to wake it every interval and records how
+late the wake-up was (the lag every request on the loop sees) in a
+histogram. A watchdog thread watches the sampler's heartbeat: once the
+loop has been stuck for longer than the threshold, it grabs the loop
+thread's current stack - the code that is blocking right now - logs it,
+and keeps it in a bounded report of recent blocking calls.
+
+Reading another thread's frame through sys._current_frames() is safe and
+cheap; the watchdog only does it while the loop is stuck.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import List, Optional
+
+from latency_stats import latency_summary
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the lag histogram buckets
+LAG_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Innermost frames kept per captured stack
+STACK_DEPTH = 25
+
+
+class EventLoopMonitor:
+    """Samples event-loop lag and captures the stack of calls that block it"""
+
+    def __init__(self, interval_seconds: float = 0.1, threshold_seconds: float = 0.1, max_reports: int = 50):
+        self.interval_seconds = interval_seconds
+        self.threshold_seconds = threshold_seconds
+        self.histogram = {bucket: 0 for bucket in LAG_BUCKETS_MS}
+        self.overflow = 0
+        self.samples = 0
+        self.max_lag_seconds = 0.0
+        self._lags = deque(maxlen=1000)
+        self.blocking_calls = 0
+        self._reports = deque(maxlen=max_reports)
+        self._current_report: Optional[dict] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._reports_lock = threading.Lock()
+        self.started_at: Optional[datetime] = None
+
+    def _record_lag(self, lag: float):
+        self.samples += 1
+        self._lags.append(lag)
+        self.max_lag_seconds = max(self.max_lag_seconds, lag)
+        lag_ms = lag * 1000
+        for bucket in LAG_BUCKETS_MS:
+            if lag_ms <= bucket:
+                self.histogram[bucket] += 1
+                return
+        self.overflow += 1
+
+    async def _sample(self):
+        while True:
+            expected = time.monotonic() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            now = time.monotonic()
+            self._heartbeat = now
+            self._record_lag(max(0.0, now - expected))
+            self._finish_stall(now)
+
+    def _finish_stall(self, now: float):
+        """The loop is responsive again - close the open blocking report with its full duration"""
+        with self._reports_lock:
+            report = self._current_report
+            if report is not None:
+                report["blocked_ms"] = round((now - report["_started"]) * 1000, 1)
+                report["ongoing"] = False
+                self._current_report = None
+
+    def _capture(self, stalled_since: float) -> dict:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame, limit=STACK_DEPTH) if frame is not None else []
+        task = asyncio.current_task(self._loop) if self._loop is not None else None
+        return {
+            "detected_at": datetime.now().isoformat(),
+            "blocked_ms": round((time.monotonic() - stalled_since) * 1000, 1),
+            "ongoing": True,
+            "task": task.get_name() if task is not None else None,
+            "coroutine": getattr(task.get_coro(), "__qualname__", None) if task is not None else None,
+            "stack": [line.rstrip() for line in stack],
+            "_started": stalled_since,
+        }
+
+    def _watch(self):
+        check_every = max(0.01, self.threshold_seconds / 2)
+        while not self._stopping.wait(check_every):
+            # The heartbeat is due every interval; anything past that plus the threshold is a stall
+            stalled_since = self._heartbeat + self.interval_seconds
+            if time.monotonic() - stalled_since < self.threshold_seconds:
+                continue
+            with self._reports_lock:
+                if self._current_report is not None and self._current_report["_started"] == stalled_since:
+                    continue  # already reported this stall
+                report = self._capture(stalled_since)
+                self._current_report = report
+                self._reports.append(report)
+                self.blocking_calls += 1
+            logger.warning(
+                f"🐢 Event loop blocked for {report['blocked_ms']:.0f}ms+ in task {report['task']} "
+                f"({report['coroutine']}):\n" + "\n".join(report["stack"])
+            )
+
+    def start(self):
+        """Start sampling on the running loop plus the watchdog thread"""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self.started_at = datetime.now()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+        logger.info(f"🩺 Event loop monitor started (every {self.interval_seconds * 1000:.0f}ms, "
+                    f"blocking threshold {self.threshold_seconds * 1000:.0f}ms)")
+
+    async def stop(self):
+        self._stopping.set()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    def metrics(self) -> dict:
+        histogram = {f"le_{bucket}": count for bucket, count in self.histogram.items()}
+        histogram["le_+Inf"] = self.overflow
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_ms": self.interval_seconds * 1000,
+            "threshold_ms": self.threshold_seconds * 1000,
+            "samples": self.samples,
+            "lag_ms": latency_summary(self._lags, max_seconds=self.max_lag_seconds if self.samples else None),
+            "lag_histogram_ms": histogram,
+            "blocking_calls": self.blocking_calls,
+        }
+
+    def report(self, limit: int = 20) -> List[dict]:
+        """Most recent blocking calls first, with the stack captured while the loop was stuck"""
+        with self._reports_lock:
+            reports = list(self._reports)[-limit:]
+            return [{key: value for key, value in report.items() if not key.startswith("_")}
+                    for report in reversed(reports)]
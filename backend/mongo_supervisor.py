@@ -0,0 +1,100 @@
+"""
+MongoDB connection supervisor.
+
+Keeps trying to (re)connect while the API runs in JSON-only mode, with
+exponential backoff and full jitter so several workers don't reconnect in
+lock-step. Once connected, and whenever a JSON-only outage window is
+open while MongoDB is reachable again, it replays the writes from that
+window into MongoDB.
+
+The supervisor only sequences the work; connecting, swapping the client
+in and replaying are callbacks supplied by the server.
+"""
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def jittered_backoff(attempt: int, base_seconds: float, max_seconds: float) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(max, base * 2^attempt)]"""
+    return random.uniform(0, min(max_seconds, base_seconds * (2 ** attempt)))
+
+
+class MongoSupervisor:
+    """Background reconnect + replay loop"""
+
+    def __init__(self,
+                 is_connected: Callable[[], bool],
+                 connect: Callable[[], Awaitable[bool]],
+                 needs_replay: Callable[[], bool],
+                 replay: Callable[[], Awaitable[int]],
+                 base_delay_seconds: float = 1.0,
+                 max_delay_seconds: float = 60.0,
+                 check_interval_seconds: float = 10.0):
+        self._is_connected = is_connected
+        self._connect = connect
+        self._needs_replay = needs_replay
+        self._replay = replay
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self.attempts = 0
+        self.reconnects = 0
+        self.replayed = 0
+        self.last_error: Optional[str] = None
+
+    async def _reconnect(self) -> bool:
+        try:
+            connected = await self._connect()
+        except Exception as e:
+            connected = False
+            self.last_error = str(e)[:300]
+        if connected:
+            self.attempts = 0
+            self.reconnects += 1
+            return True
+        delay = jittered_backoff(self.attempts, self.base_delay_seconds, self.max_delay_seconds)
+        self.attempts += 1
+        logger.info(f"🔌 MongoDB still unavailable, retrying in {delay:.1f}s (attempt {self.attempts})")
+        await asyncio.sleep(delay)
+        return False
+
+    async def _run(self):
+        while True:
+            try:
+                if not self._is_connected():
+                    if not await self._reconnect():
+                        continue
+                if self._needs_replay():
+                    self.replayed += await self._replay()
+            except Exception as e:
+                self.last_error = str(e)[:300]
+                logger.error(f"❌ MongoDB supervisor error: {e}")
+            await asyncio.sleep(self.check_interval_seconds)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def metrics(self) -> dict:
+        return {
+            "connected": self._is_connected(),
+            "reconnect_attempts": self.attempts,
+            "reconnects": self.reconnects,
+            "replayed_entries": self.replayed,
+            "replay_pending": self._needs_replay(),
+            "last_error": self.last_error,
+        }
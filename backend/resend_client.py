@@ -0,0 +1,120 @@
+"""
+Async Resend client.
+
+Talks to the Resend REST API over one shared httpx connection pool, so
+sends run natively on the event loop and reuse keep-alive TLS
+connections instead of borrowing an executor thread and opening a new
+connection per email (which is what the sync SDK under asyncio.to_thread
+does). Point ``base_url`` at fake_resend_server.py for local load tests.
+"""
+import logging
+from typing import List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.resend.com"
+
+
+class ResendError(Exception):
+    """Resend rejected a request (or could not be reached)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def retryable(self) -> bool:
+        """Rate limits, server errors and network failures are worth retrying"""
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+def is_outage(error: BaseException) -> bool:
+    """Network errors and 5xx count towards the Resend circuit breaker; 4xx answers don't"""
+    return isinstance(error, ResendError) and (error.status_code is None or error.status_code >= 500)
+
+
+class AsyncResendClient:
+    """Pooled async client for the Resend emails API"""
+
+    def __init__(self, api_key: Optional[str], base_url: str = DEFAULT_BASE_URL,
+                 pool_size: int = 20, timeout_seconds: float = 10.0,
+                 connect_timeout_seconds: float = 5.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout_seconds = timeout_seconds
+        self.connect_timeout_seconds = connect_timeout_seconds
+        # e.g. httpx.ASGITransport(fake_resend_server.create_app()) in tests
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self.requests_ok = 0
+        self.requests_failed = 0
+
+    async def start(self):
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                "User-Agent": "recalibrate-waitlist",
+            },
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+            ),
+            timeout=httpx.Timeout(self.timeout_seconds, connect=self.connect_timeout_seconds),
+            transport=self.transport,
+        )
+        logger.info(f"📮 Resend client ready ({self.base_url}, pool of {self.pool_size})")
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _post(self, path: str, body, idempotency_key: Optional[str] = None) -> dict:
+        if self._client is None:
+            # Used outside the app lifespan (scripts, tests): open the pool lazily
+            await self.start()
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+        try:
+            response = await self._client.post(path, json=body, headers=headers)
+        except httpx.HTTPError as e:
+            self.requests_failed += 1
+            raise ResendError(f"Resend request failed: {e!r}") from e
+        if response.status_code >= 400:
+            self.requests_failed += 1
+            try:
+                detail = response.json().get("message", response.text)
+            except ValueError:
+                detail = response.text
+            raise ResendError(f"Resend returned {response.status_code}: {detail}", response.status_code)
+        self.requests_ok += 1
+        return response.json()
+
+    async def send(self, params: dict, idempotency_key: Optional[str] = None) -> dict:
+        """Send one email; params use the same shape as resend.Emails.send"""
+        return await self._post("/emails", params, idempotency_key)
+
+    async def send_batch(self, params: List[dict], idempotency_key: Optional[str] = None) -> dict:
+        """Send up to 100 emails in one request (POST /emails/batch).
+
+        Resend remembers an idempotency key for 24 hours, so retrying a
+        batch with the same key never delivers it twice.
+        """
+        return await self._post("/emails/batch", params, idempotency_key)
+
+    def metrics(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "pool_size": self.pool_size,
+            "timeout_seconds": self.timeout_seconds,
+            "open": self._client is not None,
+            "requests_ok": self.requests_ok,
+            "requests_failed": self.requests_failed,
+        }
@@ -1,6 +1,6 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Request, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Query, Request, BackgroundTasks
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -8,14 +8,44 @@ from pydantic import BaseModel, EmailStr, validator
 import json
 import os
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 import logging
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from pymongo import ASCENDING, ReplaceOne, UpdateOne
+from pymongo.errors import ConnectionFailure, DuplicateKeyError, OperationFailure, ServerSelectionTimeoutError
 import asyncio
 import os
-import resend
+import sqlite3
 from dotenv import load_dotenv
+from subscriber_index import SubscriberIndex, normalize_email
+from subscriber_counter import SubscriberCounter
+from waitlist_journal import WaitlistJournal
+from sqlite_store import SQLiteWaitlistStore
+from storage_backends import (
+    DualWriteBackend, JSONBackend, MongoBackend, SQLiteBackend, decode_raw_rows, decode_raw_rows_async
+)
+from file_storage import FileIOExecutor, update_json
+from write_batcher import WriteBatcher
+from health_prober import HealthProber
+from email_outbox import EmailOutbox, FileOutboxStore
+from join_cooldown import JoinCooldown
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from mongo_supervisor import MongoSupervisor
+from drift_detector import DriftDetector
+from single_flight import SingleFlight
+from loop_monitor import EventLoopMonitor
+from signup_rollups import (
+    BUCKET_KEY_LENGTHS, MAX_SERIES_POINTS, bucket_key, bucket_range, rollup_counts, store_series
+)
+from email_templates import TemplateCache, personalized_message
+from email_campaign import (
+    MAX_CHUNK_SIZE, RUNNING, CampaignRunner, CampaignStateError, FileCampaignStore, MongoCampaignStore,
+    campaign_state_id
+)
+from resend_client import AsyncResendClient, is_outage
+from waitlist_export import (
+    EXPORT_FORMATS, EXPORT_MEDIA_TYPES, encode_csv, encode_json, encode_ndjson, parse_cursor
+)
 from fastapi import FastAPI, HTTPException, Request, BackgroundTasks
 from fastapi.responses import FileResponse
 from pydantic import BaseModel, EmailStr, validator
@@ -29,22 +59,62 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Resend Configuration
-if os.environ.get("RESEND_API_KEY"):
-    resend.api_key = os.environ.get("RESEND_API_KEY")
-else:
+if not os.environ.get("RESEND_API_KEY"):
     logger.warning("⚠️ RESEND_API_KEY not found. Emails will not send.")
 
+RESEND_API_URL = os.environ.get("RESEND_API_URL", "https://api.resend.com")  # point at fake_resend_server.py locally
+RESEND_POOL_SIZE = int(os.environ.get("RESEND_POOL_SIZE", "20"))
+RESEND_TIMEOUT_SECONDS = float(os.environ.get("RESEND_TIMEOUT_SECONDS", "10"))
+RESEND_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("RESEND_CONNECT_TIMEOUT_SECONDS", "5"))
+
+# Resend circuit breaker: outages (network errors, 5xx) stop sends; queued emails wait in the outbox
+RESEND_BREAKER_FAILURES = int(os.environ.get("RESEND_BREAKER_FAILURES", "5"))
+RESEND_BREAKER_RESET_SECONDS = float(os.environ.get("RESEND_BREAKER_RESET_SECONDS", "30"))
+
+# Shared keep-alive connection pool for Resend (opened in lifespan)
+resend_client = AsyncResendClient(
+    os.environ.get("RESEND_API_KEY"),
+    base_url=RESEND_API_URL,
+    pool_size=RESEND_POOL_SIZE,
+    timeout_seconds=RESEND_TIMEOUT_SECONDS,
+    connect_timeout_seconds=RESEND_CONNECT_TIMEOUT_SECONDS
+)
+
 # Default sender
 SENDER_EMAIL = os.environ.get("MAIL_FROM", "info@recalibratepain.com")
 
+# Unsubscribe link placed in emails ({email} is the URL-quoted recipient)
+UNSUBSCRIBE_URL_TEMPLATE = os.environ.get(
+    "UNSUBSCRIBE_URL_TEMPLATE", "mailto:info@recalibratepain.com?subject=Unsubscribe%20{email}"
+)
+
+resend_breaker = CircuitBreaker(
+    "resend",
+    failure_threshold=RESEND_BREAKER_FAILURES,
+    reset_timeout=RESEND_BREAKER_RESET_SECONDS,
+    is_failure=is_outage
+)
+
+# Email templates, compiled once and cached by version
+email_templates = TemplateCache()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    journal_compaction_task = None
+    
     # Startup
+    # Watch the loop first, so blocking calls during startup are caught too
+    if LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    
     try:
         port = os.environ.get("PORT", os.environ.get("API_PORT", "8001"))
         logger.info(f"🚀 RecalibratePain API v3.0.0 starting on port {port}")
-        logger.info(f"📁 JSON backup location: {WAITLIST_FILE}")
+        if sqlite_store is not None:
+            logger.info(f"📁 SQLite fallback store: {SQLITE_FILE}")
+        else:
+            logger.info(f"📁 JSON backup location: {WAITLIST_FILE} (+ journal {WAITLIST_JOURNAL_FILE})")
         logger.info(f"🗄️ MongoDB Database: {DB_NAME}")
         logger.info(f"📋 Collection: {COLLECTION_NAME}")
         
@@ -58,14 +128,50 @@ async def lifespan(app: FastAPI):
             logger.error(f"❌ MongoDB initialization failed: {e}")
             mongo_connected = False
         
-        # Load initial data (always works with JSON fallback)
+        # Keep retrying MongoDB in the background and replay JSON-only writes once it's back
+        if MONGO_URL:
+            if not mongo_connected:
+                mark_json_only_since("")
+                logger.info("🔄 MongoDB will be retried in the background")
+            mongo_supervisor.start()
+        
+        # Load initial data into the subscriber index (always works with JSON fallback)
         try:
-            waitlist = await get_combined_waitlist()
-            logger.info(f"📊 Total subscribers loaded: {len(waitlist)}")
+            loaded = await load_subscriber_index()
+            logger.info(f"📊 Total subscribers loaded: {loaded}")
         except Exception as e:
             logger.error(f"❌ Error loading initial data: {e}")
             logger.info("📊 Total subscribers loaded: 0 (using fallback)")
         
+        # Compile email templates up front so the first send doesn't pay for it
+        try:
+            templates = email_templates.preload()
+            logger.info(f"✉️ Email templates ready: {', '.join(templates)}")
+        except Exception as e:
+            logger.error(f"❌ Failed to preload email templates: {e}")
+        
+        # Open the Resend connection pool before the outbox starts sending
+        await resend_client.start()
+        
+        # Drain queued emails (MongoDB-backed when connected, local file otherwise)
+        await email_outbox.start()
+        
+        # Cache MongoDB/JSON health in the background for the health endpoints
+        health_prober.start()
+        
+        # Single writer that group-commits concurrent joins
+        write_batcher.start()
+        
+        # Serve the subscriber count from memory, refreshed in the background
+        subscriber_counter.start()
+        
+        # Compare MongoDB and JSON bucket digests in the background
+        if DRIFT_CHECK_ENABLED and MONGO_URL:
+            drift_detector.start()
+        
+        # Periodically fold the append-only journal back into waitlist.json
+        journal_compaction_task = asyncio.create_task(run_journal_compaction())
+        
         # Show storage status
         if mongo_connected:
             logger.info("✅ Dual storage active: MongoDB + JSON backup")
@@ -83,6 +189,23 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("🔄 API shutting down...")
+    await mongo_supervisor.stop()
+    await drift_detector.stop()
+    await health_prober.stop()
+    for runner in campaign_runners.values():
+        runner.stop()
+    await asyncio.gather(*campaign_tasks.values(), return_exceptions=True)
+    await email_outbox.stop()
+    await resend_client.aclose()
+    await write_batcher.stop()
+    await subscriber_counter.stop()
+    if journal_compaction_task is not None:
+        journal_compaction_task.cancel()
+    await file_io.run(compact_json_waitlist)
+    if sqlite_store is not None:
+        sqlite_store.close()
+    file_io.shutdown()
+    await loop_monitor.stop()
 
 app = FastAPI(
     title="RecalibratePain Waitlist API", 
@@ -157,6 +280,14 @@ class PartnerContactForm(BaseModel):
             raise ValueError('Email address too long')
         return v.lower().strip()
 
+class CampaignRequest(BaseModel):
+    campaign_id: str
+    template: str = "welcome_email"
+    subject: str = "Recalibrate Cohort 1 is launching"
+    chunk_size: int = MAX_CHUNK_SIZE
+    concurrency: Optional[int] = None
+    dry_run: bool = False
+
 class WaitlistResponse(BaseModel):
     success: bool
     message: str
@@ -165,9 +296,74 @@ class WaitlistResponse(BaseModel):
 
 # Storage configuration
 WAITLIST_FILE = os.path.join(os.path.dirname(__file__), "waitlist.json")
+WAITLIST_JOURNAL_FILE = os.path.join(os.path.dirname(__file__), "waitlist.jsonl")
+# Fallback store behind MongoDB: "json" (snapshot + journal) or "sqlite" (WAL database, indexed)
+FALLBACK_STORE = os.environ.get("FALLBACK_STORE", "json").lower()
+SQLITE_FILE = os.environ.get("SQLITE_FILE", os.path.join(os.path.dirname(__file__), "waitlist.sqlite3"))
+PARTNERS_FILE = os.environ.get("PARTNERS_FILE", "/app/backend/data/partners.json")
+JOURNAL_COMPACT_INTERVAL = float(os.environ.get("JOURNAL_COMPACT_INTERVAL", "3600"))
+# Threads for blocking file-store work (JSON backup, partners, outbox/campaign files) and how many
+# operations may wait for them before callers are held back
+FILE_IO_WORKERS = int(os.environ.get("FILE_IO_WORKERS", "2"))
+FILE_IO_MAX_QUEUE = int(os.environ.get("FILE_IO_MAX_QUEUE", "256"))
+
+# Seconds between background MongoDB pings / JSON backup checks
+HEALTH_PROBE_INTERVAL = float(os.environ.get("HEALTH_PROBE_INTERVAL", "15"))
+
+# Email outbox: persistent queue drained by a bounded worker pool
+OUTBOX_COLLECTION_NAME = "EmailOutbox"
+EMAIL_OUTBOX_FILE = os.path.join(os.path.dirname(__file__), "email_outbox.jsonl")
+EMAIL_WORKERS = int(os.environ.get("EMAIL_WORKERS", "4"))
+EMAIL_RATE_PER_SECOND = float(os.environ.get("EMAIL_RATE_PER_SECOND", "2"))  # Resend's default API rate limit
+EMAIL_MAX_ATTEMPTS = int(os.environ.get("EMAIL_MAX_ATTEMPTS", "5"))
+EMAIL_RETRY_BASE_SECONDS = float(os.environ.get("EMAIL_RETRY_BASE_SECONDS", "2"))
+
+# Repeat joins for the same email within this window skip storage and email entirely
+JOIN_COOLDOWN_SECONDS = float(os.environ.get("JOIN_COOLDOWN_SECONDS", "600"))
+JOIN_COOLDOWN_MAX_ENTRIES = int(os.environ.get("JOIN_COOLDOWN_MAX_ENTRIES", "100000"))
+JOIN_COOLDOWN_SHARED = os.environ.get("JOIN_COOLDOWN_SHARED", "false").lower() == "true"  # share via MongoDB across workers
+COOLDOWN_COLLECTION_NAME = "JoinCooldowns"
+
+# Bulk campaigns: checkpoints live next to the outbox (MongoDB or a local file)
+CAMPAIGN_COLLECTION_NAME = "EmailCampaigns"
+EMAIL_CAMPAIGNS_FILE = os.path.join(os.path.dirname(__file__), "email_campaigns.json")
+CAMPAIGN_CONCURRENCY = int(os.environ.get("CAMPAIGN_CONCURRENCY", "2"))
+
+# Documents fetched per round trip when streaming exports and full loads (projected rows are ~100 bytes)
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", "1000"))
+# Keep MongoDB rows as undecoded BSON (RawBSONDocument) - less memory on large reads, more CPU per field read
+MONGO_RAW_READS = os.environ.get("MONGO_RAW_READS", "false").lower() == "true"
+
+# Group commit: joins arriving within WRITE_BATCH_LINGER_MS share one flush
+WRITE_BATCH_MAX_SIZE = int(os.environ.get("WRITE_BATCH_MAX_SIZE", "100"))
+WRITE_BATCH_LINGER_MS = float(os.environ.get("WRITE_BATCH_LINGER_MS", "5"))
 MONGO_URL = os.environ.get("MONGO_URL")
 DB_NAME = "RecalibrateWebsite"  # Exact case from Atlas
 COLLECTION_NAME = "Emails"  # Capital E as shown in Atlas
+ROLLUP_COLLECTION_NAME = "SignupRollups"  # {_id: "<bucket>|<key>", bucket, key, count}
+
+# MongoDB circuit breaker: after MONGO_BREAKER_FAILURES connection failures in a row, Mongo calls
+# fail fast (JSON fallback) for MONGO_BREAKER_RESET_SECONDS instead of waiting on server selection
+MONGO_BREAKER_FAILURES = int(os.environ.get("MONGO_BREAKER_FAILURES", "3"))
+MONGO_BREAKER_RESET_SECONDS = float(os.environ.get("MONGO_BREAKER_RESET_SECONDS", "15"))
+MONGO_CALL_TIMEOUT_SECONDS = float(os.environ.get("MONGO_CALL_TIMEOUT_SECONDS", "2"))
+
+# Reconnect supervisor: jittered exponential backoff between connection attempts
+MONGO_RECONNECT_BASE_SECONDS = float(os.environ.get("MONGO_RECONNECT_BASE_SECONDS", "2"))
+MONGO_RECONNECT_MAX_SECONDS = float(os.environ.get("MONGO_RECONNECT_MAX_SECONDS", "60"))
+MONGO_SUPERVISOR_INTERVAL = float(os.environ.get("MONGO_SUPERVISOR_INTERVAL", "10"))
+
+# Drift detection: per-bucket email digests on both sides, compared every DRIFT_CHECK_INTERVAL seconds
+# and fully rebuilt every DRIFT_REBUILD_INTERVAL seconds (16^DRIFT_BUCKET_HEX_DIGITS buckets, 1-4 digits)
+DRIFT_CHECK_ENABLED = os.environ.get("DRIFT_CHECK_ENABLED", "true").lower() == "true"
+DRIFT_CHECK_INTERVAL = float(os.environ.get("DRIFT_CHECK_INTERVAL", "60"))
+DRIFT_REBUILD_INTERVAL = float(os.environ.get("DRIFT_REBUILD_INTERVAL", "3600"))
+DRIFT_BUCKET_HEX_DIGITS = int(os.environ.get("DRIFT_BUCKET_HEX_DIGITS", "2"))
+
+# Event-loop lag sampling; stalls longer than the threshold get the blocking stack logged
+LOOP_MONITOR_ENABLED = os.environ.get("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+LOOP_MONITOR_INTERVAL_MS = float(os.environ.get("LOOP_MONITOR_INTERVAL_MS", "100"))
+LOOP_LAG_THRESHOLD_MS = float(os.environ.get("LOOP_LAG_THRESHOLD_MS", "100"))
 
 # Real subscriber count only - no artificial inflation
 BASE_SUBSCRIBER_COUNT = 0  # Only count real emails
@@ -176,196 +372,583 @@ BASE_SUBSCRIBER_COUNT = 0  # Only count real emails
 mongo_client = None
 mongo_db = None
 mongo_collection = None
+rollup_collection = None
+mongo_rollups_ready = False
+
+# Timestamp from which JSON-only writes still have to be replayed into MongoDB
+# ("" = the whole JSON backup, None = nothing pending)
+mongo_replay_since: Optional[str] = None
+json_only_writes = 0
+
+mongo_breaker = CircuitBreaker(
+    "mongodb",
+    failure_threshold=MONGO_BREAKER_FAILURES,
+    reset_timeout=MONGO_BREAKER_RESET_SECONDS,
+    call_timeout=MONGO_CALL_TIMEOUT_SECONDS,
+    is_failure=lambda e: isinstance(e, (ConnectionFailure, OSError))
+)
+
+def mongo_available() -> bool:
+    """MongoDB is connected and its breaker lets calls through"""
+    return mongo_collection is not None and mongo_breaker.allow()
+
+# JSON backup: waitlist.json snapshot + append-only waitlist.jsonl journal, or the SQLite store
+# (same interface; import an existing JSON backup with `python sqlite_store.py import`)
+# File stores never run on the event loop - a large backup load or rewrite would stall every request
+file_io = FileIOExecutor(FILE_IO_WORKERS, FILE_IO_MAX_QUEUE)
+
+sqlite_store = SQLiteWaitlistStore(SQLITE_FILE) if FALLBACK_STORE == "sqlite" else None
+waitlist_journal = sqlite_store or WaitlistJournal(WAITLIST_FILE, WAITLIST_JOURNAL_FILE)
+
+# Storage backends: MongoDB primary (through its breaker) + the local fallback, written together.
+# Joins dedup against the subscriber index first, so the JSON backend skips its own email set.
+mongo_storage = MongoBackend(lambda: mongo_collection, breaker=mongo_breaker,
+                             batch_size=EXPORT_BATCH_SIZE, raw=MONGO_RAW_READS)
+fallback_storage = (SQLiteBackend(sqlite_store, page_size=EXPORT_BATCH_SIZE) if sqlite_store is not None
+                    else JSONBackend(waitlist_journal, dedupe_on_add=False, io=file_io))
+storage = DualWriteBackend(mongo_storage, fallback_storage, primary_available=lambda: mongo_available())
+
+# Event-loop lag histogram + blocking-call stacks
+loop_monitor = EventLoopMonitor(
+    interval_seconds=LOOP_MONITOR_INTERVAL_MS / 1000,
+    threshold_seconds=LOOP_LAG_THRESHOLD_MS / 1000
+)
+
+# Per-email cooldown for repeat joins
+join_cooldown = JoinCooldown(JOIN_COOLDOWN_SECONDS, JOIN_COOLDOWN_MAX_ENTRIES)
+
+# In-memory email index - loaded once at startup, updated on every save
+subscriber_index = SubscriberIndex()
+
+# Seconds a cached subscriber count is served before it is refreshed
+SUBSCRIBER_COUNT_TTL = float(os.environ.get("SUBSCRIBER_COUNT_TTL", "5"))
+
+# Concurrent full-waitlist reads and stats requests share one in-flight query;
+# finished results can also be reused for a few seconds (0 = coalesce only)
+WAITLIST_READ_CACHE_SECONDS = float(os.environ.get("WAITLIST_READ_CACHE_SECONDS", "0"))
+STATS_CACHE_SECONDS = float(os.environ.get("STATS_CACHE_SECONDS", "1"))
+waitlist_reads = SingleFlight(cache_ttl_seconds=WAITLIST_READ_CACHE_SECONDS)
+stats_reads = SingleFlight(cache_ttl_seconds=STATS_CACHE_SECONDS)
 
 async def init_mongodb():
-    """Initialize MongoDB connection"""
-    global mongo_client, mongo_db, mongo_collection
+    """Connect to MongoDB and swap the new client in (at startup and from the supervisor)"""
+    global mongo_client, mongo_db, mongo_collection, rollup_collection
     
     if not MONGO_URL:
         logger.warning("🟡 MongoDB URL not provided - using JSON file storage only")
         return False
     
+    client = None
     try:
         logger.info("🔌 Connecting to MongoDB Atlas...")
-        mongo_client = AsyncIOMotorClient(MONGO_URL, serverSelectionTimeoutMS=10000)
+        client = AsyncIOMotorClient(MONGO_URL, serverSelectionTimeoutMS=10000)
         
         # Test the connection with timeout
-        await asyncio.wait_for(mongo_client.admin.command('ping'), timeout=10.0)
-        
-        mongo_db = mongo_client[DB_NAME]
-        mongo_collection = mongo_db[COLLECTION_NAME]
+        await asyncio.wait_for(client.admin.command('ping'), timeout=10.0)
         
-        logger.info("✅ MongoDB Atlas connected successfully!")
-        return True
+        db = client[DB_NAME]
+        collection = db[COLLECTION_NAME]
+        await ensure_mongo_indexes(collection)
         
-    except asyncio.TimeoutError:
-        logger.error("❌ MongoDB connection timeout")
-        return False
-    except (ConnectionFailure, ServerSelectionTimeoutError) as e:
-        logger.error(f"❌ MongoDB connection failed: {e}")
+    except BaseException as e:
+        if client is not None:
+            client.close()
+        if isinstance(e, asyncio.TimeoutError):
+            logger.error("❌ MongoDB connection timeout")
+        elif isinstance(e, (ConnectionFailure, ServerSelectionTimeoutError)):
+            logger.error(f"❌ MongoDB connection failed: {e}")
+        elif isinstance(e, Exception):
+            logger.error(f"❌ Unexpected MongoDB error: {e}")
+        else:
+            raise
         return False
+    
+    # Swap the new client in with no await in between, so requests never see a half-set connection
+    previous_client = mongo_client
+    mongo_client, mongo_db, mongo_collection, rollup_collection = (
+        client, db, collection, db[ROLLUP_COLLECTION_NAME]
+    )
+    if previous_client is not None:
+        previous_client.close()
+    mongo_breaker.record_success()
+    drift_detector.invalidate()
+    waitlist_reads.invalidate()
+    
+    # Older documents only have the ISO string - fill signed_up_at in the background
+    asyncio.create_task(backfill_signup_dates(mongo_collection))
+    # ...and no email_bucket for drift checks
+    asyncio.create_task(backfill_email_buckets())
+    
+    # Build the signup rollups once if this database has none yet
+    asyncio.create_task(ensure_mongo_rollups())
+    
+    await attach_mongo_services(db)
+    
+    logger.info("✅ MongoDB Atlas connected successfully!")
+    return True
+
+async def attach_mongo_services(db):
+    """Move the outbox (and shared join cooldowns) onto a freshly connected database"""
+    email_outbox.attach_mongo(db[OUTBOX_COLLECTION_NAME], breaker=mongo_breaker, available=mongo_available)
+    try:
+        await email_outbox.mongo_store.ensure_indexes()
     except Exception as e:
-        logger.error(f"❌ Unexpected MongoDB error: {e}")
-        return False
+        logger.error(f"❌ Could not create outbox indexes: {e}")
+    
+    # Share join cooldowns between workers when asked to (local-only otherwise)
+    if JOIN_COOLDOWN_SHARED:
+        try:
+            await join_cooldown.attach_mongo(db[COOLDOWN_COLLECTION_NAME], breaker=mongo_breaker,
+                                             available=mongo_available)
+            logger.info("🧊 Join cooldowns shared through MongoDB")
+        except Exception as e:
+            logger.error(f"❌ Could not attach shared join cooldowns: {e}")
+
+def mark_json_only_since(timestamp: str):
+    """Remember that writes from `timestamp` on reached only the JSON backup"""
+    global mongo_replay_since, json_only_writes
+    json_only_writes += 1
+    if mongo_replay_since is None or timestamp < mongo_replay_since:
+        mongo_replay_since = timestamp
+
+async def replay_json_only_writes() -> int:
+    """Upsert JSON-only writes from the outage into MongoDB with one bulk write"""
+    global mongo_replay_since
+    if mongo_replay_since is None or not mongo_available():
+        return 0
+    
+    since = mongo_replay_since
+    writes_before = json_only_writes
+    entries = [entry async for entry in fallback_storage.iter_since(since or None)]
+    if entries:
+        # Upserts are insert-if-absent, so entries MongoDB already has are left untouched
+        try:
+            added = await mongo_storage.add(entries, timeout=None)
+        except Exception as e:
+            logger.warning(f"⚠️ Replay of {len(entries)} JSON-only writes failed, will retry: {e}")
+            return 0
+        await record_mongo_batch(entries, added)
+        if None in added:
+            logger.warning(f"⚠️ Replay of {len(entries)} JSON-only writes incomplete, will retry")
+            return 0
+    
+    drift_detector.invalidate()
+    waitlist_reads.invalidate("mongodb")
+    
+    # Only close the window if nothing else fell back to JSON while we were replaying
+    if json_only_writes == writes_before:
+        mongo_replay_since = None
+    logger.info(f"🔁 Replayed {len(entries)} JSON-only writes into MongoDB (since {since or 'the beginning'})")
+    return len(entries)
+
+mongo_supervisor = MongoSupervisor(
+    is_connected=lambda: mongo_collection is not None,
+    connect=init_mongodb,
+    needs_replay=lambda: mongo_replay_since is not None,
+    replay=replay_json_only_writes,
+    base_delay_seconds=MONGO_RECONNECT_BASE_SECONDS,
+    max_delay_seconds=MONGO_RECONNECT_MAX_SECONDS,
+    check_interval_seconds=MONGO_SUPERVISOR_INTERVAL
+)
+
+async def ensure_mongo_indexes(collection):
+    """Create the waitlist indexes (no-op when they already exist)"""
+    try:
+        # Emails are stored normalized (lowercase, stripped), so a plain unique index suffices
+        await collection.create_index([("email", ASCENDING)], unique=True, name="email_unique")
+    except (DuplicateKeyError, OperationFailure) as e:
+        logger.error(f"❌ Could not create unique email index (existing duplicates?): {e}")
+    
+    try:
+        await collection.create_index([("timestamp", ASCENDING)], name="timestamp_idx")
+        # Keyset order for paginated exports
+        await collection.create_index([("timestamp", ASCENDING), ("email", ASCENDING)], name="timestamp_email_idx")
+    except OperationFailure as e:
+        logger.error(f"❌ Could not create timestamp index: {e}")
+    
+    try:
+        await collection.create_index([("signed_up_at", ASCENDING)], name="signed_up_at_idx")
+    except OperationFailure as e:
+        logger.error(f"❌ Could not create signed_up_at index: {e}")
+    
+    try:
+        # Drift checks read single email-hash buckets from this index alone
+        await collection.create_index([("email_bucket", ASCENDING), ("email", ASCENDING)], name="email_bucket_idx")
+    except OperationFailure as e:
+        logger.error(f"❌ Could not create email_bucket index: {e}")
+
+async def backfill_signup_dates(collection) -> int:
+    """Derive signed_up_at (BSON date) from the legacy timestamp string, server-side"""
+    try:
+        result = await collection.update_many(
+            {"signed_up_at": {"$exists": False}, "timestamp": {"$type": "string"}},
+            [{"$set": {"signed_up_at": {"$dateFromString": {
+                # BSON dates hold milliseconds - drop the extra microsecond digits
+                "dateString": {"$substrCP": ["$timestamp", 0, 23]},
+                "onError": None
+            }}}}]
+        )
+        if result.modified_count:
+            logger.info(f"🕒 Backfilled signed_up_at on {result.modified_count} MongoDB documents")
+        return result.modified_count
+    except Exception as e:
+        logger.error(f"❌ Error backfilling signed_up_at: {e}")
+        return 0
+
+async def backfill_email_buckets() -> int:
+    """Store the drift-detection bucket on documents written before it existed"""
+    try:
+        updated = await mongo_storage.backfill_email_buckets()
+        if updated:
+            logger.info(f"🪣 Backfilled email_bucket on {updated} MongoDB documents")
+        return updated
+    except Exception as e:
+        logger.error(f"❌ Error backfilling email_bucket: {e}")
+        return 0
 
 def ensure_json_directory():
     """Ensure the JSON data directory exists"""
     os.makedirs(os.path.dirname(WAITLIST_FILE), exist_ok=True)
 
-def load_json_waitlist() -> List[dict]:
-    """Load waitlist data from JSON file"""
-    ensure_json_directory()
-    
-    if os.path.exists(WAITLIST_FILE):
-        try:
-            with open(WAITLIST_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                logger.info(f"📄 Loaded {len(data)} entries from JSON file")
-                return data
-        except (json.JSONDecodeError, IOError) as e:
-            logger.error(f"❌ Error loading JSON file: {e}")
-            return []
-    else:
+async def load_json_waitlist() -> List[dict]:
+    """Load waitlist data from the fallback store (JSON snapshot + journal, or SQLite)"""
+    if not waitlist_journal.exists():
         logger.info("📄 JSON file not found, starting with empty list")
         return []
-
-def save_json_waitlist(waitlist: List[dict]) -> bool:
-    """Save waitlist data to JSON file"""
-    ensure_json_directory()
     
     try:
-        with open(WAITLIST_FILE, 'w', encoding='utf-8') as f:
-            json.dump(waitlist, f, indent=2, ensure_ascii=False)
-        logger.info(f"✅ Saved {len(waitlist)} entries to JSON file")
-        return True
-    except IOError as e:
-        logger.error(f"❌ Error saving JSON file: {e}")
-        return False
+        data = [entry async for entry in fallback_storage.iter_since()]
+        logger.info(f"📄 Loaded {len(data)} entries from JSON file")
+        return data
+    except (json.JSONDecodeError, IOError, sqlite3.Error) as e:
+        logger.error(f"❌ Error loading JSON file: {e}")
+        return []
+
+def compact_json_waitlist() -> int:
+    """Fold the JSON journal into waitlist.json"""
+    try:
+        return waitlist_journal.compact()
+    except (json.JSONDecodeError, IOError, sqlite3.Error) as e:
+        logger.error(f"❌ Error compacting JSON journal: {e}")
+        return 0
+
+async def run_journal_compaction():
+    """Background loop compacting the JSON journal every JOURNAL_COMPACT_INTERVAL seconds"""
+    while True:
+        await asyncio.sleep(JOURNAL_COMPACT_INTERVAL)
+        await file_io.run(compact_json_waitlist)
 
 async def load_mongo_waitlist() -> List[dict]:
-    """Load waitlist data from MongoDB"""
+    """Load waitlist data from MongoDB (projected rows, raw BSON with MONGO_RAW_READS)"""
     if mongo_collection is None:
         logger.warning("🟡 MongoDB not available, using JSON fallback")
         return []
     
+    async def fetch_all() -> List[dict]:
+        return [document async for document in mongo_storage.iter_since()]
+    
     try:
-        cursor = mongo_collection.find({})
-        entries = []
-        async for document in cursor:
-            # Remove MongoDB's _id field for consistency
-            document.pop('_id', None)
-            entries.append(document)
-        
+        # Full loads can legitimately take a while - only the breaker's fast-fail applies
+        entries = await mongo_breaker.call(fetch_all, timeout=None)
         logger.info(f"🗄️ Loaded {len(entries)} entries from MongoDB")
         return entries
         
+    except CircuitOpenError:
+        logger.warning("⏩ MongoDB circuit open, using JSON fallback")
+        return []
     except Exception as e:
         logger.error(f"❌ Error loading from MongoDB: {e}")
         return []
 
-async def save_to_mongo(entry: dict) -> bool:
-    """Save a single entry to MongoDB"""
-    if mongo_collection is None:
-        return False
+async def record_mongo_batch(entries: List[dict], added: List[Optional[bool]]):
+    """Log a MongoDB bulk upsert's outcome (new / already existed / failed) and roll up its new entries"""
+    if all(is_new is None for is_new in added):
+        if mongo_collection is not None and not mongo_breaker.allow():
+            logger.warning(f"⏩ MongoDB circuit open, batch of {len(entries)} saved to JSON only")
+        return
+    
+    failed = added.count(None)
+    if failed:
+        logger.error(f"❌ Partial MongoDB batch failure: {failed} of {len(entries)} entries not saved")
+    new_entries = [entry for entry, is_new in zip(entries, added) if is_new]
+    existed = len(entries) - len(new_entries) - failed
+    logger.info(f"✅ Upserted batch of {len(entries)} to MongoDB ({len(new_entries)} new, {existed} already existed)")
+    
+    # Only genuinely new documents count towards the rollups
+    await record_mongo_rollups(new_entries)
+
+async def record_mongo_rollups(entries: List[dict]):
+    """$inc the hour/day rollup buckets for newly stored entries"""
+    if rollup_collection is None or not entries:
+        return
     
+    operations = []
+    for bucket, counts in rollup_counts(entry["timestamp"] for entry in entries).items():
+        for key, count in counts.items():
+            operations.append(UpdateOne(
+                {"_id": f"{bucket}|{key}"},
+                {"$inc": {"count": count}, "$setOnInsert": {"bucket": bucket, "key": key}},
+                upsert=True
+            ))
     try:
-        # Check if email already exists
-        existing = await mongo_collection.find_one({"email": entry["email"]})
-        if existing:
-            logger.info(f"📧 Email {entry['email']} already exists in MongoDB")
-            return True
-        
-        # Create a copy of entry without ObjectId issues
-        clean_entry = {
-            "name": entry["name"],
-            "email": entry["email"],
-            "timestamp": entry["timestamp"]
-        }
-        
-        # Insert new entry
-        result = await mongo_collection.insert_one(clean_entry)
-        if result.inserted_id:
-            logger.info(f"✅ Saved entry to MongoDB: {entry['email']}")
-            return True
+        await mongo_breaker.call(rollup_collection.bulk_write, operations, ordered=False)
+    except Exception as e:
+        logger.error(f"❌ Error updating signup rollups: {e}")
+
+async def rebuild_mongo_rollups() -> int:
+    """Recompute every rollup bucket from the raw Emails collection"""
+    global mongo_rollups_ready
+    
+    # Hour buckets come from the server; days are sums of their hours
+    counts = {bucket: {} for bucket in BUCKET_KEY_LENGTHS}
+    for hour, count in (await mongo_storage.prefix_counts(BUCKET_KEY_LENGTHS["hour"])).items():
+        counts["hour"][hour] = count
+        day = bucket_key(hour, "day")
+        counts["day"][day] = counts["day"].get(day, 0) + count
+    
+    operations = []
+    ids = []
+    for bucket, bucket_counts in counts.items():
+        for key, count in bucket_counts.items():
+            ids.append(f"{bucket}|{key}")
+            operations.append(ReplaceOne(
+                {"_id": ids[-1]},
+                {"bucket": bucket, "key": key, "count": count},
+                upsert=True
+            ))
+    if operations:
+        await rollup_collection.bulk_write(operations, ordered=False)
+    await rollup_collection.delete_many({"_id": {"$nin": ids}})
+    
+    mongo_rollups_ready = True
+    logger.info(f"📈 Rebuilt {len(ids)} signup rollup buckets from MongoDB")
+    return len(ids)
+
+async def ensure_mongo_rollups():
+    """Use existing rollups, or build them when the collection is empty"""
+    global mongo_rollups_ready
+    try:
+        if await rollup_collection.estimated_document_count():
+            mongo_rollups_ready = True
         else:
-            logger.error("❌ Failed to insert to MongoDB")
-            return False
-            
+            await rebuild_mongo_rollups()
     except Exception as e:
-        logger.error(f"❌ Error saving to MongoDB: {e}")
-        return False
+        logger.error(f"❌ Error preparing signup rollups: {e}")
 
 async def get_combined_waitlist() -> List[dict]:
-    """Get waitlist from both MongoDB and JSON, prioritizing MongoDB"""
+    """Get waitlist from both MongoDB and JSON, prioritizing MongoDB (concurrent callers share one read)"""
     
     # Try MongoDB first
-    mongo_data = await load_mongo_waitlist()
+    mongo_data = await waitlist_reads.do("mongodb", load_mongo_waitlist)
     if mongo_data:
         logger.info(f"📊 Using MongoDB data: {len(mongo_data)} entries")
         return mongo_data
     
     # Fallback to JSON
-    json_data = load_json_waitlist()
+    json_data = await waitlist_reads.do("json_backup", load_json_waitlist)
     logger.info(f"📊 Using JSON fallback data: {len(json_data)} entries")
     return json_data
 
-async def save_dual_storage(entry: dict) -> tuple[bool, bool, str]:
-    """Save to both MongoDB and JSON file"""
-    mongo_success = await save_to_mongo(entry)
-    
-    # Always update JSON file
-    json_data = load_json_waitlist()
-    
-    # Check for duplicates in JSON
-    email_exists = any(existing.get("email", "").lower() == entry["email"].lower() 
-                      for existing in json_data)
-    
-    json_success = True
-    if not email_exists:
-        json_data.append(entry)
-        json_success = save_json_waitlist(json_data)
+async def count_subscribers() -> tuple[int, str]:
+    """Cheap subscriber count: collection metadata, else the fallback store's count"""
+    if mongo_collection is not None:
+        try:
+            count = await mongo_storage.count()
+            # 0 is a real answer (empty collection), not a failure
+            if count is not None:
+                return count, "mongodb"
+        except CircuitOpenError:
+            pass  # MongoDB is known to be down - count the JSON backup instead
+        except Exception as e:
+            logger.error(f"❌ Error counting MongoDB documents: {e}")
     
-    # Determine storage status
+    try:
+        return await fallback_storage.count(), "json_backup"
+    except (IOError, sqlite3.Error) as e:
+        logger.error(f"❌ Error counting JSON backup: {e}")
+        return 0, "json_backup"
+
+subscriber_counter = SubscriberCounter(count_subscribers, ttl_seconds=SUBSCRIBER_COUNT_TTL)
+
+async def load_subscriber_index() -> int:
+    """(Re)build the in-memory subscriber index from storage"""
+    waitlist = await get_combined_waitlist()
+    return subscriber_index.load(decode_raw_rows(waitlist))
+
+async def ensure_subscriber_index():
+    """Load the subscriber index if startup did not manage to"""
+    if not subscriber_index.loaded:
+        await load_subscriber_index()
+
+def describe_storage(mongo_success: bool, json_success: bool) -> str:
+    """Human-readable storage status for a save"""
     if mongo_success and json_success:
-        storage_info = "✅ Saved to MongoDB + JSON backup"
+        return "✅ Saved to MongoDB + JSON backup"
     elif mongo_success:
-        storage_info = "🟡 Saved to MongoDB (JSON backup failed)"
+        return "🟡 Saved to MongoDB (JSON backup failed)"
     elif json_success:
-        storage_info = "🟡 Saved to JSON backup (MongoDB unavailable)"
+        return "🟡 Saved to JSON backup (MongoDB unavailable)"
     else:
-        storage_info = "❌ Both storage methods failed"
+        return "❌ Both storage methods failed"
+
+async def save_dual_storage_batch(entries: List[dict]) -> List[tuple[Optional[bool], bool, bool, str]]:
+    """Save a batch to MongoDB and the JSON journal with one call each
+
+    Per entry: (added, mongo_success, json_success, storage_info), where added
+    is True for a new signup, False if another worker already stored the
+    email and None if neither store took it.
+    """
+    # Always update JSON backup - joins dedup against the subscriber index first
+    mongo_added, json_added = await storage.add_both(entries)
+    await record_mongo_batch(entries, mongo_added)
+    
+    # Entries that missed MongoDB are replayed by the supervisor once it's reachable again
+    json_only = [entry for entry, in_mongo, in_json in zip(entries, mongo_added, json_added)
+                 if in_mongo is None and in_json]
+    if MONGO_URL and json_only:
+        mark_json_only_since(min(entry["timestamp"] for entry in json_only))
+    
+    # Reads that started before this write must not be reused after it
+    waitlist_reads.invalidate()
+    stats_reads.invalidate()
     
-    return mongo_success, json_success, storage_info
+    results = []
+    for entry, in_mongo, in_json in zip(entries, mongo_added, json_added):
+        mongo_success, json_success = in_mongo is not None, in_json is not None
+        # MongoDB is the source of truth; the fallback decides only while it's down
+        added = in_mongo if mongo_success else in_json
+        if added:
+            subscriber_index.add(entry["email"])
+            drift_detector.record_write(entry["email"], mongo_success, json_success)
+            subscriber_counter.increment()
+        if added is False:
+            storage_info = "Already exists in database"
+        else:
+            storage_info = describe_storage(mongo_success, json_success)
+        results.append((added, mongo_success, json_success, storage_info))
+    return results
+
+write_batcher = WriteBatcher(
+    save_dual_storage_batch,
+    max_batch_size=WRITE_BATCH_MAX_SIZE,
+    linger_ms=WRITE_BATCH_LINGER_MS
+)
+
+async def save_dual_storage(entry: dict) -> tuple[Optional[bool], bool, bool, str]:
+    """Save to both MongoDB and JSON file via the group-commit writer"""
+    return await write_batcher.submit(entry)
+
+def verify_admin_key(request: Request):
+    """Reject requests without the admin key"""
+    admin_key = request.headers.get("X-Admin-Key")
+    if admin_key != os.environ.get("ADMIN_SECRET_KEY", "recalibrate-admin-2026"):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+async def probe_mongodb() -> dict:
+    """Ping MongoDB (run by the background prober, never per request)"""
+    if mongo_client is None:
+        return {"ok": False, "status": "❌ Disconnected"}
+    try:
+        await asyncio.wait_for(mongo_client.admin.command('ping'), timeout=5.0)
+        return {"ok": True, "status": "✅ Connected"}
+    except asyncio.TimeoutError:
+        return {"ok": False, "status": "❌ Timeout"}
+    except Exception:
+        return {"ok": False, "status": "❌ Connection failed"}
+
+async def probe_json_backup() -> dict:
+    """Stat the JSON backup files (on the file I/O threads - a stalled disk must not stall requests)"""
+    return await file_io.run(stat_json_backup)
+
+def stat_json_backup() -> dict:
+    ensure_json_directory()
+    files = {}
+    for path in ((SQLITE_FILE,) if sqlite_store is not None else (WAITLIST_FILE, WAITLIST_JOURNAL_FILE)):
+        try:
+            stat = os.stat(path)
+            files[os.path.basename(path)] = {
+                "size_bytes": stat.st_size,
+                "modified_at": datetime.fromtimestamp(stat.st_mtime).isoformat()
+            }
+        except OSError:
+            pass
+    writable = os.access(os.path.dirname(WAITLIST_FILE), os.W_OK)
+    return {
+        "ok": writable,
+        "status": "✅ Available" if files else "🟡 No backup file",
+        "writable": writable,
+        "files": files
+    }
+
+drift_detector = DriftDetector(
+    fallback_storage,
+    mongo_storage,
+    mongo_ready=mongo_available,
+    bucket_hex_digits=DRIFT_BUCKET_HEX_DIGITS,
+    check_interval_seconds=DRIFT_CHECK_INTERVAL,
+    rebuild_interval_seconds=DRIFT_REBUILD_INTERVAL
+)
+
+health_prober = HealthProber(
+    {"mongodb": probe_mongodb, "json_backup": probe_json_backup},
+    interval_seconds=HEALTH_PROBE_INTERVAL
+)
+
+def cached_storage_status() -> dict:
+    """MongoDB/JSON status from the prober cache"""
+    mongo = health_prober.result("mongodb")
+    json_backup = health_prober.result("json_backup")
+    if mongo is not None:
+        mongo_status = mongo["status"]
+    else:
+        mongo_status = "❌ Disconnected" if mongo_client is None else "🟡 Not probed yet"
+    return {
+        "mongodb": mongo_status,
+        "json_backup": json_backup["status"] if json_backup else "🟡 Not probed yet",
+        "dual_storage": mongo_status == "✅ Connected",
+        "probed_at": mongo["checked_at"] if mongo else None,
+        "probe_age_seconds": mongo["age_seconds"] if mongo else None
+    }
+
+@app.get("/api/health/live")
+async def health_live():
+    """Liveness: the process is up and serving requests (no I/O)"""
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+@app.get("/api/health/ready")
+async def health_ready():
+    """Readiness from cached probes: at least one store can take writes"""
+    mongo = health_prober.result("mongodb")
+    json_backup = health_prober.result("json_backup")
+    mongo_ready = bool(mongo and mongo["ok"] and health_prober.is_fresh("mongodb"))
+    json_ready = bool(json_backup and json_backup["ok"] and health_prober.is_fresh("json_backup"))
+    ready = mongo_ready or json_ready
+    
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "timestamp": datetime.now().isoformat(),
+            "checks": {"mongodb": mongo, "json_backup": json_backup}
+        }
+    )
 
 @app.get("/api/health")
 async def health_check():
-    """Enhanced health check with storage status"""
+    """Enhanced health check with storage status (served from caches)"""
     try:
-        # Try to get waitlist count, but don't fail if it doesn't work
+        # Get the cached waitlist count, but don't fail if it doesn't work
         try:
-            waitlist = await get_combined_waitlist()
-            actual_count = len(waitlist)
+            count_info = await subscriber_counter.get()
+            actual_count = count_info["count"]
             # Always add base count to actual count for social proof
             display_count = actual_count + BASE_SUBSCRIBER_COUNT  # 127 + actual count
         except Exception as e:
-            logger.error(f"Error getting waitlist for health check: {e}")
+            logger.error(f"Error getting waitlist count for health check: {e}")
+            count_info = None
             actual_count = 0
             display_count = BASE_SUBSCRIBER_COUNT  # Show base if error
         
-        # Test MongoDB connection safely
-        mongo_status = "❌ Disconnected"
-        if mongo_client is not None:
-            try:
-                await asyncio.wait_for(mongo_client.admin.command('ping'), timeout=5.0)
-                mongo_status = "✅ Connected"
-            except asyncio.TimeoutError:
-                mongo_status = "❌ Timeout"
-            except Exception:
-                mongo_status = "❌ Connection failed"
-        
-        # Test JSON file safely
-        json_status = "✅ Available" if os.path.exists(WAITLIST_FILE) else "🟡 No backup file"
-        
         return {
             "status": "healthy",
             "service": "RecalibratePain Waitlist API",
@@ -373,10 +956,15 @@ async def health_check():
             "timestamp": datetime.now().isoformat(),
             "subscribers": display_count,  # Show actual count only
             "actual_subscribers": actual_count,  # Same as display count now
-            "storage": {
-                "mongodb": mongo_status,
-                "json_backup": json_status,
-                "dual_storage": mongo_status == "✅ Connected"
+            "count_freshness": {
+                "refreshed_at": count_info["refreshed_at"],
+                "age_seconds": count_info["age_seconds"],
+                "stale": count_info["stale"]
+            } if count_info else None,
+            "storage": cached_storage_status(),
+            "circuit_breakers": {
+                "mongodb": mongo_breaker.snapshot(),
+                "resend": resend_breaker.snapshot()
             }
         }
     except Exception as e:
@@ -400,18 +988,19 @@ async def health_check():
 async def get_subscriber_count():
     """Get current subscriber count - base count + actual MongoDB count"""
     try:
-        waitlist = await get_combined_waitlist()
-        actual_count = len(waitlist)
+        count_info = await subscriber_counter.get()
+        actual_count = count_info["count"]
         
         # Always add base count to actual count for social proof
         display_count = actual_count + BASE_SUBSCRIBER_COUNT  # 127 + actual count
-        logger.info(f"📊 Returning total count: {display_count} (base: {BASE_SUBSCRIBER_COUNT} + actual: {actual_count})")
-        source = "mongodb" if mongo_collection is not None else "json_backup"
         
         return {
             "count": display_count, 
             "timestamp": datetime.now().isoformat(),
-            "source": source
+            "source": count_info["source"],
+            "refreshed_at": count_info["refreshed_at"],
+            "age_seconds": count_info["age_seconds"],
+            "stale": count_info["stale"]
         }
     except Exception as e:
         logger.error(f"Error getting subscriber count: {e}")
@@ -434,182 +1023,61 @@ async def download_course_pdf():
     else:
         raise HTTPException(status_code=404, detail="Course file not found")
 
-async def send_welcome_email(to_email: str, name: str):
-    """Helper function to send the welcome email using Resend API"""
-    if not os.environ.get("RESEND_API_KEY"):
-        logger.info("ℹ️ Skipped welcome email (RESEND_API_KEY missing)")
-        return
+welcome_message = personalized_message(
+    email_templates,
+    "welcome_email",
+    "Welcome to Recalibrate — Cohort 1 Launching March 2026",
+    sender="Recalibrate <info@recalibratepain.com>",
+    unsubscribe_url_template=UNSUBSCRIBE_URL_TEMPLATE
+)
 
-    try:
-        welcome_html = """
-        <div style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif; max-width: 640px; margin: 0 auto; color: #1f2937; background-color: #ffffff;">
-            
-            <!-- Header -->
-            <div style="background: linear-gradient(135deg, #1e1b4b 0%, #581c87 50%, #312e81 100%); padding: 40px 32px; border-radius: 16px 16px 0 0; text-align: center;">
-                <img src="https://recalibratepain.com/recalibrate-logo.png" alt="Recalibrate" style="height: 48px; width: auto; margin-bottom: 20px; display: block; margin-left: auto; margin-right: auto;">
-                <h1 style="color: #ffffff; font-size: 28px; font-weight: 800; margin: 0 0 8px 0; letter-spacing: -0.5px;">Welcome to Recalibrate</h1>
-                <p style="color: #c4b5fd; font-size: 15px; margin: 0;">You're part of Cohort 1. Here's everything you need to know.</p>
-            </div>
-
-            <div style="padding: 32px;">
-
-                <!-- Cohort 1 Banner -->
-                <div style="background: linear-gradient(135deg, #7c3aed 0%, #4f46e5 100%); padding: 24px; border-radius: 12px; text-align: center; margin-bottom: 28px;">
-                    <p style="color: #e9d5ff; font-size: 13px; text-transform: uppercase; letter-spacing: 1.5px; margin: 0 0 6px 0; font-weight: 600;">Cohort 1 Launch</p>
-                    <h2 style="color: #ffffff; font-size: 24px; font-weight: 800; margin: 0 0 6px 0;">March 2026</h2>
-                    <p style="color: #c4b5fd; font-size: 14px; margin: 0;">Be among the first to access the full platform</p>
-                </div>
+def build_welcome_email(to_email: str, name: str) -> dict:
+    """Resend params for the welcome email (rendered from the cached template)"""
+    return welcome_message({"email": to_email, "name": name})
 
-                <!-- Intro -->
-                <p style="font-size: 15px; line-height: 1.7; color: #374151; margin-bottom: 24px;">
-                    Thank you for joining us. <strong>Recalibrate</strong> is a comprehensive allied health platform built for people living with chronic pain, chronic illness, and complex health conditions  - as well as the clinicians and carers who support them.
-                </p>
-                <p style="font-size: 15px; line-height: 1.7; color: #374151; margin-bottom: 28px;">
-                    We've built an ecosystem that brings together tracking, education, AI insights, therapeutic tools, and connected care into one place. Here's what's coming:
-                </p>
-
-                <!-- The Recalibrate App -->
-                <h3 style="font-size: 18px; font-weight: 700; color: #1e1b4b; margin: 0 0 16px 0; padding-bottom: 8px; border-bottom: 2px solid #e9d5ff;">The Recalibrate App</h3>
-
-                <!-- For Patients / Users -->
-                <div style="background-color: #f5f3ff; border-left: 4px solid #7c3aed; padding: 20px; border-radius: 0 12px 12px 0; margin-bottom: 16px;">
-                    <h4 style="color: #5b21b6; font-size: 15px; font-weight: 700; margin: 0 0 10px 0;">For You (Patients &amp; Users)</h4>
-                    <ul style="margin: 0; padding-left: 18px; font-size: 14px; line-height: 1.8; color: #4b5563;">
-                        <li><strong>Smart Tracker</strong>  - Log pain, sleep, mood, energy &amp; 18+ health variables across 8 biological systems</li>
-                        <li><strong>Analytics Dashboard</strong>  - Your personal Stability Score, trend analysis &amp; pattern detection</li>
-                        <li><strong>Recalibrate Academy</strong>  - 100+ lessons on pain science, self-management &amp; wellness strategies</li>
-                        <li><strong>Therapeutic Tools</strong>  - Journaling, goal tracking, guided exercises, CBT &amp; mindfulness</li>
-                        <li><strong>Recalibrate AI</strong>  - Chat about your health data, get personalised insights &amp; research answers</li>
-                    </ul>
-                </div>
+async def send_resend_email(params: dict):
+    """Send one email through Resend (raises on failure, or CircuitOpenError during an outage)"""
+    return await resend_breaker.call(resend_client.send, params)
 
-                <!-- For Clinicians -->
-                <div style="background-color: #eff6ff; border-left: 4px solid #3b82f6; padding: 20px; border-radius: 0 12px 12px 0; margin-bottom: 16px;">
-                    <h4 style="color: #1d4ed8; font-size: 15px; font-weight: 700; margin: 0 0 10px 0;">For Clinicians</h4>
-                    <ul style="margin: 0; padding-left: 18px; font-size: 14px; line-height: 1.8; color: #4b5563;">
-                        <li><strong>Multi-Patient Dashboard</strong>  - Track all your patients' progress in real-time</li>
-                        <li><strong>Doctor-Ready Reports</strong>  - Export comprehensive health data for appointments</li>
-                        <li><strong>Care Team Integration</strong>  - Collaborate with other professionals in a patient's care team</li>
-                        <li><strong>Research Tools</strong>  - Access aggregated, anonymised data for allied health research</li>
-                    </ul>
-                </div>
-
-                <!-- For Carers -->
-                <div style="background-color: #ecfdf5; border-left: 4px solid #10b981; padding: 20px; border-radius: 0 12px 12px 0; margin-bottom: 28px;">
-                    <h4 style="color: #059669; font-size: 15px; font-weight: 700; margin: 0 0 10px 0;">For Carers &amp; Family</h4>
-                    <ul style="margin: 0; padding-left: 18px; font-size: 14px; line-height: 1.8; color: #4b5563;">
-                        <li><strong>Support Dashboard</strong>  - Understand your loved one's daily health patterns</li>
-                        <li><strong>Progress Visibility</strong>  - See trends and improvements over time</li>
-                        <li><strong>Connected Care</strong>  - Stay in the loop with the care team</li>
-                    </ul>
-                </div>
+async def deliver_email(message: dict):
+    """Outbox delivery: render the queued message and send it via Resend"""
+    payload = message["payload"]
+    if message["kind"] == "welcome":
+        params = build_welcome_email(payload["to"], payload["name"])
+    else:
+        params = payload
+    
+    response = await send_resend_email(params)
+    logger.info(f"📧 Email ({message['kind']}) sent to {', '.join(params['to'])} via Resend")
+    logger.info(f"Resend Response: {response}")
+    return response
 
-                <!-- The Recalibrate Protocol -->
-                <h3 style="font-size: 18px; font-weight: 700; color: #1e1b4b; margin: 0 0 16px 0; padding-bottom: 8px; border-bottom: 2px solid #d1fae5;">The Recalibrate Protocol</h3>
-                <div style="background: linear-gradient(135deg, #059669 0%, #0d9488 100%); padding: 24px; border-radius: 12px; margin-bottom: 28px; color: #ffffff;">
-                    <p style="font-size: 15px; line-height: 1.7; margin: 0 0 16px 0;">
-                        Our standalone clinical product  - an 8-system framework addressing the root biological causes of chronic pain. Based on 250+ peer-reviewed studies.
-                    </p>
-                    <table style="width: 100%; border-collapse: collapse; margin-bottom: 16px;">
-                        <tr>
-                            <td style="padding: 6px 0; font-size: 14px; color: #d1fae5;">12-Month Protocol Maps</td>
-                            <td style="padding: 6px 0; font-size: 14px; color: #d1fae5; text-align: right;">8 Systems</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 6px 0; font-size: 14px; color: #d1fae5;">8-Day Email Course</td>
-                            <td style="padding: 6px 0; font-size: 14px; color: #d1fae5; text-align: right;">Paced Implementation</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 6px 0; font-size: 14px; color: #d1fae5;">Quick Reference Guides</td>
-                            <td style="padding: 6px 0; font-size: 14px; color: #d1fae5; text-align: right;">Printable PDFs</td>
-                        </tr>
-                        <tr>
-                            <td style="padding: 6px 0; font-size: 14px; color: #d1fae5;">Research Directory</td>
-                            <td style="padding: 6px 0; font-size: 14px; color: #d1fae5; text-align: right;">250+ Papers</td>
-                        </tr>
-                    </table>
-                    <div style="text-align: center;">
-                        <a href="https://recalibratepain.app/protocol" style="display: inline-block; background-color: #ffffff; color: #059669; padding: 14px 28px; border-radius: 10px; text-decoration: none; font-weight: 700; font-size: 15px; box-shadow: 0 4px 12px rgba(0,0,0,0.15);">
-                            Explore The Protocol
-                        </a>
-                    </div>
-                </div>
+email_outbox = EmailOutbox(
+    deliver_email,
+    FileOutboxStore(EMAIL_OUTBOX_FILE, io=file_io),
+    workers=EMAIL_WORKERS,
+    rate_per_second=EMAIL_RATE_PER_SECOND,
+    max_attempts=EMAIL_MAX_ATTEMPTS,
+    retry_base_seconds=EMAIL_RETRY_BASE_SECONDS
+)
 
-                <!-- What Happens Next -->
-                <h3 style="font-size: 18px; font-weight: 700; color: #1e1b4b; margin: 0 0 16px 0; padding-bottom: 8px; border-bottom: 2px solid #e9d5ff;">What Happens Next</h3>
-                <table style="width: 100%; border-collapse: collapse; margin-bottom: 28px;">
-                    <tr>
-                        <td style="padding: 12px 16px; vertical-align: top; width: 40px;">
-                            <div style="width: 32px; height: 32px; background: linear-gradient(135deg, #7c3aed, #4f46e5); border-radius: 50%; color: #fff; font-size: 14px; font-weight: 700; text-align: center; line-height: 32px;">1</div>
-                        </td>
-                        <td style="padding: 12px 0; font-size: 14px; color: #374151; line-height: 1.6;">
-                            <strong>You're on the list.</strong> You'll receive priority access and updates as we prepare for launch.
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="padding: 12px 16px; vertical-align: top;">
-                            <div style="width: 32px; height: 32px; background: linear-gradient(135deg, #7c3aed, #4f46e5); border-radius: 50%; color: #fff; font-size: 14px; font-weight: 700; text-align: center; line-height: 32px;">2</div>
-                        </td>
-                        <td style="padding: 12px 0; font-size: 14px; color: #374151; line-height: 1.6;">
-                            <strong>Cohort 1 launches March 2026.</strong> You'll be among the first to access the full platform.
-                        </td>
-                    </tr>
-                    <tr>
-                        <td style="padding: 12px 16px; vertical-align: top;">
-                            <div style="width: 32px; height: 32px; background: linear-gradient(135deg, #7c3aed, #4f46e5); border-radius: 50%; color: #fff; font-size: 14px; font-weight: 700; text-align: center; line-height: 32px;">3</div>
-                        </td>
-                        <td style="padding: 12px 0; font-size: 14px; color: #374151; line-height: 1.6;">
-                            <strong>Start recalibrating.</strong> Track, learn, connect with your care team, and take control of your health journey.
-                        </td>
-                    </tr>
-                </table>
-
-                <!-- CTA -->
-                <div style="text-align: center; margin-bottom: 28px;">
-                    <a href="https://recalibratepain.app" style="display: inline-block; background: linear-gradient(135deg, #7c3aed 0%, #4f46e5 100%); color: #ffffff; padding: 16px 36px; border-radius: 12px; text-decoration: none; font-weight: 700; font-size: 16px; box-shadow: 0 4px 16px rgba(124,58,237,0.3);">
-                        Visit Recalibrate
-                    </a>
-                </div>
+async def queue_email(kind: str, payload: dict) -> Optional[str]:
+    """Persist an email in the outbox, returning its id (None if not queued)"""
+    if not os.environ.get("RESEND_API_KEY"):
+        logger.info(f"ℹ️ Skipped {kind} email (RESEND_API_KEY missing)")
+        return None
+    try:
+        return await email_outbox.enqueue(kind, payload)
+    except Exception as e:
+        logger.error(f"❌ Failed to queue {kind} email: {e}")
+        return None
 
-                <!-- Sign off -->
-                <p style="font-size: 15px; line-height: 1.7; color: #374151; margin-bottom: 4px;">
-                    We're building this for people who deserve better tools to manage their health. Thank you for believing in what we're creating.
-                </p>
-                <p style="font-size: 15px; color: #6b7280; margin-top: 20px;">
-                    Warmly,<br><strong style="color: #1f2937;">The Recalibrate Team</strong>
-                </p>
-            </div>
-
-            <!-- Footer -->
-            <div style="text-align: center; padding: 24px 32px; border-top: 1px solid #e5e7eb;">
-                <p style="margin: 4px 0; color: #6b7280; font-weight: 600; font-size: 13px;">Recalibrate</p>
-                <p style="margin: 4px 0; color: #9ca3af; font-size: 12px;">Smarter Health and Pain Technology</p>
-                <p style="margin: 8px 0 0 0; font-size: 12px;">
-                    <a href="https://recalibratepain.app" style="color: #7c3aed; text-decoration: none; margin: 0 8px;">App</a>
-                    <a href="https://recalibratepain.app/protocol" style="color: #7c3aed; text-decoration: none; margin: 0 8px;">Protocol</a>
-                    <a href="https://www.instagram.com/recalibrateapp/" style="color: #7c3aed; text-decoration: none; margin: 0 8px;">Instagram</a>
-                    <a href="https://www.linkedin.com/company/recalibrate-app/" style="color: #7c3aed; text-decoration: none; margin: 0 8px;">LinkedIn</a>
-                </p>
-            </div>
-        </div>
-        """
-        
-        params = {
-            "from": "Recalibrate <info@recalibratepain.com>",
-            "to": [to_email],
-            "subject": "Welcome to Recalibrate — Cohort 1 Launching March 2026",
-            "html": welcome_html
-        }
-        
-        response = await asyncio.to_thread(resend.Emails.send, params)
-        logger.info(f"Welcome email sent to {to_email} via Resend")
-        logger.info(f"Resend Response: {response}")
-        
-    except Exception as email_error:
-        logger.error(f"Failed to send welcome email to {to_email} via Resend. Error: {str(email_error)}")
+async def queue_welcome_email(to_email: str, name: str) -> Optional[str]:
+    """Queue the welcome email for a subscriber"""
+    return await queue_email("welcome", {"to": to_email, "name": name})
 
 @app.post("/api/waitlist/join", response_model=WaitlistResponse)
-async def join_waitlist(entry: WaitlistEntry, background_tasks: BackgroundTasks):
+async def join_waitlist(entry: WaitlistEntry):
     """Add email to waitlist with dual storage"""
     try:
         # Validate input
@@ -619,23 +1087,34 @@ async def join_waitlist(entry: WaitlistEntry, background_tasks: BackgroundTasks)
         if not entry.email.strip():
             raise HTTPException(status_code=400, detail="Email is required")
         
-        # Check existing entries
-        existing_waitlist = await get_combined_waitlist()
-        email_lower = entry.email.lower().strip()
+        email_lower = normalize_email(entry.email)
         
-        for existing_entry in existing_waitlist:
-            if existing_entry.get("email", "").lower() == email_lower:
-                logger.info(f"📧 Existing email re-registered: {email_lower}")
-                
-                # Send welcome email again for duplicates (background task)
-                background_tasks.add_task(send_welcome_email, email_lower, entry.name.strip())
-                
-                return WaitlistResponse(
-                    success=True,
-                    message="Welcome back! We've sent you the course again.",
-                    total_subscribers=len(existing_waitlist) + BASE_SUBSCRIBER_COUNT,  # Base + actual count
-                    storage_info="Already exists in database"
-                )
+        # Same email joined moments ago: answer without touching storage or email
+        if await join_cooldown.check(email_lower):
+            logger.info(f"🧊 Join for {email_lower} skipped (cooldown)")
+            return WaitlistResponse(
+                success=True,
+                message="You're already on the list! Check your inbox for your welcome email.",
+                total_subscribers=subscriber_index.count + BASE_SUBSCRIBER_COUNT,
+                storage_info="Already exists in database"
+            )
+        
+        # Check existing entries against the in-memory index (no storage read)
+        await ensure_subscriber_index()
+        
+        # Reserve the email up front so concurrent joins for it dedup too
+        if not subscriber_index.add(email_lower):
+            logger.info(f"📧 Existing email re-registered: {email_lower}")
+            
+            # Send welcome email again for duplicates (via the outbox)
+            await queue_welcome_email(email_lower, entry.name.strip())
+            
+            return WaitlistResponse(
+                success=True,
+                message="Welcome back! We've sent you the course again.",
+                total_subscribers=subscriber_index.count + BASE_SUBSCRIBER_COUNT,  # Base + actual count
+                storage_info="Already exists in database"
+            )
         
         # Create new entry
         new_entry = {
@@ -645,23 +1124,38 @@ async def join_waitlist(entry: WaitlistEntry, background_tasks: BackgroundTasks)
         }
         
         # Save to dual storage
-        mongo_success, json_success, storage_info = await save_dual_storage(new_entry)
+        try:
+            added, _, _, storage_info = await save_dual_storage(new_entry)
+        except Exception:
+            subscriber_index.discard(email_lower)
+            await join_cooldown.release(email_lower)
+            raise
+        
+        if added is False:
+            # Another worker stored this email first: nothing was written, no second welcome email
+            logger.info(f"📧 Existing email re-registered (stored by another worker): {email_lower}")
+            return WaitlistResponse(
+                success=True,
+                message="Welcome back! You're already on the list.",
+                total_subscribers=subscriber_index.count + BASE_SUBSCRIBER_COUNT,
+                storage_info=storage_info
+            )
         
-        if mongo_success or json_success:
-            # Get updated count
-            updated_waitlist = await get_combined_waitlist()
+        if added:
             logger.info(f"✅ New subscriber added: {email_lower}")
             
-            # Send Welcome Email (background task)
-            background_tasks.add_task(send_welcome_email, email_lower, entry.name.strip())
+            # Send Welcome Email (via the outbox)
+            await queue_welcome_email(email_lower, entry.name.strip())
 
             return WaitlistResponse(
                 success=True,
                 message="🚀 Welcome to the future of pain management!",
-                total_subscribers=len(updated_waitlist) + BASE_SUBSCRIBER_COUNT,  # Base + actual count
+                total_subscribers=subscriber_index.count + BASE_SUBSCRIBER_COUNT,  # Base + actual count
                 storage_info=storage_info
             )
         else:
+            subscriber_index.discard(email_lower)
+            await join_cooldown.release(email_lower)
             raise HTTPException(status_code=500, detail="Failed to save subscription")
         
     except HTTPException:
@@ -671,79 +1165,162 @@ async def join_waitlist(entry: WaitlistEntry, background_tasks: BackgroundTasks)
         raise HTTPException(status_code=500, detail=f"Failed to add to waitlist: {str(e)}")
 
 @app.get("/api/waitlist/export")
-async def export_waitlist():
-    """Export waitlist data with source information"""
+async def export_waitlist(
+    format: str = "json",
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    since: Optional[str] = None
+):
+    """Stream waitlist data from the primary store as JSON, NDJSON or CSV
+    
+    Rows come in (timestamp, email) order. Page with limit= and
+    after=<timestamp>|<email> of the last row received; since= keeps rows
+    whose timestamp is at or after the given ISO timestamp.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if after:
+        try:
+            parse_cursor(after)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+    
     try:
-        # Get data from both sources
-        mongo_data = await load_mongo_waitlist()
-        json_data = load_json_waitlist()
+        # Read only the primary store
+        reader = storage.reader()
+        use_mongo = reader is mongo_storage
+        primary_source = "mongodb" if use_mongo else "json_backup"
+        rows = decode_raw_rows_async(
+            reader.iter_since(since=since, after=parse_cursor(after) if after else None, limit=limit)
+        )
         
-        # Use MongoDB as primary source
-        primary_data = mongo_data if mongo_data else json_data
+        logger.info(f"📤 Streaming waitlist export (format={format}, source={primary_source})")
         
-        logger.info(f"📤 Exporting {len(primary_data)} waitlist entries")
+        headers = {}
+        if format == "ndjson":
+            body = encode_ndjson(rows)
+        elif format == "csv":
+            body = encode_csv(rows)
+        else:
+            body = encode_json(rows, {
+                "exported_at": datetime.now().isoformat(),
+                "version": "3.0.0",
+                "storage_info": {
+                    "primary_source": primary_source,
+                    "dual_storage_active": use_mongo
+                }
+            }, limit=limit)
+        if format != "json":
+            filename = f"waitlist-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{format}"
+            headers["Content-Disposition"] = f'attachment; filename="{filename}"'
         
-        return {
-            "waitlist": primary_data,
-            "total_count": len(primary_data),
-            "exported_at": datetime.now().isoformat(),
-            "version": "3.0.0",
-            "storage_info": {
-                "primary_source": "mongodb" if mongo_data else "json_backup",
-                "mongodb_entries": len(mongo_data),
-                "json_backup_entries": len(json_data),
-                "dual_storage_active": bool(mongo_data and json_data)
-            }
-        }
+        return StreamingResponse(body, media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
     except Exception as e:
         logger.error(f"Error exporting waitlist: {e}")
         raise HTTPException(status_code=500, detail="Failed to export waitlist")
 
-@app.get("/api/waitlist/stats")
-async def get_waitlist_stats():
-    """Get detailed waitlist statistics from dual storage"""
-    try:
-        waitlist = await get_combined_waitlist()
-        
-        if not waitlist:
-            return {
-                "total_subscribers": 0,
-                "recent_signups": 0,
-                "today_signups": 0,
-                "timestamp": datetime.now().isoformat(),
-                "storage_source": "empty"
-            }
-        
-        # Calculate statistics
-        now = datetime.now()
-        today = now.date()
-        week_ago = now - timedelta(days=7)
-        
-        recent_signups = 0
-        today_signups = 0
-        
-        for entry in waitlist:
-            try:
-                entry_date = datetime.fromisoformat(entry.get('timestamp', ''))
-                if entry_date.date() == today:
-                    today_signups += 1
-                if entry_date >= week_ago:
-                    recent_signups += 1
-            except (ValueError, TypeError):
-                continue
-        
+async def read_rollups(bucket: str, keys: List[str]) -> tuple[dict, str]:
+    """Counts for the given bucket keys from MongoDB rollups or the shared fallback store"""
+    if mongo_available() and mongo_rollups_ready:
+        counts = {key: 0 for key in keys}
+        if keys:
+            # _id range scan: "<bucket>|<first key>" .. "<bucket>|<last key>"
+            cursor = rollup_collection.find(
+                {"_id": {"$gte": f"{bucket}|{keys[0]}", "$lte": f"{bucket}|{keys[-1]}"}},
+                {"key": 1, "count": 1}
+            )
+            async for document in cursor:
+                if document["key"] in counts:
+                    counts[document["key"]] = document["count"]
+        return counts, "mongodb"
+    
+    # Grouped from the journal/SQLite file every worker writes, not this worker's own signups
+    return await store_series(fallback_storage, bucket, keys), "json_backup"
+
+async def compute_waitlist_stats() -> dict:
+    """Total, last-7-days and today signup counts"""
+    count_info = await subscriber_counter.get()
+    total = count_info["count"]
+    
+    if not total:
         return {
-            "total_subscribers": len(waitlist),
-            "recent_signups": recent_signups,
-            "today_signups": today_signups,
+            "total_subscribers": 0,
+            "recent_signups": 0,
+            "today_signups": 0,
             "timestamp": datetime.now().isoformat(),
-            "storage_source": "mongodb" if mongo_collection is not None else "json_backup"
+            "storage_source": "empty"
         }
     
+    now = datetime.now()
+    week_ago = now - timedelta(days=7)
+    
+    if mongo_available() and not mongo_rollups_ready:
+        # Rollups are still being built - count the window directly
+        today_start = datetime.combine(now.date(), datetime.min.time())
+        today_signups, recent_signups = await mongo_storage.count_signup_windows(today_start, week_ago)
+        storage_source = "mongodb"
+    else:
+        # A handful of small bucket reads; "recent" has hour granularity
+        today_counts, storage_source = await read_rollups("day", bucket_range(now, now, "day"))
+        hour_counts, _ = await read_rollups("hour", bucket_range(week_ago, now, "hour"))
+        today_signups = sum(today_counts.values())
+        recent_signups = sum(hour_counts.values())
+    
+    return {
+        "total_subscribers": total,
+        "recent_signups": recent_signups,
+        "today_signups": today_signups,
+        "timestamp": datetime.now().isoformat(),
+        "storage_source": storage_source
+    }
+
+@app.get("/api/waitlist/stats")
+async def get_waitlist_stats():
+    """Get detailed waitlist statistics from the signup rollups"""
+    try:
+        # Concurrent dashboard loads share one set of count/rollup queries
+        return await stats_reads.do("stats", compute_waitlist_stats)
     except Exception as e:
         logger.error(f"Error getting stats: {e}")
         raise HTTPException(status_code=500, detail="Failed to get statistics")
 
+@app.get("/api/waitlist/timeseries")
+async def get_waitlist_timeseries(
+    bucket: str = "day",
+    from_: Optional[str] = Query(None, alias="from"),
+    to: Optional[str] = None
+):
+    """Signups per hour or day between from= and to= (ISO dates/timestamps)"""
+    if bucket not in BUCKET_KEY_LENGTHS:
+        raise HTTPException(status_code=400, detail="bucket must be 'hour' or 'day'")
+    
+    try:
+        end = datetime.fromisoformat(to) if to else datetime.now()
+        start = datetime.fromisoformat(from_) if from_ else end - timedelta(days=7 if bucket == "hour" else 30)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="from/to must be ISO 8601 dates or timestamps")
+    
+    if start > end:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    keys = bucket_range(start, end, bucket)
+    if len(keys) > MAX_SERIES_POINTS:
+        raise HTTPException(status_code=400, detail=f"Range too large: at most {MAX_SERIES_POINTS} {bucket} buckets")
+    
+    try:
+        counts, source = await read_rollups(bucket, keys)
+        return {
+            "bucket": bucket,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "total": sum(counts.values()),
+            "series": [{"bucket": key, "count": counts[key]} for key in keys],
+            "source": source,
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error getting timeseries: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get timeseries")
+
 # Partner contact form endpoint
 @app.post("/api/partner/contact")
 async def partner_contact(form: PartnerContactForm):
@@ -759,22 +1336,12 @@ async def partner_contact(form: PartnerContactForm):
             "timestamp": datetime.now().isoformat()
         }
         
-        # Save to partners JSON file
-        partners_file = "/app/backend/data/partners.json"
-        os.makedirs(os.path.dirname(partners_file), exist_ok=True)
-        
-        partners = []
-        if os.path.exists(partners_file):
-            try:
-                with open(partners_file, 'r') as f:
-                    partners = json.load(f)
-            except:
-                partners = []
-        
-        partners.append(partner_entry)
-        
-        with open(partners_file, 'w') as f:
-            json.dump(partners, f, indent=2)
+        # Save to partners JSON file (locked read-modify-write, safe across workers)
+        try:
+            await file_io.run(update_json, PARTNERS_FILE, lambda partners: (partners or []) + [partner_entry], default=[])
+        except (json.JSONDecodeError, OSError) as e:
+            # Still deliver the inquiry by email - the file is left as it was
+            logger.error(f"❌ Error saving partner inquiry to {PARTNERS_FILE}: {e}")
             
         # 2. Send Email via Resend
         email_sent = False
@@ -814,11 +1381,10 @@ async def partner_contact(form: PartnerContactForm):
                     "reply_to": form.email
                 }
                 
-                # Send asynchronously
-                await asyncio.to_thread(resend.Emails.send, params)
-                
-                email_sent = True
-                logger.info(f"📧 Email sent to info@recalibratepain.com regarding {form.email} via Resend")
+                # Queue for delivery through the outbox
+                email_sent = await queue_email("partner_inquiry", params) is not None
+                if email_sent:
+                    logger.info(f"📧 Email to info@recalibratepain.com regarding {form.email} queued for Resend")
             except Exception as email_error:
                 logger.error(f"❌ Failed to send email via Resend: {email_error}")
                 # Don't fail the request if email fails, just log it
@@ -888,6 +1454,20 @@ async def submit_anonymous_feedback(feedback: FeedbackSubmission):
         return {"success": True, "message": "Feedback received. Thank you!"}
 
 
+def looks_like_test_data(entry: dict) -> bool:
+    """Entries left behind by manual and automated testing"""
+    email = (entry.get("email") or "").lower()
+    name = (entry.get("name") or "").lower()
+    return any([
+        "test" in email,
+        "test" in name,
+        "@test." in email,
+        "@example." in email,
+        "dualstorage" in email,
+        "mongotest" in email,
+        "atlastest" in email
+    ])
+
 @app.delete("/api/admin/cleanup-test-data")
 async def cleanup_test_data(request: Request):
     """Remove test data from database - ADMIN ONLY"""
@@ -895,50 +1475,20 @@ async def cleanup_test_data(request: Request):
     if admin_key != os.environ.get("ADMIN_SECRET_KEY", "recalibrate-admin-2026"):
         raise HTTPException(status_code=403, detail="Forbidden")
     try:
-        removed_count = 0
+        # Same rules for both stores; rows are streamed, then removed by email
+        async def remove_test_data(backend) -> int:
+            emails = [row["email"] async for row in decode_raw_rows_async(backend.iter_since())
+                      if looks_like_test_data(row)]
+            return await backend.delete(emails)
         
-        # Remove test entries from MongoDB
-        if mongo_collection is not None:
-            # Remove entries that look like test data
-            test_patterns = [
-                {"email": {"$regex": "test.*@.*", "$options": "i"}},
-                {"email": {"$regex": ".*test.*@.*", "$options": "i"}},
-                {"email": {"$regex": ".*@test\\..*", "$options": "i"}},
-                {"email": {"$regex": ".*@example\\..*", "$options": "i"}},
-                {"name": {"$regex": "test.*", "$options": "i"}},
-                {"name": {"$regex": ".*test.*", "$options": "i"}}
-            ]
-            
-            for pattern in test_patterns:
-                result = await mongo_collection.delete_many(pattern)
-                removed_count += result.deleted_count
-                logger.info(f"Removed {result.deleted_count} entries matching pattern: {pattern}")
-        
-        # Load and clean JSON backup too
-        json_data = load_json_waitlist()
-        original_json_count = len(json_data)
-        
-        # Filter out test data from JSON
-        clean_json_data = []
-        for entry in json_data:
-            email = entry.get("email", "").lower()
-            name = entry.get("name", "").lower()
-            
-            # Keep if it doesn't look like test data
-            if not any([
-                "test" in email,
-                "test" in name,
-                "@test." in email,
-                "@example." in email,
-                "dualstorage" in email,
-                "mongotest" in email,
-                "atlastest" in email
-            ]):
-                clean_json_data.append(entry)
-        
-        # Save cleaned JSON data
-        save_json_waitlist(clean_json_data)
-        json_removed = original_json_count - len(clean_json_data)
+        removed_count = await remove_test_data(mongo_storage) if mongo_available() else 0
+        json_removed = await remove_test_data(fallback_storage)
+        
+        # Removed entries must no longer count as duplicates
+        waitlist_reads.invalidate()
+        stats_reads.invalidate()
+        await load_subscriber_index()
+        drift_detector.invalidate()
         
         logger.info(f"🧹 Cleanup complete: Removed {removed_count} from MongoDB, {json_removed} from JSON")
         
@@ -954,6 +1504,143 @@ async def cleanup_test_data(request: Request):
         logger.error(f"Error during cleanup: {e}")
         raise HTTPException(status_code=500, detail=f"Cleanup failed: {str(e)}")
 
+@app.post("/api/admin/rollups/rebuild")
+async def rebuild_rollups(request: Request):
+    """Recompute the signup rollups from raw storage - ADMIN ONLY"""
+    verify_admin_key(request)
+    try:
+        if mongo_collection is not None:
+            buckets = await rebuild_mongo_rollups()
+            source = "mongodb"
+        else:
+            await load_subscriber_index()
+            buckets = None
+            source = "json_backup"
+        return {"success": True, "source": source, "buckets": buckets, "timestamp": datetime.now().isoformat()}
+    except Exception as e:
+        logger.error(f"Error rebuilding rollups: {e}")
+        raise HTTPException(status_code=500, detail="Failed to rebuild rollups")
+
+@app.get("/api/admin/metrics")
+async def admin_metrics(request: Request):
+    """Internal performance metrics - ADMIN ONLY"""
+    verify_admin_key(request)
+    return {
+        "write_batcher": write_batcher.metrics(),
+        "email_outbox": await email_outbox.metrics(),
+        "resend_client": resend_client.metrics(),
+        "join_cooldown": join_cooldown.metrics(),
+        "mongo_supervisor": mongo_supervisor.metrics(),
+        "drift_detector": drift_detector.metrics(),
+        "file_io": file_io.metrics(),
+        "event_loop": loop_monitor.metrics(),
+        "read_coalescing": {"waitlist": waitlist_reads.metrics(), "stats": stats_reads.metrics()},
+        "storage": await storage.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/api/admin/drift")
+async def storage_drift(request: Request, details: bool = False, limit: int = Query(100, ge=1, le=10000)):
+    """Compare MongoDB and JSON bucket digests; details=true lists the drifting emails - ADMIN ONLY"""
+    verify_admin_key(request)
+    try:
+        report = await drift_detector.inspect(limit) if details else await drift_detector.check()
+    except Exception as e:
+        logger.error(f"Error checking storage drift: {e}")
+        raise HTTPException(status_code=500, detail="Failed to check storage drift")
+    return {**report, **drift_detector.metrics(), "timestamp": datetime.now().isoformat()}
+
+@app.get("/api/admin/event-loop")
+async def event_loop_report(request: Request, limit: int = Query(20, ge=1, le=200)):
+    """Event-loop lag histogram and the most recent blocking calls with their stacks - ADMIN ONLY"""
+    verify_admin_key(request)
+    return {
+        "enabled": LOOP_MONITOR_ENABLED,
+        **loop_monitor.metrics(),
+        "recent_blocking_calls": loop_monitor.report(limit),
+        "timestamp": datetime.now().isoformat()
+    }
+
+# Campaigns started through the admin API (one task per campaign id)
+campaign_runners = {}
+campaign_tasks = {}
+
+def campaign_store():
+    if mongo_db is not None:
+        return MongoCampaignStore(mongo_db[CAMPAIGN_COLLECTION_NAME])
+    return FileCampaignStore(EMAIL_CAMPAIGNS_FILE, io=file_io)
+
+def iter_campaign_recipients(after: Optional[str]) -> AsyncIterator[dict]:
+    """Subscribers in email order from the primary store (the fallback while MongoDB is unavailable)"""
+    return decode_raw_rows_async(storage.iter_since(after=(after,) if after else None, order="email"))
+
+@app.post("/api/admin/campaigns")
+async def start_campaign(campaign: CampaignRequest, request: Request):
+    """Start (or resume) a bulk email campaign in the background - ADMIN ONLY"""
+    verify_admin_key(request)
+    running = campaign_tasks.get(campaign.campaign_id)
+    if running is not None and not running.done():
+        raise HTTPException(status_code=409, detail="Campaign is already running")
+    if not campaign.dry_run and not os.environ.get("RESEND_API_KEY"):
+        raise HTTPException(status_code=503, detail="RESEND_API_KEY missing")
+    try:
+        email_templates.get(campaign.template)
+    except OSError:
+        raise HTTPException(status_code=400, detail=f"Unknown template: {campaign.template}")
+    
+    runner = CampaignRunner(
+        campaign.campaign_id,
+        resend_client,
+        personalized_message(
+            email_templates, campaign.template, campaign.subject,
+            sender="Recalibrate <info@recalibratepain.com>",
+            unsubscribe_url_template=UNSUBSCRIBE_URL_TEMPLATE
+        ),
+        campaign_store(),
+        template=campaign.template,
+        subject=campaign.subject,
+        chunk_size=campaign.chunk_size,
+        concurrency=campaign.concurrency or CAMPAIGN_CONCURRENCY,
+        rate_per_second=EMAIL_RATE_PER_SECOND,
+        dry_run=campaign.dry_run,
+        breaker=resend_breaker
+    )
+    try:
+        await runner.load_state()
+    except CampaignStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    campaign_runners[campaign.campaign_id] = runner
+    campaign_tasks[campaign.campaign_id] = asyncio.create_task(
+        runner.run(iter_campaign_recipients, total=(await subscriber_counter.get())["count"])
+    )
+    logger.info(f"📣 Campaign {campaign.campaign_id} started (dry_run={campaign.dry_run})")
+    return {"success": True, "campaign_id": campaign.campaign_id, "status": RUNNING}
+
+@app.get("/api/admin/campaigns/{campaign_id}")
+async def campaign_status(campaign_id: str, request: Request, dry_run: bool = False):
+    """Progress of a campaign (or of its dry run): sent, emails/sec and ETA - ADMIN ONLY"""
+    verify_admin_key(request)
+    runner = campaign_runners.get(campaign_id)
+    if runner is not None and runner.state is not None and runner.dry_run == dry_run:
+        return runner.progress()
+    state = await campaign_store().load(campaign_state_id(campaign_id, dry_run))
+    if state is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    state.pop("_id")
+    state["campaign_id"] = campaign_id
+    return state
+
+@app.post("/api/admin/campaigns/{campaign_id}/stop")
+async def stop_campaign(campaign_id: str, request: Request):
+    """Pause a running campaign after its in-flight batches - ADMIN ONLY"""
+    verify_admin_key(request)
+    runner = campaign_runners.get(campaign_id)
+    task = campaign_tasks.get(campaign_id)
+    if runner is None or task is None or task.done():
+        raise HTTPException(status_code=404, detail="Campaign is not running")
+    runner.stop()
+    return runner.progress()
+
 @app.get("/api/debug/send-welcome")
 async def debug_send_welcome(email: str, request: Request):
     """Debug endpoint to force send a welcome email - secured"""
@@ -961,8 +1648,13 @@ async def debug_send_welcome(email: str, request: Request):
     if admin_key != os.environ.get("ADMIN_SECRET_KEY", "recalibrate-admin-2026"):
         raise HTTPException(status_code=403, detail="Forbidden")
     try:
-        await send_welcome_email(email, "Debug User")
-        return {"status": "Attempted send", "email": email, "check_logs": "Check server logs for success/failure"}
+        message_id = await queue_welcome_email(email, "Debug User")
+        return {
+            "status": "Queued" if message_id else "Not queued",
+            "email": email,
+            "message_id": message_id,
+            "check_logs": "Check server logs for success/failure"
+        }
     except Exception as e:
         return {"status": "Error", "error": str(e)}
 
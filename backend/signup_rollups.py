@@ -0,0 +1,62 @@
+"""
+Signup rollups: signup counts per hour and per day.
+
+Bucket keys are prefixes of the ISO timestamp strings the waitlist
+already stores ("2025-06-29T00" for an hour, "2025-06-29" for a day), so
+bucketing an entry is a slice and rollups can be rebuilt from the raw
+entries at any time. The MongoDB copy lives in its own collection and is
+updated with $inc; the fallback store is grouped by prefix on every read,
+so all workers see each other's signups.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+BUCKET_KEY_LENGTHS = {"hour": 13, "day": 10}
+BUCKET_STEPS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+BUCKET_FORMATS = {"hour": "%Y-%m-%dT%H", "day": "%Y-%m-%d"}
+
+# Largest series /api/waitlist/timeseries will return
+MAX_SERIES_POINTS = 5000
+
+
+def bucket_key(timestamp: str, bucket: str) -> Optional[str]:
+    """Bucket key for an ISO timestamp string"""
+    length = BUCKET_KEY_LENGTHS[bucket]
+    if not isinstance(timestamp, str) or len(timestamp) < length:
+        return None
+    return timestamp[:length]
+
+
+def bucket_start(moment: datetime, bucket: str) -> datetime:
+    if bucket == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def bucket_range(start: datetime, end: datetime, bucket: str) -> List[str]:
+    """All bucket keys from start to end inclusive"""
+    step = BUCKET_STEPS[bucket]
+    current = bucket_start(start, bucket)
+    keys = []
+    while current <= end:
+        keys.append(current.strftime(BUCKET_FORMATS[bucket]))
+        current += step
+    return keys
+
+
+def rollup_counts(timestamps: Iterable[str]) -> Dict[str, Dict[str, int]]:
+    """Per-bucket counts for a set of timestamps"""
+    counts = {bucket: defaultdict(int) for bucket in BUCKET_KEY_LENGTHS}
+    for timestamp in timestamps:
+        for bucket in BUCKET_KEY_LENGTHS:
+            key = bucket_key(timestamp, bucket)
+            if key:
+                counts[bucket][key] += 1
+    return counts
+
+
+async def store_series(backend, bucket: str, keys: List[str]) -> Dict[str, int]:
+    """Counts for the given bucket keys, grouped from a storage backend's timestamps"""
+    counts = await backend.prefix_counts(BUCKET_KEY_LENGTHS[bucket])
+    return {key: counts.get(key, 0) for key in keys}
@@ -0,0 +1,96 @@
+"""
+Single-flight request coalescing.
+
+When several requests need the same expensive read at once (a full MongoDB
+scan, a JSON backup load, the stats queries), only the first one runs it;
+the rest await the same in-flight task and share its result. An optional
+short result cache also serves callers that arrive just after it finished.
+
+Errors are shared with everyone who was waiting but never cached. A caller
+that is cancelled stops waiting without cancelling the shared read. After a
+write that must be visible to the next read, call invalidate(): later
+callers start a fresh read instead of joining the one already in flight.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls per key into one execution"""
+
+    def __init__(self, cache_ttl_seconds: float = 0.0):
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._cache: Dict[Hashable, Tuple[float, Any]] = {}
+        self._stats: Dict[Hashable, Dict[str, int]] = {}
+
+    def _key_stats(self, key: Hashable) -> Dict[str, int]:
+        if key not in self._stats:
+            self._stats[key] = {"calls": 0, "executions": 0, "coalesced": 0, "cache_hits": 0, "errors": 0}
+        return self._stats[key]
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Return fn(*args, **kwargs), sharing one execution among concurrent callers of key"""
+        stats = self._key_stats(key)
+        stats["calls"] += 1
+
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_ttl_seconds:
+            stats["cache_hits"] += 1
+            return cached[1]
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            stats["coalesced"] += 1
+        else:
+            stats["executions"] += 1
+            future = asyncio.ensure_future(fn(*args, **kwargs))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+        # shield: one caller giving up must not cancel the read for the others
+        return await asyncio.shield(future)
+
+    def _finish(self, key: Hashable, future: asyncio.Future):
+        current = self._in_flight.get(key) is future
+        if current:
+            del self._in_flight[key]
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self._key_stats(key)["errors"] += 1
+            return
+        # A read invalidated while running is already out of date - don't cache it
+        if current and self.cache_ttl_seconds > 0:
+            self._cache[key] = (time.monotonic(), future.result())
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Forget cached and in-flight results (for one key, or all) so the next call reads fresh data"""
+        keys = list(self._stats) if key is None else [key]
+        for k in keys:
+            self._cache.pop(k, None)
+            self._in_flight.pop(k, None)
+
+    def metrics(self) -> dict:
+        def summarize(stats: Dict[str, int]) -> dict:
+            calls = stats["calls"]
+            saved = stats["coalesced"] + stats["cache_hits"]
+            return {
+                **stats,
+                # Share of calls that did not run their own read
+                "coalescing_ratio": round(saved / calls, 3) if calls else None,
+            }
+
+        totals = {"calls": 0, "executions": 0, "coalesced": 0, "cache_hits": 0, "errors": 0}
+        for stats in self._stats.values():
+            for name in totals:
+                totals[name] += stats[name]
+        return {
+            "cache_ttl_seconds": self.cache_ttl_seconds,
+            "in_flight": len(self._in_flight),
+            **summarize(totals),
+            "by_key": {str(key): summarize(stats) for key, stats in self._stats.items()},
+        }
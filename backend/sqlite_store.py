@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+SQLite fallback store for the waitlist (FALLBACK_STORE=sqlite).
+
+An alternative to the waitlist.json snapshot + journal with real indexes: a
+unique index on email and an index on (timestamp, email), so duplicate
+checks, counts and "since"/keyset export pages are index lookups instead of
+Python loops over the whole file. The database runs in WAL mode, so readers
+never block the writer, and inserts are INSERT OR IGNORE batches in one
+transaction.
+
+The connection lives on one dedicated thread: sync methods (the same ones
+WaitlistJournal has, so the server can use either) hand their work to that
+thread and wait, and the *_async methods await it without blocking the
+event loop. sqlite3 caches the prepared statements per connection.
+
+One-shot import of an existing JSON backup (run from the backend directory):
+
+    python sqlite_store.py import [--json waitlist.json] [--journal waitlist.jsonl] [--db waitlist.sqlite3]
+    python sqlite_store.py status [--db waitlist.sqlite3]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+from drift_detector import bucket_ranges, email_bucket
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS waitlist (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    email_bucket TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS email_unique ON waitlist (email);
+CREATE INDEX IF NOT EXISTS timestamp_email_idx ON waitlist (timestamp, email);
+"""
+
+# Drift detection reads single buckets (prefixes of the email hash) off this index
+BUCKET_INDEX_SQL = "CREATE INDEX IF NOT EXISTS email_bucket_idx ON waitlist (email_bucket, email)"
+
+INSERT_SQL = "INSERT OR IGNORE INTO waitlist (name, email, timestamp, email_bucket) VALUES (?, ?, ?, ?)"
+SELECT_ALL_SQL = "SELECT name, email, timestamp FROM waitlist ORDER BY id"
+
+# Keyset orders served by an index: timestamp_email_idx or email_unique
+ORDER_COLUMNS = {"timestamp": ("timestamp", "email"), "email": ("email",)}
+
+# Stay under SQLITE_MAX_VARIABLE_NUMBER on older builds (999)
+MAX_SQL_VARIABLES = 900
+
+
+def entry_row(entry: dict) -> tuple:
+    return (entry.get("name", ""), entry["email"], entry.get("timestamp", ""), email_bucket(entry["email"]))
+
+
+class SQLiteWaitlistStore:
+    """WAL-mode SQLite waitlist with a thread-confined connection"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_id: Optional[int] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        # Known before any job runs, so sync methods called on the store thread
+        # (run_async(store.count) etc.) run inline instead of queueing behind themselves
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-store",
+                                            initializer=self._bind_thread)
+
+    def _bind_thread(self):
+        self._thread_id = threading.get_ident()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, isolation_level=None, cached_statements=64)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Durable at checkpoints; a power cut can lose only the last transactions, never corrupt
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        """Add and fill email_bucket on databases created before it existed"""
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(waitlist)")}
+        if "email_bucket" not in columns:
+            conn.execute("ALTER TABLE waitlist ADD COLUMN email_bucket TEXT")
+        conn.create_function("email_bucket", 1, email_bucket, deterministic=True)
+        filled = conn.execute("UPDATE waitlist SET email_bucket = email_bucket(email) WHERE email_bucket IS NULL")
+        if filled.rowcount:
+            logger.info(f"🪣 Filled email_bucket on {filled.rowcount} SQLite rows")
+        conn.execute(BUCKET_INDEX_SQL)
+
+    def _run(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run fn on the store thread and wait for it"""
+        if threading.get_ident() == self._thread_id:
+            return fn(self._connect())
+        return self._executor.submit(lambda: fn(self._connect())).result()
+
+    async def _run_async(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run fn on the store thread without blocking the event loop"""
+        return await asyncio.wrap_future(self._executor.submit(lambda: fn(self._connect())))
+
+    # WaitlistJournal-compatible interface
+
+    def load(self) -> List[dict]:
+        return self._run(lambda conn: [dict(row) for row in conn.execute(SELECT_ALL_SQL)])
+
+    def _existing(self, conn: sqlite3.Connection, emails: List[str]) -> set:
+        existing = set()
+        for start in range(0, len(emails), MAX_SQL_VARIABLES):
+            chunk = emails[start:start + MAX_SQL_VARIABLES]
+            placeholders = ",".join("?" * len(chunk))
+            existing.update(row[0] for row in conn.execute(
+                f"SELECT email FROM waitlist WHERE email IN ({placeholders})", chunk
+            ))
+        return existing
+
+    def _insert_many(self, conn: sqlite3.Connection, entries: List[dict]) -> List[bool]:
+        """Insert in one transaction; per entry, True if it was new"""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            seen = self._existing(conn, [entry["email"] for entry in entries])
+            added = []
+            for entry in entries:
+                added.append(entry["email"] not in seen)
+                seen.add(entry["email"])
+            conn.executemany(INSERT_SQL, [entry_row(entry) for entry in entries])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def append(self, entry: dict):
+        self.append_many([entry])
+
+    def append_many(self, entries: Iterable[dict]) -> int:
+        """Insert entries in one transaction; existing emails are skipped"""
+        entries = list(entries)
+        if not entries:
+            return 0
+        return sum(self._run(lambda conn: self._insert_many(conn, entries)))
+
+    def rewrite(self, entries: List[dict]):
+        """Replace every row with entries"""
+        def replace(conn: sqlite3.Connection):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM waitlist")
+                conn.executemany(INSERT_SQL, [entry_row(entry) for entry in entries])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        self._run(replace)
+
+    def compact(self) -> int:
+        """Nothing to fold - fold the WAL into the database file instead"""
+        self._run(lambda conn: conn.execute("PRAGMA wal_checkpoint(TRUNCATE)"))
+        return 0
+
+    def pending_entries(self) -> int:
+        return 0
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def count(self) -> int:
+        return self._run(lambda conn: conn.execute("SELECT COUNT(*) FROM waitlist").fetchone()[0])
+
+    # Indexed queries
+
+    def contains(self, email: str) -> bool:
+        return self._run(lambda conn: conn.execute(
+            "SELECT 1 FROM waitlist WHERE email = ?", (email,)
+        ).fetchone() is not None)
+
+    def count_since(self, timestamp: str) -> int:
+        return self._run(lambda conn: conn.execute(
+            "SELECT COUNT(*) FROM waitlist WHERE timestamp >= ?", (timestamp,)
+        ).fetchone()[0])
+
+    def page(self, after: Optional[tuple] = None, since: Optional[str] = None,
+             limit: Optional[int] = None, order: str = "timestamp") -> List[dict]:
+        """Rows in (timestamp, email) or email order after a keyset cursor, read off an index"""
+        columns = ORDER_COLUMNS[order]
+        conditions, params = [], []
+        if since:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        if after:
+            conditions.append(f"({', '.join(columns)}) > ({', '.join('?' * len(columns))})")
+            params.extend(after)
+        sql = "SELECT name, email, timestamp FROM waitlist"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {', '.join(columns)}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._run(lambda conn: [dict(row) for row in conn.execute(sql, params)])
+
+    def prefix_counts(self, length: int) -> dict:
+        """Signups per timestamp prefix (rollup rebuilds)"""
+        return self._run(lambda conn: dict(conn.execute(
+            "SELECT substr(timestamp, 1, ?) AS prefix, COUNT(*) FROM waitlist "
+            "WHERE timestamp != '' GROUP BY prefix", (length,)
+        ).fetchall()))
+
+    def emails(self, prefixes: Optional[List[str]] = None) -> List[str]:
+        """Emails, or only those in the given email_bucket prefixes (one index range each)"""
+        if prefixes is None:
+            return self._run(lambda conn: [row[0] for row in conn.execute("SELECT email FROM waitlist")])
+
+        def select(conn: sqlite3.Connection) -> List[str]:
+            emails = []
+            for low, high in bucket_ranges(prefixes):
+                emails.extend(row[0] for row in conn.execute(
+                    "SELECT email FROM waitlist WHERE email_bucket >= ? AND email_bucket < ?", (low, high)
+                ))
+            return emails
+        return self._run(select)
+
+    def delete_many(self, emails: Iterable[str]) -> int:
+        emails = list(emails)
+
+        def delete(conn: sqlite3.Connection) -> int:
+            before = conn.total_changes
+            for start in range(0, len(emails), MAX_SQL_VARIABLES):
+                chunk = emails[start:start + MAX_SQL_VARIABLES]
+                conn.execute(f"DELETE FROM waitlist WHERE email IN ({','.join('?' * len(chunk))})", chunk)
+            return conn.total_changes - before
+        return self._run(delete) if emails else 0
+
+    # Event-loop friendly variants for the request path
+
+    async def add_many_async(self, entries: List[dict]) -> List[bool]:
+        if not entries:
+            return []
+        return await self._run_async(lambda conn: self._insert_many(conn, entries))
+
+    async def run_async(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Await any of the sync methods above on the store thread"""
+        return await asyncio.wrap_future(self._executor.submit(lambda: fn(*args, **kwargs)))
+
+    def close(self):
+        def close_connection(conn: sqlite3.Connection):
+            conn.close()
+            self._conn = None
+        if self._conn is not None:
+            self._run(close_connection)
+        self._executor.shutdown(wait=True)
+
+
+def main():
+    from waitlist_journal import WaitlistJournal
+
+    logging.basicConfig(level=logging.INFO)
+    base = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="SQLite fallback store for the waitlist")
+    parser.add_argument("command", choices=["import", "status"])
+    parser.add_argument("--json", default=os.path.join(base, "waitlist.json"))
+    parser.add_argument("--journal", default=os.path.join(base, "waitlist.jsonl"))
+    parser.add_argument("--db", default=os.environ.get("SQLITE_FILE", os.path.join(base, "waitlist.sqlite3")))
+    args = parser.parse_args()
+
+    store = SQLiteWaitlistStore(args.db)
+    try:
+        if args.command == "import":
+            entries = WaitlistJournal(args.json, args.journal).load()
+            inserted = store.append_many(entry for entry in entries if entry.get("email"))
+            print(f"✅ Imported {inserted} of {len(entries)} JSON entries into {args.db} "
+                  f"({store.count()} rows total)")
+        else:
+            print(f"📄 {store.count()} rows in {args.db}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,633 @@
+"""
+Pluggable waitlist storage.
+
+Every store that can hold subscribers implements StorageBackend, so the
+API, the maintenance scripts and the benchmarks all talk to storage the
+same way:
+
+    add(entries)      per entry: True (added), False (already stored), None (failed)
+    exists(email)     is the email stored?
+    count()           number of subscribers
+    iter_since(...)   rows with timestamp >= since, in (timestamp, email) or
+                      email order, resuming after the sort key of the last row
+    stats()           backend-specific size/health details
+    delete(emails)    remove subscribers, returning how many were removed
+    prefix_counts(n)  signups per timestamp prefix of length n (rollup rebuilds)
+    iter_emails(p)    emails whose email_bucket starts with one of the prefixes p
+                      (all emails when p is None) - drift detection
+
+Implementations: MemoryBackend (benchmarks, tests), JSONBackend (snapshot +
+journal), SQLiteBackend, MongoBackend, and DualWriteBackend, which writes to
+a primary and a fallback backend and reads from the primary while it's
+available.
+"""
+import logging
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple, TypeVar
+
+import bson
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from circuit_breaker import DEFAULT_TIMEOUT, CircuitBreaker
+from drift_detector import bucket_ranges, email_bucket, in_buckets
+from file_storage import FileIOExecutor
+from sqlite_store import SQLiteWaitlistStore
+from waitlist_journal import WaitlistJournal
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DB_NAME = "RecalibrateWebsite"
+COLLECTION_NAME = "Emails"
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ORDERS = {"timestamp": ("timestamp", "email"), "email": ("email",)}
+
+# Only the exported fields ever leave MongoDB
+MONGO_PROJECTION = {"_id": 0, "name": 1, "email": 1, "timestamp": 1}
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+
+class StorageUnavailable(Exception):
+    """The backend has no live connection (e.g. MongoDB not connected)"""
+
+
+class StorageBackend(Protocol):
+    name: str
+
+    async def add(self, entries: List[dict]) -> List[Optional[bool]]: ...
+
+    async def exists(self, email: str) -> bool: ...
+
+    async def count(self) -> int: ...
+
+    def iter_since(self, since: Optional[str] = None, after: Optional[tuple] = None,
+                   limit: Optional[int] = None, order: str = "timestamp") -> AsyncIterator[dict]: ...
+
+    async def stats(self) -> dict: ...
+
+    async def delete(self, emails: Iterable[str]) -> int: ...
+
+    async def prefix_counts(self, length: int) -> Dict[str, int]: ...
+
+    def iter_emails(self, prefixes: Optional[List[str]] = None) -> AsyncIterator[str]: ...
+
+
+def sort_key(row: dict, order: str = "timestamp") -> tuple:
+    return tuple(row.get(column) or "" for column in ORDERS[order])
+
+
+def select_rows(rows: Iterable[dict], since: Optional[str], after: Optional[tuple],
+                limit: Optional[int], order: str) -> List[dict]:
+    """since/after/limit over in-memory rows (memory and JSON backends)"""
+    selected = sorted(
+        (row for row in rows
+         if row.get("email") and (not since or (row.get("timestamp") or "") >= since)
+         and (not after or sort_key(row, order) > tuple(after))),
+        key=lambda row: sort_key(row, order)
+    )
+    return selected[:limit] if limit else selected
+
+
+def count_prefixes(rows: Iterable[dict], length: int) -> Dict[str, int]:
+    """prefix_counts() over in-memory rows (memory and JSON backends)"""
+    return dict(Counter(
+        row["timestamp"][:length] for row in rows
+        if row.get("email") and isinstance(row.get("timestamp"), str) and row["timestamp"]
+    ))
+
+
+def project(row: dict) -> dict:
+    return {"name": row.get("name", ""), "email": row["email"], "timestamp": row.get("timestamp", "")}
+
+
+def _decode_chunk(chunk: List[bytes]) -> List[dict]:
+    return bson.decode_all(b"".join(chunk))
+
+
+def decode_raw_rows(rows: Iterable, chunk_rows: int = 1000) -> Iterator[dict]:
+    """Rows as dicts; RawBSONDocument rows are decoded a chunk at a time in one C call
+    (reading fields off each raw document decodes it much more slowly)"""
+    chunk: List[bytes] = []
+    for row in rows:
+        if not isinstance(row, RawBSONDocument):
+            # Flush first so rows keep their order
+            yield from _decode_chunk(chunk)
+            chunk = []
+            yield row
+            continue
+        chunk.append(row.raw)
+        if len(chunk) >= chunk_rows:
+            yield from _decode_chunk(chunk)
+            chunk = []
+    if chunk:
+        yield from _decode_chunk(chunk)
+
+
+async def decode_raw_rows_async(rows: AsyncIterator, chunk_rows: int = 1000) -> AsyncIterator[dict]:
+    """decode_raw_rows() for a row stream (exports)"""
+    chunk: List[bytes] = []
+    async for row in rows:
+        if not isinstance(row, RawBSONDocument):
+            for decoded in _decode_chunk(chunk):
+                yield decoded
+            chunk = []
+            yield row
+            continue
+        chunk.append(row.raw)
+        if len(chunk) >= chunk_rows:
+            for decoded in _decode_chunk(chunk):
+                yield decoded
+            chunk = []
+    if chunk:
+        for decoded in _decode_chunk(chunk):
+            yield decoded
+
+
+def parse_signup_time(timestamp: str) -> datetime:
+    """Native datetime for an entry's ISO timestamp string"""
+    try:
+        return datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return datetime.now()
+
+
+def mongo_upsert_spec(entry: dict) -> tuple:
+    """Filter and update for an insert-if-absent keyed on the (unique) email"""
+    return (
+        {"email": entry["email"]},
+        {"$setOnInsert": {
+            "name": entry["name"],
+            "email": entry["email"],
+            "timestamp": entry["timestamp"],
+            "signed_up_at": parse_signup_time(entry["timestamp"]),
+            "email_bucket": email_bucket(entry["email"])
+        }}
+    )
+
+
+class MemoryBackend:
+    """Dict keyed by email - the baseline for benchmarks"""
+
+    name = "memory"
+
+    def __init__(self, entries: Iterable[dict] = ()):
+        self._rows: Dict[str, dict] = {}
+        for entry in entries:
+            self._rows.setdefault(entry["email"], project(entry))
+
+    async def add(self, entries: List[dict]) -> List[Optional[bool]]:
+        added = []
+        for entry in entries:
+            is_new = entry["email"] not in self._rows
+            if is_new:
+                self._rows[entry["email"]] = project(entry)
+            added.append(is_new)
+        return added
+
+    async def exists(self, email: str) -> bool:
+        return email in self._rows
+
+    async def count(self) -> int:
+        return len(self._rows)
+
+    async def iter_since(self, since: Optional[str] = None, after: Optional[tuple] = None,
+                         limit: Optional[int] = None, order: str = "timestamp") -> AsyncIterator[dict]:
+        for row in select_rows(self._rows.values(), since, after, limit, order):
+            yield dict(row)
+
+    async def stats(self) -> dict:
+        return {"backend": self.name, "count": len(self._rows)}
+
+    async def delete(self, emails: Iterable[str]) -> int:
+        return sum(self._rows.pop(email, None) is not None for email in set(emails))
+
+    async def prefix_counts(self, length: int) -> Dict[str, int]:
+        return count_prefixes(self._rows.values(), length)
+
+    async def iter_emails(self, prefixes: Optional[List[str]] = None) -> AsyncIterator[str]:
+        for email in [email for email in self._rows if in_buckets(email, prefixes)]:
+            yield email
+
+
+class JSONBackend:
+    """waitlist.json snapshot + append-only journal
+
+    With an io executor every file operation runs on its threads, so the
+    event loop never waits on a large load or rewrite; without one (scripts)
+    they run inline.
+    """
+
+    name = "json"
+
+    def __init__(self, journal: WaitlistJournal, dedupe_on_add: bool = True,
+                 io: Optional[FileIOExecutor] = None):
+        self.journal = journal
+        # The API dedups joins against its subscriber index, so it can skip the email set here
+        self.dedupe_on_add = dedupe_on_add
+        self.io = io
+        self._emails: Optional[set] = None
+        self._emails_key: Optional[tuple] = None
+        self._emails_lock = threading.Lock()
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        if self.io is None:
+            return fn(*args)
+        return await self.io.run(fn, *args)
+
+    def _files_key(self) -> tuple:
+        return self.journal._stat_key(self.journal.snapshot_path) + self.journal._stat_key(self.journal.journal_path)
+
+    def _known_emails(self) -> set:
+        """Email set, reloaded only when the files changed behind our back (caller holds _emails_lock)"""
+        key = self._files_key()
+        if self._emails is None or key != self._emails_key:
+            self._emails = {(entry.get("email") or "").lower() for entry in self.journal.load()}
+            self._emails_key = key
+        return self._emails
+
+    def _add(self, entries: List[dict]) -> List[Optional[bool]]:
+        with self._emails_lock:
+            if not self.dedupe_on_add:
+                self.journal.append_many(project(entry) for entry in entries)
+                if self._emails is not None:
+                    self._emails.update(entry["email"] for entry in entries)
+                    self._emails_key = self._files_key()
+                return [True] * len(entries)
+
+            known = self._known_emails()
+            added, fresh = [], []
+            for entry in entries:
+                is_new = entry["email"] not in known
+                if is_new:
+                    known.add(entry["email"])
+                    fresh.append(project(entry))
+                added.append(is_new)
+            self.journal.append_many(fresh)
+            self._emails_key = self._files_key()
+            return added
+
+    def _exists(self, email: str) -> bool:
+        with self._emails_lock:
+            return email in self._known_emails()
+
+    def _emails_in(self, prefixes: Optional[List[str]]) -> List[str]:
+        # No index to range over - the bucket is computed per row, on the I/O thread
+        emails = {entry.get("email") for entry in self.journal.load() if entry.get("email")}
+        return [email for email in emails if in_buckets(email, prefixes)]
+
+    def _select(self, since: Optional[str], after: Optional[tuple], limit: Optional[int], order: str) -> List[dict]:
+        return select_rows(self.journal.load(), since, after, limit, order)
+
+    def _stats(self) -> dict:
+        files = {}
+        for path in (self.journal.snapshot_path, self.journal.journal_path):
+            try:
+                files[os.path.basename(path)] = os.path.getsize(path)
+            except OSError:
+                pass
+        return {"backend": self.name, "count": self.journal.count(),
+                "pending_journal_entries": self.journal.pending_entries(), "file_bytes": files}
+
+    def _delete(self, emails: Iterable[str]) -> int:
+        with self._emails_lock:
+            removed = self.journal.remove(emails)
+            self._emails = None
+            return removed
+
+    async def add(self, entries: List[dict]) -> List[Optional[bool]]:
+        return await self._run(self._add, entries)
+
+    async def exists(self, email: str) -> bool:
+        return await self._run(self._exists, email)
+
+    async def count(self) -> int:
+        return await self._run(self.journal.count)
+
+    async def iter_since(self, since: Optional[str] = None, after: Optional[tuple] = None,
+                         limit: Optional[int] = None, order: str = "timestamp") -> AsyncIterator[dict]:
+        # Load, filter and sort on the I/O thread; only the selected rows come back
+        for row in await self._run(self._select, since, after, limit, order):
+            yield row
+
+    async def stats(self) -> dict:
+        return await self._run(self._stats)
+
+    async def delete(self, emails: Iterable[str]) -> int:
+        return await self._run(self._delete, list(emails))
+
+    async def prefix_counts(self, length: int) -> Dict[str, int]:
+        return await self._run(lambda: count_prefixes(self.journal.load(), length))
+
+    async def iter_emails(self, prefixes: Optional[List[str]] = None) -> AsyncIterator[str]:
+        for email in await self._run(self._emails_in, prefixes):
+            yield email
+
+
+class SQLiteBackend:
+    """WAL-mode SQLite database (indexed lookups and keyset pages)"""
+
+    name = "sqlite"
+
+    def __init__(self, store: SQLiteWaitlistStore, page_size: int = 1000):
+        self.store = store
+        self.page_size = page_size
+
+    async def add(self, entries: List[dict]) -> List[Optional[bool]]:
+        return await self.store.add_many_async(entries)
+
+    async def exists(self, email: str) -> bool:
+        return await self.store.run_async(self.store.contains, email)
+
+    async def count(self) -> int:
+        return await self.store.run_async(self.store.count)
+
+    async def iter_since(self, since: Optional[str] = None, after: Optional[tuple] = None,
+                         limit: Optional[int] = None, order: str = "timestamp") -> AsyncIterator[dict]:
+        remaining = limit
+        while remaining is None or remaining > 0:
+            batch = self.page_size if remaining is None else min(self.page_size, remaining)
+            rows = await self.store.run_async(self.store.page, after=after, since=since, limit=batch, order=order)
+            for row in rows:
+                yield row
+            if len(rows) < batch:
+                return
+            after = sort_key(rows[-1], order)
+            if remaining is not None:
+                remaining -= len(rows)
+
+    async def stats(self) -> dict:
+        files = {}
+        for path in (self.store.path, f"{self.store.path}-wal"):
+            try:
+                files[os.path.basename(path)] = os.path.getsize(path)
+            except OSError:
+                pass
+        return {"backend": self.name, "count": await self.count(), "file_bytes": files}
+
+    async def delete(self, emails: Iterable[str]) -> int:
+        return await self.store.run_async(self.store.delete_many, list(emails))
+
+    async def prefix_counts(self, length: int) -> Dict[str, int]:
+        return await self.store.run_async(self.store.prefix_counts, length)
+
+    async def iter_emails(self, prefixes: Optional[List[str]] = None) -> AsyncIterator[str]:
+        for email in await self.store.run_async(self.store.emails, prefixes):
+            yield email
+
+
+class MongoBackend:
+    """Emails collection, optionally behind a circuit breaker
+
+    With raw=True, iter_since() yields RawBSONDocument rows: the driver keeps
+    each document as its BSON bytes instead of building a dict, so large
+    reads hold roughly a third of the memory. Consumers pass the rows
+    through decode_raw_rows() right before they need the fields.
+    """
+
+    name = "mongodb"
+
+    def __init__(self, get_collection: Callable[[], object], breaker: Optional[CircuitBreaker] = None,
+                 batch_size: int = 1000, raw: bool = False):
+        # A getter rather than the collection, so a reconnect's client swap is picked up
+        self._get_collection = get_collection
+        self.breaker = breaker
+        self.batch_size = batch_size
+        self.raw = raw
+
+    @property
+    def collection(self):
+        collection = self._get_collection()
+        if collection is None:
+            raise StorageUnavailable("MongoDB is not connected")
+        return collection
+
+    async def _call(self, fn, *args, timeout=DEFAULT_TIMEOUT, **kwargs):
+        if self.breaker is None:
+            return await fn(*args, **kwargs)
+        return await self.breaker.call(fn, *args, timeout=timeout, **kwargs)
+
+    async def add(self, entries: List[dict], timeout=DEFAULT_TIMEOUT) -> List[Optional[bool]]:
+        """One unordered bulk upsert; duplicates count as already stored"""
+        if not entries:
+            return []
+        added: List[Optional[bool]] = [False] * len(entries)
+        try:
+            result = await self._call(
+                self.collection.bulk_write,
+                [UpdateOne(*mongo_upsert_spec(entry), upsert=True) for entry in entries],
+                ordered=False, timeout=timeout
+            )
+            upserted_indexes = list(result.upserted_ids)
+        except BulkWriteError as e:
+            # Duplicate-key errors mean a concurrent writer already stored the email
+            for error in e.details.get("writeErrors", []):
+                if error.get("code") != 11000:
+                    added[error["index"]] = None
+            upserted_indexes = [upserted["index"] for upserted in e.details.get("upserted", [])]
+        for index in upserted_indexes:
+            added[index] = True
+        return added
+
+    async def exists(self, email: str) -> bool:
+        return await self._call(self.collection.find_one, {"email": email}, {"_id": 1}) is not None
+
+    async def count(self) -> int:
+        """Collection metadata count (no scan)"""
+        return await self._call(self.collection.estimated_document_count)
+
+    async def iter_since(self, since: Optional[str] = None, after: Optional[tuple] = None,
+                         limit: Optional[int] = None, order: str = "timestamp") -> AsyncIterator[dict]:
+        """Projected cursor sorted on an index (timestamp_email_idx or email_unique)"""
+        columns = ORDERS[order]
+        conditions = []
+        if since:
+            conditions.append({"timestamp": {"$gte": since}})
+        if after:
+            # Keyset condition: (c1 > a1) or (c1 == a1 and c2 > a2) ...
+            branches = []
+            for i, column in enumerate(columns):
+                branch = {prior: after[j] for j, prior in enumerate(columns[:i])}
+                branch[column] = {"$gt": after[i]}
+                branches.append(branch)
+            conditions.append(branches[0] if len(branches) == 1 else {"$or": branches})
+        query = {"$and": conditions} if len(conditions) > 1 else (conditions[0] if conditions else {})
+
+        collection = self.collection
+        if self.raw:
+            collection = collection.with_options(codec_options=RAW_CODEC_OPTIONS)
+        cursor = collection.find(query, MONGO_PROJECTION)
+        cursor = cursor.sort([(column, ASCENDING) for column in columns]).batch_size(self.batch_size)
+        if limit:
+            cursor = cursor.limit(limit)
+        async for document in cursor:
+            yield document
+
+    async def iter_emails(self, prefixes: Optional[List[str]] = None) -> AsyncIterator[str]:
+        """Emails read from an index only: email_unique for all of them, email_bucket_idx for some buckets"""
+        if prefixes is None:
+            # The $gte filter lets the planner answer from email_unique without touching documents
+            query = {"email": {"$gte": ""}}
+        else:
+            # Documents written without the field (out-of-band inserts, not yet backfilled) index as
+            # null; they are few, and bucketed here instead
+            ranges = [{"email_bucket": {"$gte": low, "$lt": high}} for low, high in bucket_ranges(prefixes)]
+            query = {"$or": ranges + [{"email_bucket": None}]}
+        cursor = self.collection.find(query, {"_id": 0, "email": 1, "email_bucket": 1}).batch_size(self.batch_size)
+        async for document in cursor:
+            email = document.get("email")
+            if document.get("email_bucket") is None and (not email or not in_buckets(email, prefixes)):
+                continue
+            yield email
+
+    async def backfill_email_buckets(self) -> int:
+        """Store email_bucket on documents written before the field existed"""
+        collection = self.collection
+        updated = 0
+        while True:
+            documents = await collection.find(
+                {"email_bucket": {"$exists": False}, "email": {"$type": "string"}}, {"email": 1}
+            ).limit(self.batch_size).to_list(length=self.batch_size)
+            if not documents:
+                return updated
+            await collection.bulk_write([
+                UpdateOne({"_id": document["_id"]}, {"$set": {"email_bucket": email_bucket(document["email"])}})
+                for document in documents
+            ], ordered=False)
+            updated += len(documents)
+
+    async def stats(self) -> dict:
+        return {"backend": self.name, "count": await self.count(), "collection": self.collection.name,
+                "raw_reads": self.raw, "batch_size": self.batch_size}
+
+    async def delete(self, emails: Iterable[str]) -> int:
+        emails = list(emails)
+        if not emails:
+            return 0
+        result = await self._call(self.collection.delete_many, {"email": {"$in": emails}})
+        return result.deleted_count
+
+    async def prefix_counts(self, length: int) -> Dict[str, int]:
+        """Grouped on the server - only one document per prefix comes back"""
+        pipeline = [
+            {"$match": {"timestamp": {"$type": "string"}}},
+            {"$group": {"_id": {"$substrCP": ["$timestamp", 0, length]}, "count": {"$sum": 1}}}
+        ]
+
+        async def aggregate() -> Dict[str, int]:
+            return {group["_id"]: group["count"] async for group in self.collection.aggregate(pipeline)}
+        return await self._call(aggregate, timeout=None)
+
+    async def count_signup_windows(self, *starts: datetime) -> List[int]:
+        """Signups at or after each start, via one $facet aggregation over signed_up_at_idx"""
+        pipeline = [
+            # Only the documents inside the widest window are touched
+            {"$match": {"signed_up_at": {"$gte": min(starts)}}},
+            {"$facet": {str(i): [{"$match": {"signed_up_at": {"$gte": start}}}, {"$count": "n"}]
+                        for i, start in enumerate(starts)}}
+        ]
+        result = await self._call(lambda: self.collection.aggregate(pipeline).to_list(length=1))
+        facets = result[0] if result else {}
+        return [facets[str(i)][0]["n"] if facets.get(str(i)) else 0 for i in range(len(starts))]
+
+
+class DualWriteBackend:
+    """Writes go to both backends; reads come from the primary while it's available"""
+
+    name = "dual"
+
+    def __init__(self, primary: StorageBackend, fallback: StorageBackend,
+                 primary_available: Callable[[], bool] = lambda: True):
+        self.primary = primary
+        self.fallback = fallback
+        self.primary_available = primary_available
+
+    def reader(self) -> StorageBackend:
+        """The backend reads should use right now"""
+        return self.primary if self.primary_available() else self.fallback
+
+    async def add_both(self, entries: List[dict]) -> Tuple[List[Optional[bool]], List[Optional[bool]]]:
+        """Per-side results; a side that raised reports None for every entry
+
+        Entries the primary already had (another worker stored them) are not
+        written to the fallback again and report False there too.
+        """
+        primary: List[Optional[bool]] = [None] * len(entries)
+        if self.primary_available():
+            try:
+                primary = await self.primary.add(entries)
+            except Exception as e:
+                logger.error(f"❌ {self.primary.name} write failed: {e}")
+        fallback: List[Optional[bool]] = [False] * len(entries)
+        pending = [i for i, is_new in enumerate(primary) if is_new is not False]
+        if pending:
+            try:
+                added = await self.fallback.add([entries[i] for i in pending])
+            except Exception as e:
+                logger.error(f"❌ {self.fallback.name} write failed: {e}")
+                added = [None] * len(pending)
+            for i, is_new in zip(pending, added):
+                fallback[i] = is_new
+        return primary, fallback
+
+    async def add(self, entries: List[dict]) -> List[Optional[bool]]:
+        primary, fallback = await self.add_both(entries)
+        return [None if a is None and b is None else bool(a or b) for a, b in zip(primary, fallback)]
+
+    async def exists(self, email: str) -> bool:
+        return await self.reader().exists(email)
+
+    async def count(self) -> int:
+        return await self.reader().count()
+
+    def iter_since(self, since: Optional[str] = None, after: Optional[tuple] = None,
+                   limit: Optional[int] = None, order: str = "timestamp") -> AsyncIterator[dict]:
+        return self.reader().iter_since(since, after, limit, order)
+
+    async def stats(self) -> dict:
+        sides = {}
+        for role, backend in (("primary", self.primary), ("fallback", self.fallback)):
+            try:
+                sides[role] = await backend.stats()
+            except Exception as e:
+                sides[role] = {"backend": backend.name, "error": str(e)[:200]}
+        return {"backend": self.name, "reading_from": self.reader().name, **sides}
+
+    async def prefix_counts(self, length: int) -> Dict[str, int]:
+        return await self.reader().prefix_counts(length)
+
+    def iter_emails(self, prefixes: Optional[List[str]] = None) -> AsyncIterator[str]:
+        return self.reader().iter_emails(prefixes)
+
+    async def delete(self, emails: Iterable[str]) -> int:
+        emails = list(emails)
+        removed = await self.fallback.delete(emails)
+        if self.primary_available():
+            removed = max(removed, await self.primary.delete(emails))
+        return removed
+
+
+def open_mongo_backend(mongo_url: str) -> Tuple[MongoBackend, object]:
+    """MongoBackend on the Emails collection plus its client (for scripts; close the client when done)"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(mongo_url)
+    collection = client[DB_NAME][COLLECTION_NAME]
+    return MongoBackend(lambda: collection), client
+
+
+def open_fallback_backend(base_dir: str = BACKEND_DIR) -> StorageBackend:
+    """The local fallback store selected by FALLBACK_STORE, at the API's default paths"""
+    if os.environ.get("FALLBACK_STORE", "json").lower() == "sqlite":
+        return SQLiteBackend(SQLiteWaitlistStore(
+            os.environ.get("SQLITE_FILE", os.path.join(base_dir, "waitlist.sqlite3"))
+        ))
+    return JSONBackend(WaitlistJournal(os.path.join(base_dir, "waitlist.json"),
+                                       os.path.join(base_dir, "waitlist.jsonl")))
@@ -0,0 +1,106 @@
+"""
+Constant-time subscriber counter.
+
+Serves the waitlist count from memory and refreshes it in the background
+from a cheap source (MongoDB collection metadata or a cached count of the
+JSON backup), so polling /api/waitlist/count and /api/health never
+downloads the waitlist itself.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# fetch() returns (count, source)
+CountFetcher = Callable[[], Awaitable[Tuple[int, str]]]
+
+
+class SubscriberCounter:
+    """In-memory subscriber count with a short TTL and background refresh"""
+
+    def __init__(self, fetch: CountFetcher, ttl_seconds: float = 5.0):
+        self._fetch = fetch
+        self.ttl_seconds = ttl_seconds
+        self.count = 0
+        self.source = "unknown"
+        self.refreshed_at: Optional[datetime] = None
+        self._refreshed_monotonic: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        if self._refreshed_monotonic is None:
+            return None
+        return time.monotonic() - self._refreshed_monotonic
+
+    @property
+    def is_stale(self) -> bool:
+        age = self.age_seconds
+        return age is None or age > self.ttl_seconds
+
+    async def refresh(self) -> int:
+        """Fetch the count from storage now"""
+        count, source = await self._fetch()
+        self.count = count
+        self.source = source
+        self.refreshed_at = datetime.now()
+        self._refreshed_monotonic = time.monotonic()
+        return count
+
+    def _refresh_in_background(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._safe_refresh())
+
+    async def _safe_refresh(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"❌ Subscriber count refresh failed: {e}")
+
+    async def get(self) -> dict:
+        """Return the cached count, refreshing in the background when stale"""
+        if self._refreshed_monotonic is None:
+            await self._safe_refresh()
+        elif self.is_stale:
+            self._refresh_in_background()
+        return self.snapshot()
+
+    def increment(self, by: int = 1):
+        """Account for a signup saved by this process without a refresh"""
+        self.count += by
+
+    def snapshot(self) -> dict:
+        age = self.age_seconds
+        return {
+            "count": self.count,
+            "source": self.source,
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None,
+            "age_seconds": round(age, 3) if age is not None else None,
+            "ttl_seconds": self.ttl_seconds,
+            "stale": self.is_stale,
+        }
+
+    async def _run(self):
+        while True:
+            await self._safe_refresh()
+            await asyncio.sleep(self.ttl_seconds)
+
+    def start(self):
+        """Start the periodic background refresh loop"""
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        for task in (self._loop_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._loop_task = None
+        self._refresh_task = None
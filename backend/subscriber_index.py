@@ -0,0 +1,58 @@
+"""
+Process-wide subscriber index.
+
+Keeps a set of normalized emails in memory so duplicate checks and the
+subscriber count never have to re-read MongoDB or waitlist.json.
+Loaded once at startup and updated on every successful save.
+"""
+from typing import Iterable
+
+
+def normalize_email(email: str) -> str:
+    """Normalize an email the same way join_waitlist stores it"""
+    return (email or "").lower().strip()
+
+
+class SubscriberIndex:
+    """In-memory set of subscriber emails plus a counter"""
+
+    def __init__(self):
+        self._emails = set()
+        self.loaded = False
+
+    def load(self, entries: Iterable[dict]) -> int:
+        """Replace the index contents with the given waitlist entries"""
+        emails = set()
+        for entry in entries:
+            email = normalize_email(entry.get("email", ""))
+            if email:
+                emails.add(email)
+        self._emails = emails
+        self.loaded = True
+        return len(self._emails)
+
+    def contains(self, email: str) -> bool:
+        """O(1) duplicate check"""
+        return normalize_email(email) in self._emails
+
+    def add(self, email: str) -> bool:
+        """Add an email, returning False if it was already present"""
+        email = normalize_email(email)
+        if not email or email in self._emails:
+            return False
+        self._emails.add(email)
+        return True
+
+    def discard(self, email: str) -> None:
+        """Remove an email (e.g. when a reserved save fails)"""
+        self._emails.discard(normalize_email(email))
+
+    @property
+    def count(self) -> int:
+        return len(self._emails)
+
+    def __len__(self) -> int:
+        return len(self._emails)
+
+    def __contains__(self, email: str) -> bool:
+        return self.contains(email)
@@ -1,55 +1,243 @@
+#!/usr/bin/env python3
+"""
+Reconcile the waitlist between MongoDB and the local fallback store, in both directions.
+
+Both sides are read through their storage backends in email order
+(MongoDB off the unique email index, the fallback store as the API is
+configured: JSON snapshot + journal or SQLite) and merge-diffed in a single
+pass. Emails found only in the fallback are added to MongoDB in batches
+(one unordered bulk upsert each, insert-if-absent, so a concurrent join is
+never overwritten); emails found only in MongoDB are added to the fallback.
+
+Emails are compared normalized (lowercase, stripped - how joins store
+them). Legacy rows stored in another form would break the email-order walk,
+so a quick email-only pass finds them on both sides first; they are matched
+by normalized email instead of in the walk, and copied across normalized.
+
+After a successful run a watermark is saved next to waitlist.json (one per
+direction). The next run in that direction only compares entries whose
+timestamp is at or after it (minus a small overlap for writes that were in
+flight), instead of the whole list. Use --full to ignore the watermark.
+
+    python sync_mongo.py [--direction both|to-mongo|to-json] [--dry-run] [--full]
+
+"to-json" writes into the fallback store, whichever FALLBACK_STORE selects.
+Entries added to it show up in a running API after its next restart (the
+subscriber index is built at startup).
+"""
+import argparse
 import asyncio
-import os
 import json
-from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
-
-load_dotenv()
-
-MONGO_URL = os.environ.get("MONGO_URL")
-DB_NAME = "RecalibrateWebsite"
-COLLECTION_NAME = "Emails"
-
-async def sync_json_to_mongo():
-    print(f"Connecting to {MONGO_URL.split('@')[1]}...")
-    client = AsyncIOMotorClient(MONGO_URL)
-    db = client[DB_NAME]
-    collection = db[COLLECTION_NAME]
-    
-    # 1. Get Mongo Emails
-    mongo_emails = set()
-    async for doc in collection.find({}, {"email": 1}):
-        mongo_emails.add(doc["email"].lower())
-    
-    print(f"Found {len(mongo_emails)} emails in MongoDB.")
-    
-    # 2. Get JSON Emails
-    json_path = "/app/backend/waitlist.json"
-    if not os.path.exists(json_path):
-        print("No JSON file found.")
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional
+
+from storage_backends import BACKEND_DIR, StorageBackend, open_fallback_backend, open_mongo_backend
+from subscriber_index import normalize_email
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_FILE = os.path.join(BACKEND_DIR, "sync_watermark.json")
+
+DIRECTIONS = ("both", "to-mongo", "to-json")
+
+
+def load_watermarks(path: str) -> dict:
+    """Per-direction watermarks left by previous successful runs"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_watermark(path: str, direction: str, since: str, report: dict):
+    """Atomically record the watermark a direction covered up to"""
+    watermarks = load_watermarks(path)
+    watermarks[direction] = {"since": since, "updated_at": datetime.now().isoformat(), "last_run": report}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(watermarks, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+async def legacy_emails(backend: StorageBackend) -> Dict[str, str]:
+    """Normalized email -> stored email, for rows not stored normalized (rare, pre-normalization data)"""
+    legacy = {}
+    async for email in backend.iter_emails():
+        if email != normalize_email(email):
+            legacy[normalize_email(email)] = email
+    return legacy
+
+
+async def merge_diff(fallback_entries: AsyncIterator[dict], mongo_entries: AsyncIterator[dict],
+                     counts: Dict[str, int], legacy: Optional[Dict[str, Dict[str, str]]] = None,
+                     aside: Optional[Dict[str, Dict[str, dict]]] = None) -> AsyncIterator[tuple]:
+    """Walk two email-sorted streams, yielding ("fallback"|"mongo", entry) for one-sided emails
+
+    Rows not stored normalized sort out of place, so they skip the walk and
+    go to aside[side]; a normalized row matches the other side's legacy[side]
+    row with the same normalized email.
+    """
+    legacy = legacy or {"fallback": {}, "mongo": {}}
+    aside = aside if aside is not None else {"fallback": {}, "mongo": {}}
+
+    async def next_row(side: str, entries: AsyncIterator[dict]) -> Optional[dict]:
+        async for entry in entries:
+            counts[f"{side}_scanned"] += 1
+            if entry["email"] == normalize_email(entry["email"]):
+                return entry
+            aside[side][normalize_email(entry["email"])] = entry
+        return None
+
+    left = await next_row("fallback", fallback_entries)
+    right = await next_row("mongo", mongo_entries)
+    while left is not None or right is not None:
+        if right is None or (left is not None and left["email"] < right["email"]):
+            if left["email"] in legacy["mongo"]:
+                counts["in_both"] += 1
+            else:
+                yield "fallback", left
+            left = await next_row("fallback", fallback_entries)
+        elif left is None or right["email"] < left["email"]:
+            if right["email"] in legacy["fallback"]:
+                counts["in_both"] += 1
+            else:
+                yield "mongo", right
+            right = await next_row("mongo", mongo_entries)
+        else:
+            counts["in_both"] += 1
+            left = await next_row("fallback", fallback_entries)
+            right = await next_row("mongo", mongo_entries)
+
+
+class Reconciler:
+    """One reconciliation pass between the MongoDB and fallback backends"""
+
+    def __init__(self, mongo: StorageBackend, fallback: StorageBackend, direction: str = "both",
+                 batch_size: int = 1000, dry_run: bool = False):
+        self.mongo = mongo
+        self.fallback = fallback
+        self.direction = direction
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.counts = {"fallback_scanned": 0, "mongo_scanned": 0, "in_both": 0,
+                       "only_in_fallback": 0, "only_in_mongo": 0,
+                       "added_to_mongo": 0, "already_in_mongo": 0,
+                       "added_to_fallback": 0, "already_in_fallback": 0, "failed": 0}
+        self._pending: Dict[str, List[dict]] = {"mongo": [], "fallback": []}
+
+    async def _flush(self, target: str):
+        """Add the pending batch to `target`; outside a --full run the window can hide
+        older rows on that side, which the backend reports as already stored"""
+        batch, self._pending[target] = self._pending[target], []
+        if not batch or self.dry_run:
+            return
+        backend = self.mongo if target == "mongo" else self.fallback
+        added = await backend.add(batch)
+        self.counts[f"added_to_{target}"] += added.count(True)
+        self.counts[f"already_in_{target}"] += added.count(False)
+        self.counts["failed"] += added.count(None)
+        logger.info(f"✅ Added {added.count(True)} of {len(batch)} entries to {backend.name}")
+
+    async def _queue(self, target: str, entry: dict):
+        self._pending[target].append(entry)
+        if len(self._pending[target]) >= self.batch_size:
+            await self._flush(target)
+
+    async def _one_sided(self, side: str, entry: dict):
+        if side == "fallback":
+            self.counts["only_in_fallback"] += 1
+            if self.direction in ("both", "to-mongo"):
+                await self._queue("mongo", entry)
+        else:
+            self.counts["only_in_mongo"] += 1
+            if self.direction in ("both", "to-json"):
+                await self._queue("fallback", entry)
+
+    async def run(self, since: Optional[str] = None) -> dict:
+        started = time.perf_counter()
+        legacy = {"fallback": await legacy_emails(self.fallback), "mongo": await legacy_emails(self.mongo)}
+        aside: Dict[str, Dict[str, dict]] = {"fallback": {}, "mongo": {}}
+        async for side, entry in merge_diff(self.fallback.iter_since(since, order="email"),
+                                            self.mongo.iter_since(since, order="email"),
+                                            self.counts, legacy, aside):
+            await self._one_sided(side, entry)
+
+        # Legacy rows in the window: matched by normalized email, one index lookup each
+        for side, other in (("fallback", self.mongo), ("mongo", self.fallback)):
+            other_side = "mongo" if side == "fallback" else "fallback"
+            for email, entry in aside[side].items():
+                if side == "mongo" and email in aside["fallback"]:
+                    continue  # legacy on both sides: matched in the fallback pass
+                if email in legacy[other_side]:
+                    self.counts["in_both"] += 1
+                # A normalized twin in the window was already counted by the walk
+                elif not await other.exists(email):
+                    await self._one_sided(side, {**entry, "email": email})
+        await self._flush("mongo")
+        await self._flush("fallback")
+
+        elapsed = time.perf_counter() - started
+        scanned = self.counts["fallback_scanned"] + self.counts["mongo_scanned"]
+        return {
+            "direction": self.direction,
+            "fallback_store": self.fallback.name,
+            "dry_run": self.dry_run,
+            "since": since,
+            **self.counts,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(scanned / elapsed, 1) if elapsed > 0 else None,
+        }
+
+
+async def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Reconcile the waitlist between MongoDB and the fallback store")
+    parser.add_argument("--direction", choices=DIRECTIONS, default="both")
+    parser.add_argument("--dry-run", action="store_true", help="report differences without writing")
+    parser.add_argument("--full", action="store_true", help="ignore the watermark and compare everything")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--overlap-seconds", type=float, default=300,
+                        help="re-check this much before the watermark to catch in-flight writes")
+    parser.add_argument("--data-dir", default=BACKEND_DIR, help="directory holding the fallback store")
+    parser.add_argument("--watermark-file", default=WATERMARK_FILE)
+    args = parser.parse_args()
+
+    mongo_url = os.environ.get("MONGO_URL")
+    if not mongo_url:
+        print("❌ MONGO_URL is not set")
         return
-        
-    with open(json_path, 'r') as f:
-        json_data = json.load(f)
-    
-    print(f"Found {len(json_data)} emails in JSON.")
-    
-    # 3. Sync Missing
-    added = 0
-    for entry in json_data:
-        email = entry["email"].lower()
-        if email not in mongo_emails:
-            print(f"Syncing {email} to Mongo...")
-            # Clean entry
-            new_doc = {
-                "name": entry["name"],
-                "email": email,
-                "timestamp": entry["timestamp"]
-            }
-            await collection.insert_one(new_doc)
-            added += 1
-            
-    print(f"Sync Complete. Added {added} missing emails to MongoDB.")
+    print(f"🔌 Connecting to {mongo_url.split('@')[-1]}...")
+    mongo, client = open_mongo_backend(mongo_url)
+    mongo.batch_size = args.batch_size
+
+    watermark = {} if args.full else load_watermarks(args.watermark_file).get(args.direction, {})
+    since = watermark.get("since")
+    print(f"🔍 Comparing {'everything' if since is None else f'entries since {since}'} ({args.direction})")
+    # Taken before scanning, so writes made during this run fall inside the next window
+    next_since = (datetime.now() - timedelta(seconds=args.overlap_seconds)).isoformat()
+
+    reconciler = Reconciler(mongo, open_fallback_backend(args.data_dir),
+                            direction=args.direction, batch_size=args.batch_size, dry_run=args.dry_run)
+    try:
+        report = await reconciler.run(since)
+    finally:
+        client.close()
+
+    if not args.dry_run:
+        save_watermark(args.watermark_file, args.direction, next_since, report)
+    print(json.dumps(report, indent=2))
+    print(f"⚡ {report['fallback_scanned'] + report['mongo_scanned']} rows in {report['elapsed_seconds']}s "
+          f"({report['rows_per_second']} rows/sec)")
+
 
 if __name__ == "__main__":
-    asyncio.run(sync_json_to_mongo())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,11 @@
+"""Shared test setup: backend modules import as top-level modules, as in the API"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run(coro, timeout: float = 10):
+    """Run a coroutine to completion; a hang fails the test instead of stalling the suite"""
+    return asyncio.run(asyncio.wait_for(coro, timeout))
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from conftest import run
+
+
+class Flaky:
+    def __init__(self, failing: bool = True, delay: float = 0.0):
+        self.failing = failing
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.failing:
+            raise ConnectionError("down")
+        return "ok"
+
+
+def fail(breaker, fn, times: int):
+    for _ in range(times):
+        with pytest.raises(ConnectionError):
+            run(breaker.call(fn))
+
+
+def test_opens_after_threshold_and_short_circuits():
+    breaker = CircuitBreaker("dep", failure_threshold=3, reset_timeout=60)
+    fn = Flaky()
+    fail(breaker, fn, 3)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as error:
+        run(breaker.call(fn))
+    assert fn.calls == 3
+    assert 0 < error.value.retry_after <= 60
+    assert breaker.snapshot()["short_circuited"] == 1
+
+
+def test_half_open_trial_closes_or_reopens():
+    breaker = CircuitBreaker("dep", failure_threshold=1, reset_timeout=0.05)
+    fn = Flaky()
+    fail(breaker, fn, 1)
+    run(asyncio.sleep(0.06))
+    assert breaker.state == HALF_OPEN
+    # A failed trial opens it again straight away
+    fail(breaker, fn, 1)
+    assert breaker.state == OPEN
+
+    run(asyncio.sleep(0.06))
+    fn.failing = False
+    assert run(breaker.call(fn)) == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_one_trial_at_a_time():
+    breaker = CircuitBreaker("dep", failure_threshold=1, reset_timeout=0.01)
+    fail(breaker, Flaky(), 1)
+    run(asyncio.sleep(0.02))
+    slow = Flaky(failing=False, delay=0.05)
+
+    async def concurrent():
+        return await asyncio.gather(breaker.call(slow), breaker.call(slow), return_exceptions=True)
+
+    first, second = run(concurrent())
+    assert first == "ok" and isinstance(second, CircuitOpenError)
+    assert slow.calls == 1
+
+
+def test_timeouts_count_and_answers_do_not():
+    breaker = CircuitBreaker("dep", failure_threshold=2, call_timeout=0.01,
+                             is_failure=lambda e: isinstance(e, ConnectionError))
+    fail(breaker, Flaky(), 1)
+
+    async def rejected():
+        raise ValueError("duplicate key")
+
+    # The dependency answered: resets the failure count
+    with pytest.raises(ValueError):
+        run(breaker.call(rejected))
+    assert breaker.snapshot()["consecutive_failures"] == 0
+
+    for _ in range(2):
+        with pytest.raises(asyncio.TimeoutError):
+            run(breaker.call(Flaky(failing=False, delay=1)))
+    assert breaker.state == OPEN
@@ -0,0 +1,63 @@
+from conftest import run
+from drift_detector import DriftDetector, email_bucket
+from storage_backends import MemoryBackend
+
+
+def entry(i: int) -> dict:
+    return {"name": f"User {i}", "email": f"user{i}@example.com", "timestamp": "2026-01-01T00:00:00"}
+
+
+class RecordingBackend(MemoryBackend):
+    """Memory backend that remembers which buckets were read"""
+
+    def __init__(self, entries=()):
+        super().__init__(entries)
+        self.reads = []
+
+    def iter_emails(self, prefixes=None):
+        self.reads.append(prefixes)
+        return super().iter_emails(prefixes)
+
+
+def detector(json_store, mongo_store) -> DriftDetector:
+    return DriftDetector(json_store, mongo_store, mongo_ready=lambda: True, bucket_hex_digits=2)
+
+
+def test_in_sync_after_rebuild():
+    rows = [entry(i) for i in range(50)]
+    drift = detector(MemoryBackend(rows), MemoryBackend(rows))
+    run(drift.rebuild())
+    report = run(drift.check())
+    assert report["in_sync"]
+    assert report["json_count"] == report["mongo_count"] == 50
+
+
+def test_inspect_reads_only_the_drifting_buckets():
+    rows = [entry(i) for i in range(50)]
+    json_store, mongo_store = RecordingBackend(rows + [entry(99)]), RecordingBackend(rows)
+    drift = detector(json_store, mongo_store)
+    run(drift.rebuild())
+
+    report = run(drift.inspect())
+    assert not report["in_sync"]
+    assert report["only_in_json"] == ["user99@example.com"]
+    assert report["only_in_mongo"] == []
+    bucket = email_bucket("user99@example.com")[:2]
+    assert json_store.reads[-1] == mongo_store.reads[-1] == [bucket]
+
+
+def test_writes_from_other_workers_are_not_reported_as_drift():
+    rows = [entry(i) for i in range(20)]
+    json_store, mongo_store = MemoryBackend(rows), MemoryBackend(rows)
+    drift = detector(json_store, mongo_store)
+    run(drift.rebuild())
+
+    # Another worker stored a join on both sides; this worker only saw its own MongoDB write
+    run(json_store.add([entry(50)]))
+    run(mongo_store.add([entry(50)]))
+    drift.record_write("user50@example.com", mongo_saved=True, json_saved=False)
+    assert not drift.compare()["in_sync"]
+
+    report = run(drift.check())
+    assert report["in_sync"]
+    assert drift.compare()["in_sync"]
@@ -0,0 +1,162 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+from circuit_breaker import CircuitBreaker
+from conftest import run
+from email_campaign import (
+    COMPLETED, FAILED, PAUSED, CampaignRunner, CampaignStateError, FileCampaignStore, campaign_state_id
+)
+from resend_client import ResendError, is_outage
+
+RECIPIENTS = [{"email": f"user{i:03d}@example.com", "name": f"User {i}"} for i in range(250)]
+
+
+class FakeResend:
+    """Records delivered emails; replays of an idempotency key deliver nothing"""
+
+    def __init__(self, fail_on_call=None, delay: float = 0.0):
+        self.fail_on_call = fail_on_call
+        self.delay = delay
+        self.calls = 0
+        self.keys = set()
+        self.delivered = Counter()
+
+    async def send_batch(self, messages, idempotency_key=None):
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.delay)
+        if call == self.fail_on_call:
+            raise ResendError("rejected", 422)
+        if idempotency_key in self.keys:
+            return
+        self.keys.add(idempotency_key)
+        self.delivered.update(message["to"][0] for message in messages)
+
+
+async def recipients(after):
+    for recipient in RECIPIENTS:
+        if after is None or recipient["email"] > after:
+            yield recipient
+
+
+def build(recipient):
+    return {"to": [recipient["email"]]}
+
+
+def runner(store, client, **kwargs):
+    return CampaignRunner("launch", client, build, store, chunk_size=20, concurrency=3,
+                          rate_per_second=0, retry_base_seconds=0, **kwargs)
+
+
+def test_campaign_sends_every_recipient_once(tmp_path):
+    store = FileCampaignStore(str(tmp_path / "campaigns.json"))
+    client = FakeResend()
+    progress = run(runner(store, client).run(recipients, total=len(RECIPIENTS)))
+    assert progress["status"] == COMPLETED
+    assert progress["sent"] == len(RECIPIENTS)
+    assert set(client.delivered) == {r["email"] for r in RECIPIENTS}
+    assert max(client.delivered.values()) == 1
+
+
+def test_failed_campaign_resumes_after_last_confirmed_batch(tmp_path):
+    store = FileCampaignStore(str(tmp_path / "campaigns.json"))
+    client = FakeResend(fail_on_call=4)
+    progress = run(runner(store, client).run(recipients))
+    assert progress["status"] == FAILED
+    assert 0 < progress["sent"] < len(RECIPIENTS)
+
+    # Same client: batches sent before the failure replay with their key and deliver nothing
+    client.fail_on_call = None
+    progress = run(runner(store, client).run(recipients))
+    assert progress["status"] == COMPLETED
+    assert set(client.delivered) == {r["email"] for r in RECIPIENTS}
+    assert max(client.delivered.values()) == 1
+
+
+def test_stopped_campaign_pauses_and_resumes(tmp_path):
+    store = FileCampaignStore(str(tmp_path / "campaigns.json"))
+    client = FakeResend(delay=0.01)
+
+    async def start_and_stop():
+        first = runner(store, client)
+        task = asyncio.create_task(first.run(recipients))
+        await asyncio.sleep(0.03)
+        first.stop()
+        return await task
+
+    progress = run(start_and_stop())
+    assert progress["status"] == PAUSED
+    assert progress["sent"] < len(RECIPIENTS)
+
+    progress = run(runner(store, client).run(recipients))
+    assert progress["status"] == COMPLETED
+    assert progress["sent"] == len(RECIPIENTS)
+    assert max(client.delivered.values()) == 1
+
+
+def test_dry_run_does_not_consume_the_real_campaign(tmp_path):
+    store = FileCampaignStore(str(tmp_path / "campaigns.json"))
+    client = FakeResend()
+    rehearsal = run(runner(store, client, dry_run=True).run(recipients))
+    assert rehearsal["status"] == COMPLETED
+    assert client.calls == 0
+
+    progress = run(runner(store, client).run(recipients))
+    assert progress["status"] == COMPLETED
+    assert len(client.delivered) == len(RECIPIENTS)
+    assert run(store.load(campaign_state_id("launch", True)))["dry_run"] is True
+    assert run(store.load("launch"))["dry_run"] is False
+
+
+def test_checkpoint_from_the_other_mode_is_not_resumed(tmp_path):
+    store = FileCampaignStore(str(tmp_path / "campaigns.json"))
+    # A checkpoint written before dry runs had their own key
+    run(store.save({"_id": "launch", "dry_run": True, "status": PAUSED, "cursor": RECIPIENTS[99]["email"],
+                    "sent": 100, "batches": 5}))
+    client = FakeResend()
+    with pytest.raises(CampaignStateError):
+        run(runner(store, client).run(recipients))
+    assert client.calls == 0
+
+
+def test_open_circuit_pauses_batches_without_spending_attempts(tmp_path):
+    store = FileCampaignStore(str(tmp_path / "campaigns.json"))
+    breaker = CircuitBreaker("resend", failure_threshold=1, reset_timeout=0.05, is_failure=is_outage)
+
+    async def outage():
+        raise ResendError("unreachable")
+
+    # Tripped elsewhere (e.g. by the outbox) just before the campaign starts
+    with pytest.raises(ResendError):
+        run(breaker.call(outage))
+    client = FakeResend()
+    progress = run(runner(store, client, breaker=breaker, max_batch_attempts=1).run(recipients))
+    assert progress["status"] == COMPLETED
+    assert len(client.delivered) == len(RECIPIENTS)
+    assert breaker.short_circuited > 0
+
+
+def test_resume_resends_in_flight_batches_unchanged_after_new_signups(tmp_path):
+    store = FileCampaignStore(str(tmp_path / "campaigns.json"))
+    audience = list(RECIPIENTS)
+
+    async def live_recipients(after):
+        for recipient in sorted(audience, key=lambda r: r["email"]):
+            if after is None or recipient["email"] > after:
+                yield recipient
+
+    # The second batch fails while the third is delivered but not yet checkpointed
+    client = FakeResend(fail_on_call=2, delay=0.01)
+    progress = run(runner(store, client).run(live_recipients))
+    assert progress["status"] == FAILED
+    assert client.delivered["user045@example.com"] == 1
+
+    # Someone signs up inside the failed batch's range before the resume
+    audience.append({"email": "user025a@example.com", "name": "Late"})
+    client.fail_on_call = None
+    progress = run(runner(store, client).run(live_recipients))
+    assert progress["status"] == COMPLETED
+    assert max(client.delivered.values()) == 1
+    assert set(client.delivered) == {r["email"] for r in audience}
@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from circuit_breaker import CircuitBreaker
+from conftest import run
+from email_outbox import PENDING, SENDING, EmailOutbox, FileOutboxStore
+
+
+def message(i: int) -> dict:
+    return {"_id": f"m{i}", "kind": "welcome", "payload": {"email": f"user{i}@example.com"},
+            "status": PENDING, "attempts": 0, "next_attempt_at": datetime.now() - timedelta(seconds=1)}
+
+
+def drain(store) -> list:
+    claimed = []
+    while (claimed_message := run(store.claim())) is not None:
+        claimed.append(claimed_message["_id"])
+    return claimed
+
+
+def test_workers_sharing_the_file_never_claim_the_same_message(tmp_path):
+    path = str(tmp_path / "outbox.jsonl")
+    first, second = FileOutboxStore(path), FileOutboxStore(path)
+    run(first.load_async())
+    run(second.load_async())
+    for i in range(10):
+        run((first if i % 2 else second).enqueue(message(i)))
+
+    claimed = []
+    for _ in range(5):
+        claimed += [run(first.claim())["_id"], run(second.claim())["_id"]]
+    assert run(first.claim()) is None and run(second.claim()) is None
+    assert sorted(claimed) == sorted(f"m{i}" for i in range(10))
+    assert run(first.depth()) == run(second.depth()) == {"pending": 10, "dead": 0}
+
+
+def test_expired_lease_is_claimed_again(tmp_path):
+    path = str(tmp_path / "outbox.jsonl")
+    dead_worker, worker = FileOutboxStore(path, lease_seconds=-1), FileOutboxStore(path)
+    run(dead_worker.enqueue(message(1)))
+    assert run(dead_worker.claim())["status"] == SENDING
+    # A restart doesn't reset another worker's live lease, but an expired one is reclaimed
+    run(worker.load_async())
+    assert run(worker.claim())["_id"] == "m1"
+
+
+def test_compaction_keeps_other_workers_appends(tmp_path):
+    path = str(tmp_path / "outbox.jsonl")
+    first, second = FileOutboxStore(path), FileOutboxStore(path)
+    run(first.enqueue(message(1)))
+    run(first.complete(run(first.claim())))
+    run(second.enqueue(message(2)))
+    # Restarting worker compacts; the other keeps appending to the new file
+    run(first.load_async())
+    run(second.enqueue(message(3)))
+
+    restarted = FileOutboxStore(path)
+    run(restarted.load_async())
+    assert sorted(restarted._messages) == ["m2", "m3"]
+    assert sorted(drain(second)) == ["m2", "m3"]
+    assert drain(first) == []
+
+
+class HangingCollection:
+    """A MongoDB collection during an outage: every call waits forever"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def insert_one(self, document):
+        self.calls += 1
+        await asyncio.sleep(3600)
+
+    find_one_and_update = insert_one
+
+
+def test_enqueue_falls_back_to_the_file_without_waiting_on_mongodb(tmp_path):
+    collection = HangingCollection()
+    breaker = CircuitBreaker("mongodb", failure_threshold=1, reset_timeout=60, call_timeout=0.05,
+                             is_failure=lambda e: isinstance(e, ConnectionError))
+    outbox = EmailOutbox(deliver=None, file_store=FileOutboxStore(str(tmp_path / "outbox.jsonl")))
+    outbox.attach_mongo(collection, breaker=breaker, available=breaker.allow)
+
+    async def enqueue_twice():
+        # The first times out and opens the breaker; the second never touches MongoDB
+        return [await asyncio.wait_for(outbox.enqueue("welcome", {"to": "a@example.com"}), timeout=1)
+                for _ in range(2)]
+
+    run(enqueue_twice())
+    assert collection.calls == 1
+    assert run(outbox.file_store.depth())["pending"] == 2
+    assert run(outbox._claim())[0] is outbox.file_store
+    assert collection.calls == 1
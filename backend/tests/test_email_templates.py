@@ -0,0 +1,48 @@
+from email_templates import CompiledTemplate, TemplateCache, personalized_message
+
+SOURCE = """<html><head><style>.title { color: red; font-weight: bold }</style></head>
+<body>
+  <!-- internal note -->
+  <h1 class="title" style="margin: 0">Hi {{name}}</h1>
+  <p>Thanks for joining.</p>
+  <a href="{{unsubscribe_url}}">Unsubscribe</a>
+</body></html>"""
+
+
+def test_compiling_inlines_classes_and_strips_comments():
+    template = CompiledTemplate("welcome", SOURCE)
+    assert '<h1 style="color: red; font-weight: bold; margin: 0;">' in template.html
+    assert "<style" not in template.html and "internal note" not in template.html
+    assert "\n" not in template.html
+    assert template.slots == ["name", "unsubscribe_url"]
+
+
+def test_render_escapes_html_but_not_text():
+    body = CompiledTemplate("welcome", SOURCE).render(name="<Ann & Bo>", unsubscribe_url="https://x.io/u")
+    assert "Hi &lt;Ann &amp; Bo&gt;" in body["html"]
+    assert "Hi <Ann & Bo>" in body["text"]
+    assert "Unsubscribe (https://x.io/u)" in body["text"]
+
+
+def test_cache_recompiles_only_when_the_file_changes(tmp_path):
+    path = tmp_path / "welcome.html"
+    path.write_text(SOURCE, encoding="utf-8")
+    cache = TemplateCache(str(tmp_path))
+    assert cache.preload() == ["welcome"]
+    first = cache.get("welcome")
+    assert cache.load("welcome") is first
+
+    path.write_text(SOURCE.replace("Thanks", "Welcome"), encoding="utf-8")
+    edited = cache.load("welcome")
+    assert edited is not first
+    assert cache.versions() == {"welcome": edited.version}
+
+
+def test_personalized_message_fills_name_and_unsubscribe_link(tmp_path):
+    (tmp_path / "welcome.html").write_text(SOURCE, encoding="utf-8")
+    build = personalized_message(TemplateCache(str(tmp_path)), "welcome", "Welcome", "Team <hi@x.io>",
+                                 "https://x.io/unsubscribe?email={email}")
+    message = build({"email": "a+b@example.com", "name": "  "})
+    assert message["to"] == ["a+b@example.com"]
+    assert "Hi there" in message["text"]
+    assert message["headers"]["List-Unsubscribe"] == "<https://x.io/unsubscribe?email=a%2Bb%40example.com>"
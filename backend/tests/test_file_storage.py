@@ -0,0 +1,105 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from conftest import run
+from file_storage import FileIOExecutor, read_json, update_json
+from waitlist_journal import WaitlistJournal
+
+PROCESSES = 4
+WRITES = 50
+
+
+def append_counts(path: str, worker: int, start):
+    start.wait()
+    for i in range(WRITES):
+        update_json(path, lambda data: data.append(f"{worker}-{i}"), default=[])
+
+
+def append_entries(directory: str, worker: int, start):
+    journal = WaitlistJournal(f"{directory}/waitlist.json", f"{directory}/waitlist.jsonl")
+    start.wait()
+    for i in range(WRITES):
+        journal.append({"name": f"Worker {worker}", "email": f"w{worker}-{i}@example.com",
+                        "timestamp": f"2026-01-01T10:{worker:02d}:{i:02d}"})
+        # Compactions race the other workers' appends
+        if i % 10 == 9:
+            journal.compact()
+
+
+def run_workers(target, path: str):
+    context = multiprocessing.get_context("spawn")
+    start = context.Barrier(PROCESSES)
+    workers = [context.Process(target=target, args=(path, worker, start)) for worker in range(PROCESSES)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+    assert [worker.exitcode for worker in workers] == [0] * PROCESSES
+
+
+def expected(pattern: str) -> set:
+    return {pattern.format(worker=worker, i=i) for worker in range(PROCESSES) for i in range(WRITES)}
+
+
+def test_concurrent_update_json_loses_no_writes(tmp_path):
+    path = str(tmp_path / "counts.json")
+    run_workers(append_counts, path)
+
+    data = read_json(path)
+    assert len(data) == PROCESSES * WRITES
+    assert set(data) == expected("{worker}-{i}")
+
+
+def test_concurrent_appends_and_compactions_lose_no_entries(tmp_path):
+    run_workers(append_entries, str(tmp_path))
+
+    journal = WaitlistJournal(str(tmp_path / "waitlist.json"), str(tmp_path / "waitlist.jsonl"))
+    assert {entry["email"] for entry in journal.load()} == expected("w{worker}-{i}@example.com")
+    journal.compact()
+    # The snapshot is whole, parseable JSON with every entry exactly once
+    snapshot = read_json(journal.snapshot_path)
+    assert len(snapshot) == PROCESSES * WRITES
+    assert {entry["email"] for entry in snapshot} == expected("w{worker}-{i}@example.com")
+
+
+def test_io_executor_runs_off_the_loop_and_bounds_the_queue():
+    io = FileIOExecutor(max_workers=1, max_queue=1)
+    loop_thread = threading.get_ident()
+
+    def slow_read(i: int):
+        time.sleep(0.02)
+        return i, threading.get_ident()
+
+    async def burst():
+        return await asyncio.gather(*(io.run(slow_read, i) for i in range(4)))
+
+    try:
+        results = run(burst())
+    finally:
+        io.shutdown()
+    assert [i for i, _ in results] == [0, 1, 2, 3]
+    assert all(thread != loop_thread for _, thread in results)
+    metrics = io.metrics()
+    # One running plus one queued; the other callers waited for a slot
+    assert metrics["max_depth_seen"] == 2
+    assert metrics["waited_for_slot"] == 2
+    assert metrics["completed"] == 4 and metrics["depth"] == 0
+    assert metrics["run_ms"]["p50"] >= 15
+
+
+def test_io_executor_passes_errors_through():
+    io = FileIOExecutor(max_workers=1)
+
+    def broken():
+        raise OSError("disk full")
+
+    try:
+        with pytest.raises(OSError):
+            run(io.run(broken))
+    finally:
+        io.shutdown()
+    assert io.metrics()["failed"] == 1
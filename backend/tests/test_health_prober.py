@@ -0,0 +1,58 @@
+import asyncio
+
+from conftest import run
+from health_prober import HealthProber
+
+
+def test_results_are_cached_with_their_age():
+    calls = []
+
+    async def mongodb():
+        calls.append("mongodb")
+        return {"ok": True, "status": "✅ Connected"}
+
+    prober = HealthProber({"mongodb": mongodb}, interval_seconds=60)
+    assert prober.result("mongodb") is None
+    assert not prober.is_fresh("mongodb")
+
+    run(prober.probe_all())
+    result = prober.result("mongodb")
+    assert result["ok"] and result["status"] == "✅ Connected"
+    assert result["age_seconds"] >= 0 and "checked_at" in result
+    assert not any(key.startswith("_") for key in result)
+    assert prober.is_fresh("mongodb")
+    assert not prober.is_fresh("mongodb", max_age_seconds=-1)
+    # Reads never run the probe again
+    prober.result("mongodb")
+    assert calls == ["mongodb"]
+
+
+def test_a_raising_probe_is_reported_as_failed():
+    async def json_backup():
+        raise OSError("disk gone")
+
+    prober = HealthProber({"json_backup": json_backup})
+    run(prober.probe_all())
+    result = prober.result("json_backup")
+    assert not result["ok"]
+    assert "disk gone" in result["status"]
+
+
+def test_the_background_loop_keeps_probing_until_stopped():
+    calls = []
+
+    async def probe():
+        calls.append(1)
+        return {"ok": True, "status": "ok"}
+
+    prober = HealthProber({"probe": probe}, interval_seconds=0.01)
+
+    async def background():
+        prober.start()
+        await asyncio.sleep(0.05)
+        await prober.stop()
+        stopped_at = len(calls)
+        await asyncio.sleep(0.03)
+        return stopped_at
+
+    assert run(background()) == len(calls) >= 2
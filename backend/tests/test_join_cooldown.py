@@ -0,0 +1,105 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from circuit_breaker import CircuitBreaker
+from conftest import run
+from join_cooldown import JoinCooldown
+
+
+def test_repeat_joins_cool_down_until_the_window_ends():
+    cooldown = JoinCooldown(window_seconds=0.05)
+    assert not run(cooldown.check("a@example.com"))
+    assert run(cooldown.check("a@example.com"))
+    assert not run(cooldown.check("b@example.com"))
+
+    run(asyncio.sleep(0.06))
+    assert not run(cooldown.check("a@example.com"))
+    assert cooldown.metrics()["hits"] == 1
+
+
+def test_release_lets_a_retry_through():
+    cooldown = JoinCooldown(window_seconds=60)
+    run(cooldown.check("a@example.com"))
+    run(cooldown.release("a@example.com"))
+    assert not run(cooldown.check("a@example.com"))
+
+
+def test_least_recently_joined_emails_are_evicted():
+    cooldown = JoinCooldown(window_seconds=60, max_entries=2)
+    for email in ("a@example.com", "b@example.com", "c@example.com"):
+        run(cooldown.check(email))
+    assert cooldown.evictions == 1
+    assert not run(cooldown.check("a@example.com"))
+    assert run(cooldown.check("c@example.com"))
+
+
+def test_zero_window_disables_the_cooldown():
+    cooldown = JoinCooldown(window_seconds=0)
+    assert not run(cooldown.check("a@example.com"))
+    assert not run(cooldown.check("a@example.com"))
+
+
+def test_workers_share_the_window_through_mongodb():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+
+    async def two_workers():
+        collection = mongomock_motor.AsyncMongoMockClient()["waitlist"]["JoinCooldowns"]
+        first, second = JoinCooldown(window_seconds=60), JoinCooldown(window_seconds=60)
+        await first.attach_mongo(collection)
+        await second.attach_mongo(collection)
+        return await first.check("a@example.com"), await second.check("a@example.com"), second
+
+    first_blocked, second_blocked, second = run(two_workers())
+    assert (first_blocked, second_blocked) == (False, True)
+    assert second.shared_hits == 1
+
+
+def test_shared_expiry_is_stored_in_utc(monkeypatch):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    # A host far from UTC: naive local times would expire the TTL row hours off
+    monkeypatch.setenv("TZ", "Asia/Kolkata")
+    time.tzset()
+    try:
+        async def join():
+            collection = mongomock_motor.AsyncMongoMockClient()["waitlist"]["JoinCooldowns"]
+            cooldown = JoinCooldown(window_seconds=600)
+            await cooldown.attach_mongo(collection)
+            await cooldown.check("a@example.com")
+            return await collection.find_one({"_id": "a@example.com"})
+
+        until = run(join())["until"].replace(tzinfo=timezone.utc)
+    finally:
+        monkeypatch.delenv("TZ")
+        time.tzset()
+    expected = datetime.now(timezone.utc) + timedelta(seconds=600)
+    assert abs((until - expected).total_seconds()) < 60
+
+
+class CountingCollection:
+    def __init__(self):
+        self.calls = 0
+
+    async def create_index(self, *args, **kwargs):
+        pass
+
+    async def update_one(self, *args, **kwargs):
+        self.calls += 1
+
+    delete_one = update_one
+
+
+def test_open_breaker_skips_the_shared_claim():
+    breaker = CircuitBreaker("mongodb", failure_threshold=1, reset_timeout=60)
+    collection = CountingCollection()
+    cooldown = JoinCooldown(window_seconds=60)
+    run(cooldown.attach_mongo(collection, breaker=breaker, available=breaker.allow))
+    breaker.record_failure(ConnectionError("down"))
+
+    assert not run(cooldown.check("a@example.com"))
+    assert run(cooldown.check("a@example.com"))
+    run(cooldown.release("a@example.com"))
+    assert collection.calls == 0
+    assert cooldown.shared_errors == 0
@@ -0,0 +1,15 @@
+from latency_stats import latency_summary
+
+
+def test_percentiles_are_reported_in_milliseconds():
+    summary = latency_summary([i / 1000 for i in range(1, 101)])
+    assert summary == {"p50": 51.0, "p99": 100.0, "max": 100.0}
+
+
+def test_empty_windows_report_none():
+    assert latency_summary([]) == {"p50": None, "p99": None, "max": None}
+
+
+def test_max_seconds_overrides_the_window_maximum():
+    assert latency_summary([0.001, 0.002], max_seconds=0.5)["max"] == 500.0
+    assert latency_summary([], max_seconds=0.25) == {"p50": None, "p99": None, "max": 250.0}
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+from conftest import run
+from file_storage import FileIOExecutor
+from loop_monitor import EventLoopMonitor
+
+
+def block_the_loop(seconds: float):
+    time.sleep(seconds)
+
+
+def test_blocking_call_shows_up_as_lag_and_a_captured_stack():
+    monitor = EventLoopMonitor(interval_seconds=0.01, threshold_seconds=0.05)
+
+    async def monitored():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        block_the_loop(0.3)
+        # A few samples after the stall close its report
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    run(monitored())
+    metrics = monitor.metrics()
+    assert metrics["lag_ms"]["max"] >= 250
+    assert metrics["lag_histogram_ms"]["le_500"] >= 1
+    assert sum(metrics["lag_histogram_ms"].values()) == metrics["samples"]
+    assert metrics["blocking_calls"] == 1
+
+    [report] = monitor.report()
+    assert not report["ongoing"]
+    assert report["blocked_ms"] >= 250
+    assert report["coroutine"].endswith("monitored")
+    assert any("block_the_loop" in line for line in report["stack"])
+
+
+def test_a_responsive_loop_reports_no_blocking_calls():
+    monitor = EventLoopMonitor(interval_seconds=0.01, threshold_seconds=0.2)
+
+    async def idle():
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+    run(idle())
+    assert monitor.metrics()["samples"] > 0
+    assert monitor.metrics()["blocking_calls"] == 0
+    assert monitor.report() == []
+
+
+def test_reports_are_bounded_and_newest_first():
+    monitor = EventLoopMonitor(interval_seconds=0.01, threshold_seconds=0.03, max_reports=2)
+
+    async def three_stalls():
+        monitor.start()
+        for seconds in (0.1, 0.15, 0.2):
+            await asyncio.sleep(0.03)
+            block_the_loop(seconds)
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+    run(three_stalls())
+    assert monitor.metrics()["blocking_calls"] == 3
+    reports = monitor.report()
+    assert len(reports) == 2
+    assert reports[0]["blocked_ms"] > reports[1]["blocked_ms"] >= 130
+    assert monitor.report(limit=1) == reports[:1]
+
+
+def test_blocking_work_on_the_io_executor_does_not_stall_the_loop():
+    monitor = EventLoopMonitor(interval_seconds=0.01, threshold_seconds=0.05)
+    io = FileIOExecutor(max_workers=1)
+
+    async def offloaded():
+        monitor.start()
+        await io.run(block_the_loop, 0.2)
+        await monitor.stop()
+
+    try:
+        run(offloaded())
+    finally:
+        io.shutdown()
+    assert monitor.metrics()["blocking_calls"] == 0
+    assert monitor.metrics()["lag_ms"]["max"] < 50
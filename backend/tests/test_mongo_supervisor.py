@@ -0,0 +1,84 @@
+import asyncio
+
+from conftest import run
+from mongo_supervisor import MongoSupervisor, jittered_backoff
+
+
+class FakeMongo:
+    """Down for the first few connects, then up with a JSON-only window to replay"""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.connected = False
+        self.pending = 3
+        self.replays = 0
+        self.failed_replays = 0
+
+    async def connect(self) -> bool:
+        if self.failures:
+            self.failures -= 1
+            if self.failures % 2:
+                raise ConnectionError("server selection timeout")
+            return False
+        self.connected = True
+        return True
+
+    async def replay(self) -> int:
+        self.replays += 1
+        if self.failed_replays:
+            self.failed_replays -= 1
+            raise ConnectionError("replay interrupted")
+        replayed, self.pending = self.pending, 0
+        return replayed
+
+
+def supervisor_for(mongo: FakeMongo) -> MongoSupervisor:
+    return MongoSupervisor(
+        is_connected=lambda: mongo.connected,
+        connect=mongo.connect,
+        needs_replay=lambda: mongo.pending > 0,
+        replay=mongo.replay,
+        base_delay_seconds=0.001,
+        max_delay_seconds=0.005,
+        check_interval_seconds=0.005,
+    )
+
+
+def test_backoff_is_jittered_and_capped():
+    delays = [jittered_backoff(attempt, 1.0, 8.0) for attempt in range(10) for _ in range(20)]
+    assert all(0 <= delay <= 8.0 for delay in delays)
+    assert all(jittered_backoff(0, 1.0, 8.0) <= 1.0 for _ in range(20))
+
+
+def test_reconnects_then_replays_the_json_only_window_once():
+    mongo = FakeMongo(failures=3)
+    supervisor = supervisor_for(mongo)
+
+    async def supervise():
+        supervisor.start()
+        await asyncio.sleep(0.1)
+        await supervisor.stop()
+
+    run(supervise())
+    metrics = supervisor.metrics()
+    assert metrics["connected"] and metrics["reconnects"] == 1
+    assert metrics["reconnect_attempts"] == 0
+    assert metrics["last_error"] == "server selection timeout"
+    assert (metrics["replayed_entries"], metrics["replay_pending"]) == (3, False)
+    assert mongo.replays == 1
+
+
+def test_a_failed_replay_is_retried_on_the_next_check():
+    mongo = FakeMongo(failures=0)
+    mongo.failed_replays = 1
+    supervisor = supervisor_for(mongo)
+
+    async def supervise():
+        supervisor.start()
+        await asyncio.sleep(0.05)
+        await supervisor.stop()
+
+    run(supervise())
+    assert supervisor.replayed == 3
+    assert mongo.replays == 2
+    assert supervisor.last_error == "replay interrupted"
@@ -0,0 +1,32 @@
+import bson
+from bson.raw_bson import RawBSONDocument
+
+from conftest import run
+from storage_backends import decode_raw_rows, decode_raw_rows_async
+
+
+def raw(i: int) -> RawBSONDocument:
+    return RawBSONDocument(bson.encode({"name": f"User {i}", "email": f"user{i}@example.com",
+                                        "timestamp": f"2026-01-01T10:00:{i:02d}"}))
+
+
+def test_raw_rows_decode_in_chunks_to_plain_dicts():
+    rows = list(decode_raw_rows([raw(i) for i in range(5)], chunk_rows=2))
+    assert [row["email"] for row in rows] == [f"user{i}@example.com" for i in range(5)]
+    assert all(type(row) is dict for row in rows)
+
+
+def test_decoded_rows_keep_their_order_around_plain_rows():
+    plain = {"name": "Plain", "email": "plain@example.com", "timestamp": ""}
+    rows = [raw(0), plain, raw(1), raw(2)]
+    expected = ["user0@example.com", "plain@example.com", "user1@example.com", "user2@example.com"]
+    assert [row["email"] for row in decode_raw_rows(rows, chunk_rows=10)] == expected
+
+    async def stream():
+        for row in rows:
+            yield row
+
+    async def decode():
+        return [row["email"] async for row in decode_raw_rows_async(stream(), chunk_rows=10)]
+
+    assert run(decode()) == expected
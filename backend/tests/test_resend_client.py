@@ -0,0 +1,63 @@
+import httpx
+import pytest
+
+from conftest import run
+from fake_resend_server import create_app
+from resend_client import AsyncResendClient, ResendError, is_outage
+
+EMAIL = {"from": "Team <hi@x.io>", "to": ["a@example.com"], "subject": "Hi", "html": "<p>Hi</p>"}
+
+
+def client_for(app) -> AsyncResendClient:
+    return AsyncResendClient("re_test", base_url="http://resend.test", transport=httpx.ASGITransport(app=app))
+
+
+def test_sends_and_batches_through_one_pool():
+    client = client_for(create_app(latency_ms=0, jitter_ms=0))
+
+    async def send():
+        try:
+            single = await client.send(EMAIL)
+            first = await client.send_batch([EMAIL, EMAIL], idempotency_key="campaign-1")
+            retried = await client.send_batch([EMAIL, EMAIL], idempotency_key="campaign-1")
+            return single, first, retried
+        finally:
+            await client.aclose()
+
+    single, first, retried = run(send())
+    assert single["id"]
+    assert len(first["data"]) == 2
+    # The fake honours Idempotency-Key like Resend: the retry gets the same ids back
+    assert retried == first
+    assert client.metrics()["requests_ok"] == 3
+    assert not client.metrics()["open"]
+
+
+def test_client_errors_are_not_outages():
+    client = client_for(create_app(latency_ms=0, jitter_ms=0))
+    with pytest.raises(ResendError) as raised:
+        run(client.send({**EMAIL, "to": []}))
+    run(client.aclose())
+    assert raised.value.status_code == 422
+    assert not raised.value.retryable
+    assert not is_outage(raised.value)
+    assert client.metrics()["requests_failed"] == 1
+
+
+def test_server_and_network_errors_are_retryable_outages():
+    client = client_for(create_app(latency_ms=0, jitter_ms=0, error_rate=1.0))
+    with pytest.raises(ResendError) as raised:
+        run(client.send(EMAIL))
+    run(client.aclose())
+    assert raised.value.status_code == 500
+    assert raised.value.retryable and is_outage(raised.value)
+
+    def unreachable(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = AsyncResendClient("re_test", transport=httpx.MockTransport(unreachable))
+    with pytest.raises(ResendError) as raised:
+        run(client.send(EMAIL))
+    run(client.aclose())
+    assert raised.value.status_code is None
+    assert raised.value.retryable and is_outage(raised.value)
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from conftest import run
+from signup_rollups import bucket_key, bucket_range, rollup_counts, store_series
+from storage_backends import JSONBackend
+from waitlist_journal import WaitlistJournal
+
+
+def test_bucket_keys_are_timestamp_prefixes():
+    assert bucket_key("2026-01-02T10:15:00", "hour") == "2026-01-02T10"
+    assert bucket_key("2026-01-02T10:15:00", "day") == "2026-01-02"
+    assert bucket_key("2026-01", "day") is None
+    assert bucket_range(datetime(2026, 1, 1, 22, 30), datetime(2026, 1, 2, 1), "hour") == [
+        "2026-01-01T22", "2026-01-01T23", "2026-01-02T00", "2026-01-02T01"
+    ]
+
+    counts = rollup_counts(["2026-01-01T22:00:00", "2026-01-01T22:59:59", "2026-01-02T00:00:00", ""])
+    assert dict(counts["hour"]) == {"2026-01-01T22": 2, "2026-01-02T00": 1}
+    assert dict(counts["day"]) == {"2026-01-01": 2, "2026-01-02": 1}
+
+
+def test_every_worker_sees_signups_stored_by_another(tmp_path):
+    def worker() -> JSONBackend:
+        return JSONBackend(WaitlistJournal(str(tmp_path / "waitlist.json"), str(tmp_path / "waitlist.jsonl")))
+
+    first, second = worker(), worker()
+    run(first.add([{"name": "A", "email": "a@example.com", "timestamp": "2026-01-01T22:10:00"}]))
+    run(second.add([{"name": "B", "email": "b@example.com", "timestamp": "2026-01-02T00:05:00"}]))
+
+    keys = bucket_range(datetime(2026, 1, 1), datetime(2026, 1, 2), "day")
+    for backend in (first, second):
+        assert run(store_series(backend, "day", keys)) == {"2026-01-01": 1, "2026-01-02": 1}
+        assert run(store_series(backend, "hour", ["2026-01-01T22", "2026-01-01T23"])) == {
+            "2026-01-01T22": 1, "2026-01-01T23": 0
+        }
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from conftest import run
+from single_flight import SingleFlight
+
+
+class SlowRead:
+    def __init__(self, delay: float = 0.02, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.executions = 0
+
+    async def __call__(self):
+        self.executions += 1
+        execution = self.executions
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("down")
+        return execution
+
+
+def test_concurrent_calls_share_one_execution():
+    flight, read = SingleFlight(), SlowRead()
+
+    async def burst():
+        return await asyncio.gather(*(flight.do("waitlist", read) for _ in range(5)))
+
+    assert run(burst()) == [1] * 5
+    assert read.executions == 1
+    assert flight.metrics()["by_key"]["waitlist"]["coalesced"] == 4
+    # Nothing in flight and no cache: the next call reads again
+    assert run(flight.do("waitlist", read)) == 2
+
+
+def test_errors_are_shared_but_not_cached():
+    flight, read = SingleFlight(cache_ttl_seconds=60), SlowRead(fail=True)
+
+    async def burst():
+        return await asyncio.gather(*(flight.do("stats", read) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ConnectionError) for result in run(burst()))
+    assert read.executions == 1
+    read.fail = False
+    assert run(flight.do("stats", read)) == 2
+
+
+def test_results_are_cached_for_the_ttl():
+    flight, read = SingleFlight(cache_ttl_seconds=0.05), SlowRead(delay=0)
+    assert run(flight.do("stats", read)) == 1
+    assert run(flight.do("stats", read)) == 1
+    run(asyncio.sleep(0.06))
+    assert run(flight.do("stats", read)) == 2
+
+
+def test_a_cancelled_caller_does_not_cancel_the_shared_read():
+    flight, read = SingleFlight(), SlowRead(delay=0.05)
+
+    async def one_gives_up():
+        impatient = asyncio.ensure_future(flight.do("waitlist", read))
+        patient = asyncio.ensure_future(flight.do("waitlist", read))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+        return await patient
+
+    assert run(one_gives_up()) == 1
+
+
+def test_invalidate_starts_a_fresh_read_and_drops_the_stale_one():
+    flight, read = SingleFlight(cache_ttl_seconds=60), SlowRead(delay=0.02)
+
+    async def write_during_read():
+        before = asyncio.ensure_future(flight.do("waitlist", read))
+        await asyncio.sleep(0.005)
+        flight.invalidate("waitlist")
+        after = await flight.do("waitlist", read)
+        return await before, after
+
+    assert run(write_during_read()) == (1, 2)
+    # The read that started before the write was not cached
+    assert run(flight.do("waitlist", read)) == 2
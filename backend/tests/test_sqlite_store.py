@@ -0,0 +1,95 @@
+import os
+import sqlite3
+
+from conftest import run
+from drift_detector import email_bucket
+from sqlite_store import SQLiteWaitlistStore
+from storage_backends import SQLiteBackend
+
+
+def entry(i: int) -> dict:
+    return {"name": f"User {i}", "email": f"user{i}@example.com", "timestamp": f"2026-01-01T00:00:{i:02d}"}
+
+
+def test_run_async_on_a_fresh_store_does_not_deadlock(tmp_path):
+    # No db file yet: the first job on the store thread calls back into _run
+    store = SQLiteWaitlistStore(str(tmp_path / "waitlist.sqlite3"))
+    try:
+        assert run(store.run_async(store.count), timeout=5) == 0
+    finally:
+        store.close()
+
+
+def test_backend_exists_first_call_on_existing_db(tmp_path):
+    path = str(tmp_path / "waitlist.sqlite3")
+    seed = SQLiteWaitlistStore(path)
+    seed.append_many([entry(1)])
+    seed.close()
+
+    store = SQLiteWaitlistStore(path)
+    try:
+        backend = SQLiteBackend(store)
+        assert run(backend.exists("user1@example.com"), timeout=5)
+        assert not run(backend.exists("user2@example.com"), timeout=5)
+    finally:
+        store.close()
+
+
+def test_add_reports_new_and_duplicate_entries(tmp_path):
+    store = SQLiteWaitlistStore(str(tmp_path / "waitlist.sqlite3"))
+    try:
+        backend = SQLiteBackend(store)
+        assert run(backend.add([entry(1), entry(2), entry(1)])) == [True, True, False]
+        assert run(backend.add([entry(2), entry(3)])) == [False, True]
+        assert run(backend.count()) == 3
+        assert run(backend.delete(["user2@example.com", "missing@example.com"])) == 1
+        assert store.count() == 2
+    finally:
+        store.close()
+
+
+def test_iter_since_pages_in_timestamp_order(tmp_path):
+    store = SQLiteWaitlistStore(str(tmp_path / "waitlist.sqlite3"))
+    try:
+        store.append_many(entry(i) for i in reversed(range(10)))
+        backend = SQLiteBackend(store, page_size=3)
+
+        async def collect(**kwargs):
+            return [row["email"] async for row in backend.iter_since(**kwargs)]
+
+        assert run(collect()) == [f"user{i}@example.com" for i in range(10)]
+        assert run(collect(since=entry(5)["timestamp"], limit=4)) == [f"user{i}@example.com" for i in range(5, 9)]
+    finally:
+        store.close()
+
+
+def test_database_runs_in_wal_mode(tmp_path):
+    path = str(tmp_path / "waitlist.sqlite3")
+    store = SQLiteWaitlistStore(path)
+    store.append_many([entry(1)])
+    store.close()
+    assert os.path.exists(path)
+    assert sqlite3.connect(path).execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_databases_without_email_bucket_are_migrated(tmp_path):
+    path = str(tmp_path / "waitlist.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE waitlist (id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT NOT NULL, timestamp TEXT NOT NULL);
+        CREATE UNIQUE INDEX email_unique ON waitlist (email);
+    """)
+    conn.executemany("INSERT INTO waitlist (name, email, timestamp) VALUES (?, ?, ?)",
+                     [(e["name"], e["email"], e["timestamp"]) for e in map(entry, range(20))])
+    conn.commit()
+    conn.close()
+
+    store = SQLiteWaitlistStore(path)
+    try:
+        bucket = email_bucket("user7@example.com")[:2]
+        emails = store.emails([bucket])
+        assert "user7@example.com" in emails
+        assert all(email_bucket(email).startswith(bucket) for email in emails)
+        assert sorted(store.emails()) == sorted(entry(i)["email"] for i in range(20))
+    finally:
+        store.close()
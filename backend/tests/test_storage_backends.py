@@ -0,0 +1,97 @@
+from datetime import datetime
+
+import pytest
+
+from conftest import run
+from sqlite_store import SQLiteWaitlistStore
+from storage_backends import DualWriteBackend, JSONBackend, MemoryBackend, MongoBackend, SQLiteBackend
+from waitlist_journal import WaitlistJournal
+
+
+def entry(i: int, day: int = 1) -> dict:
+    return {"name": f"User {i}", "email": f"user{i:02d}@example.com", "timestamp": f"2026-01-{day:02d}T10:00:{i:02d}"}
+
+
+@pytest.fixture(params=["memory", "json", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryBackend()
+    elif request.param == "json":
+        yield JSONBackend(WaitlistJournal(str(tmp_path / "waitlist.json"), str(tmp_path / "waitlist.jsonl")))
+    else:
+        store = SQLiteWaitlistStore(str(tmp_path / "waitlist.sqlite3"))
+        yield SQLiteBackend(store, page_size=2)
+        store.close()
+
+
+async def emails(rows) -> list:
+    return [row["email"] async for row in rows]
+
+
+def test_backend_contract(backend):
+    assert run(backend.add([entry(1), entry(2, day=2), entry(1)])) == [True, True, False]
+    assert run(backend.add([entry(3, day=2)])) == [True]
+    assert run(backend.exists("user01@example.com"))
+    assert not run(backend.exists("nobody@example.com"))
+    assert run(backend.count()) == 3
+
+    assert run(emails(backend.iter_since())) == ["user01@example.com", "user02@example.com", "user03@example.com"]
+    assert run(emails(backend.iter_since(since="2026-01-02"))) == ["user02@example.com", "user03@example.com"]
+    assert run(emails(backend.iter_since(after=("user01@example.com",), order="email", limit=1))) == [
+        "user02@example.com"
+    ]
+    assert run(backend.prefix_counts(10)) == {"2026-01-01": 1, "2026-01-02": 2}
+
+    assert run(backend.delete(["user02@example.com"])) == 1
+    assert run(backend.count()) == 2
+
+
+class BrokenBackend(MemoryBackend):
+    name = "broken"
+
+    async def add(self, entries):
+        raise ConnectionError("down")
+
+
+def test_dual_write_reports_each_side():
+    primary, fallback = BrokenBackend(), MemoryBackend()
+    dual = DualWriteBackend(primary, fallback)
+    assert run(dual.add_both([entry(1)])) == ([None], [True])
+    # Stored on one side counts as stored
+    assert run(dual.add([entry(2)])) == [True]
+
+
+def test_dual_reads_from_fallback_while_primary_is_unavailable():
+    primary, fallback = MemoryBackend([entry(1)]), MemoryBackend([entry(2)])
+    available = {"primary": True}
+    dual = DualWriteBackend(primary, fallback, primary_available=lambda: available["primary"])
+    assert run(emails(dual.iter_since())) == ["user01@example.com"]
+
+    available["primary"] = False
+    assert run(emails(dual.iter_since())) == ["user02@example.com"]
+    # The primary is skipped, not written to
+    assert run(dual.add_both([entry(3)])) == ([None], [True])
+    assert not run(primary.exists("user03@example.com"))
+
+
+def test_dual_write_skips_the_fallback_for_emails_the_primary_already_has(tmp_path):
+    # Another worker stored user01 in the primary first
+    primary = MemoryBackend([entry(1)])
+    journal = WaitlistJournal(str(tmp_path / "waitlist.json"), str(tmp_path / "waitlist.jsonl"))
+    fallback = JSONBackend(journal, dedupe_on_add=False)
+    dual = DualWriteBackend(primary, fallback)
+    assert run(dual.add_both([entry(1), entry(2)])) == ([False, True], [False, True])
+    assert journal.pending_entries() == 1
+
+
+def test_mongo_counts_signup_windows_over_native_dates():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient()["waitlist"]["Emails"]
+    mongo = MongoBackend(lambda: collection)
+
+    async def windows():
+        await mongo.add([entry(1, day=1), entry(2, day=5), entry(3, day=7), entry(4, day=7)])
+        return await mongo.count_signup_windows(datetime(2026, 1, 7), datetime(2026, 1, 2), datetime(2026, 2, 1))
+
+    assert run(windows()) == [2, 3, 0]
+    assert run(collection.find_one({"email": "user02@example.com"}))["signed_up_at"] == datetime(2026, 1, 5, 10, 0, 2)
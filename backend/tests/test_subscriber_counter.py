@@ -0,0 +1,67 @@
+import asyncio
+
+from conftest import run
+from subscriber_counter import SubscriberCounter
+
+
+class CountSource:
+    def __init__(self, count: int = 10):
+        self.count = count
+        self.fetches = 0
+        self.fail = False
+
+    async def __call__(self):
+        self.fetches += 1
+        if self.fail:
+            raise ConnectionError("down")
+        return self.count, "mongodb"
+
+
+def test_first_get_fetches_then_serves_from_memory():
+    source = CountSource()
+    counter = SubscriberCounter(source, ttl_seconds=60)
+
+    async def reads():
+        first = await counter.get()
+        counter.increment()
+        return first, await counter.get()
+
+    first, second = run(reads())
+    assert (first["count"], first["source"], first["stale"]) == (10, "mongodb", False)
+    assert second["count"] == 11
+    assert source.fetches == 1
+
+
+def test_stale_count_is_served_while_a_background_refresh_runs():
+    source = CountSource()
+    counter = SubscriberCounter(source, ttl_seconds=0.01)
+
+    async def reads():
+        await counter.get()
+        source.count = 12
+        await asyncio.sleep(0.02)
+        stale = await counter.get()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return stale, await counter.get()
+
+    stale, refreshed = run(reads())
+    assert stale["count"] == 10 and stale["stale"]
+    assert refreshed["count"] == 12
+    assert source.fetches == 2
+
+
+def test_a_failed_refresh_keeps_the_last_count():
+    source = CountSource()
+    counter = SubscriberCounter(source, ttl_seconds=0.01)
+
+    async def reads():
+        await counter.get()
+        source.fail = True
+        await asyncio.sleep(0.02)
+        await counter.get()
+        await asyncio.sleep(0.01)
+        return await counter.get()
+
+    assert run(reads())["count"] == 10
+    assert source.fetches >= 2
@@ -0,0 +1,30 @@
+from subscriber_index import SubscriberIndex, normalize_email
+
+
+def test_lookups_ignore_case_and_surrounding_whitespace():
+    index = SubscriberIndex()
+    assert index.load([{"email": " A@Example.com "}, {"email": "a@example.com"}, {"email": ""}, {}]) == 1
+    assert index.loaded
+    assert "a@example.com" in index
+    assert index.contains("  A@EXAMPLE.COM")
+    assert normalize_email(None) == ""
+
+
+def test_add_and_discard_keep_the_count_exact():
+    index = SubscriberIndex()
+    assert index.add("b@example.com")
+    assert not index.add("B@example.com ")
+    assert not index.add("")
+    assert index.count == len(index) == 1
+
+    index.discard(" B@EXAMPLE.com")
+    assert "b@example.com" not in index
+    assert index.count == 0
+
+
+def test_load_replaces_the_previous_contents():
+    index = SubscriberIndex()
+    index.add("old@example.com")
+    index.load([{"email": "new@example.com"}])
+    assert "old@example.com" not in index
+    assert "new@example.com" in index
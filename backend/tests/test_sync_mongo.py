@@ -0,0 +1,32 @@
+from conftest import run
+from storage_backends import MemoryBackend
+from sync_mongo import Reconciler
+
+
+def row(email: str) -> dict:
+    return {"name": "N", "email": email, "timestamp": "2026-01-01T10:00:00"}
+
+
+async def emails(backend) -> list:
+    return sorted([entry["email"] async for entry in backend.iter_since(order="email")])
+
+
+def test_mixed_case_legacy_rows_match_their_normalized_twin():
+    fallback = MemoryBackend([row("Bob@Example.com "), row("alice@example.com"), row("Dave@Example.com")])
+    mongo = MemoryBackend([row("bob@example.com"), row("ALICE@example.com"), row("carol@example.com")])
+    report = run(Reconciler(mongo, fallback).run())
+
+    assert report["in_both"] == 2
+    assert (report["only_in_fallback"], report["only_in_mongo"]) == (1, 1)
+    # Copied across normalized, with no second bob or alice on either side
+    assert run(emails(mongo)) == ["ALICE@example.com", "bob@example.com", "carol@example.com", "dave@example.com"]
+    assert run(emails(fallback)) == ["Bob@Example.com ", "Dave@Example.com", "alice@example.com",
+                                     "carol@example.com"]
+
+
+def test_second_pass_finds_nothing_to_copy():
+    fallback = MemoryBackend([row("Zed@example.com"), row("amy@example.com")])
+    mongo = MemoryBackend([row("bea@example.com")])
+    run(Reconciler(mongo, fallback).run())
+    report = run(Reconciler(mongo, fallback).run())
+    assert report["only_in_fallback"] == report["only_in_mongo"] == 0
@@ -0,0 +1,37 @@
+import json
+
+from conftest import run
+from storage_backends import MemoryBackend
+from waitlist_export import encode_json, make_cursor, parse_cursor
+
+ROWS = [{"name": "A", "email": "Zed@example.com", "timestamp": "2026-01-01T10:00:00"},
+        {"name": "B", "email": "amy@example.com", "timestamp": "2026-01-01T10:00:00"},
+        {"name": "C", "email": "bea@example.com", "timestamp": "2026-01-02T09:00:00"}]
+
+
+async def collect(rows) -> list:
+    return [row async for row in rows]
+
+
+def test_cursor_pages_cover_every_row_once():
+    backend = MemoryBackend(ROWS)
+    seen, after = [], None
+    while True:
+        page = run(collect(backend.iter_since(after=parse_cursor(after) if after else None, limit=1)))
+        if not page:
+            break
+        seen.append(page[0]["email"])
+        after = make_cursor(page[-1])
+    assert seen == ["Zed@example.com", "amy@example.com", "bea@example.com"]
+
+
+def test_json_export_streams_a_valid_document_with_next_cursor():
+    async def export():
+        chunks = [chunk async for chunk in encode_json(MemoryBackend(ROWS).iter_since(limit=2), {"source": "test"},
+                                                       limit=2)]
+        return json.loads("".join(chunks))
+
+    document = run(export())
+    assert [row["email"] for row in document["waitlist"]] == ["Zed@example.com", "amy@example.com"]
+    assert document["total_count"] == 2
+    assert document["next_cursor"] == "2026-01-01T10:00:00|amy@example.com"
@@ -0,0 +1,47 @@
+import json
+
+from waitlist_journal import WaitlistJournal
+
+
+def entry(i: int) -> dict:
+    return {"name": f"User {i}", "email": f"user{i}@example.com", "timestamp": f"2026-01-01T10:00:{i:02d}"}
+
+
+def journal_at(tmp_path) -> WaitlistJournal:
+    return WaitlistJournal(str(tmp_path / "waitlist.json"), str(tmp_path / "waitlist.jsonl"))
+
+
+def test_replay_reads_snapshot_then_journal_skipping_torn_lines_and_duplicates(tmp_path):
+    journal = journal_at(tmp_path)
+    journal.rewrite([entry(1), entry(2)])
+    journal.append_many([entry(3), entry(1)])
+    with open(journal.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"name": "Torn", "email": "to')
+
+    assert [e["email"] for e in journal.load()] == ["user1@example.com", "user2@example.com", "user3@example.com"]
+    assert journal.count() == 3
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(tmp_path):
+    journal = journal_at(tmp_path)
+    journal.append_many([entry(1), entry(2)])
+    journal.append(entry(2))
+    assert journal.pending_entries() == 3
+
+    assert journal.compact() == 3
+    assert journal.pending_entries() == 0
+    assert journal.load_snapshot() == [entry(1), entry(2)]
+    assert journal.compact() == 0
+
+
+def test_count_parses_compact_snapshots_and_tracks_changes(tmp_path):
+    journal = journal_at(tmp_path)
+    # Written by another tool: no indentation, a duplicate, an "email" inside a value
+    with open(journal.snapshot_path, "w", encoding="utf-8") as f:
+        json.dump([entry(1), entry(1), {**entry(2), "name": '"email"'}], f)
+    assert journal.count() == 2
+
+    journal.append(entry(3))
+    assert journal.count() == 3
+    journal.remove(["user1@example.com"])
+    assert journal.count() == 2
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from conftest import run
+from write_batcher import WriteBatcher
+
+
+class Recorder:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.batches = []
+
+    async def __call__(self, items):
+        self.batches.append(list(items))
+        if self.fail:
+            raise ConnectionError("down")
+        return [item * 10 for item in items]
+
+
+def test_concurrent_submits_share_a_flush_and_get_their_own_result():
+    flush = Recorder()
+    batcher = WriteBatcher(flush, max_batch_size=100, linger_ms=20)
+
+    async def submit_all():
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        await batcher.stop()
+        return results
+
+    assert run(submit_all()) == [i * 10 for i in range(10)]
+    assert flush.batches == [list(range(10))]
+    assert batcher.metrics()["avg_batch_size"] == 10
+
+
+def test_batches_are_capped_at_max_batch_size():
+    flush = Recorder()
+    batcher = WriteBatcher(flush, max_batch_size=4, linger_ms=20)
+
+    async def submit_all():
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        await batcher.stop()
+        return results
+
+    assert run(submit_all()) == [i * 10 for i in range(10)]
+    assert [len(batch) for batch in flush.batches] == [4, 4, 2]
+    assert batcher.metrics()["max_batch_seen"] == 4
+
+
+def test_a_failed_flush_fails_every_caller_in_the_batch():
+    batcher = WriteBatcher(Recorder(fail=True), linger_ms=20)
+
+    async def submit_all():
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+        await batcher.stop()
+        return results
+
+    results = run(submit_all())
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert batcher.flush_errors == 1
+
+
+def test_stop_flushes_what_is_still_queued():
+    flush = Recorder()
+    batcher = WriteBatcher(flush, linger_ms=1000)
+
+    async def submit_then_stop():
+        pending = [asyncio.ensure_future(batcher.submit(i)) for i in range(3)]
+        await asyncio.sleep(0.01)
+        await batcher.stop()
+        return await asyncio.gather(*pending)
+
+    assert run(submit_then_stop()) == [0, 10, 20]
+    assert sum(len(batch) for batch in flush.batches) == 3
+
+
+def test_flush_must_return_one_result_per_item():
+    async def short(items):
+        return items[:-1]
+
+    batcher = WriteBatcher(short, linger_ms=0)
+
+    async def submit():
+        try:
+            return await batcher.submit(1)
+        finally:
+            await batcher.stop()
+
+    with pytest.raises(RuntimeError):
+        run(submit())
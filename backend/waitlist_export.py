@@ -0,0 +1,92 @@
+"""
+Streaming waitlist export.
+
+Rows are exported in (timestamp, email) order so exports can be paged
+with a keyset cursor: pass the last row you received as
+``after=<timestamp>|<email>`` to continue from the row after it. Encoders
+turn an async stream of rows into NDJSON, CSV or a JSON document chunk by
+chunk, so memory use stays flat regardless of the list size.
+"""
+import csv
+import io
+import json
+from typing import AsyncIterator, Optional, Tuple
+
+EXPORT_FIELDS = ("name", "email", "timestamp")
+EXPORT_FORMATS = ("json", "ndjson", "csv")
+EXPORT_MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Rows encoded per chunk written to the response
+CHUNK_ROWS = 500
+
+
+def make_cursor(row: dict) -> str:
+    """Cursor pointing just past this row"""
+    return f"{row.get('timestamp') or ''}|{row.get('email') or ''}"
+
+
+def parse_cursor(cursor: str) -> Tuple[str, str]:
+    """Split an ``after=`` cursor into (timestamp, email), exactly as make_cursor wrote it
+
+    Backends order rows by the stored email, so the email is not re-normalized.
+    """
+    timestamp, separator, email = cursor.partition("|")
+    if not separator or not email:
+        raise ValueError("cursor must look like <timestamp>|<email>")
+    return timestamp, email
+
+
+def project(row: dict) -> dict:
+    return {field: row.get(field) for field in EXPORT_FIELDS}
+
+
+async def encode_ndjson(rows: AsyncIterator[dict]) -> AsyncIterator[str]:
+    chunk = []
+    async for row in rows:
+        chunk.append(json.dumps(project(row), ensure_ascii=False))
+        if len(chunk) >= CHUNK_ROWS:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+async def encode_csv(rows: AsyncIterator[dict]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    count = 0
+    async for row in rows:
+        writer.writerow([row.get(field) or "" for field in EXPORT_FIELDS])
+        count += 1
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+async def encode_json(rows: AsyncIterator[dict], trailer: dict, limit: Optional[int] = None) -> AsyncIterator[str]:
+    """Legacy export document, streamed: the waitlist array first, then the summary fields"""
+    yield '{"waitlist": ['
+    count = 0
+    last_row = None
+    chunk = []
+    async for row in rows:
+        chunk.append(json.dumps(project(row), ensure_ascii=False))
+        count += 1
+        last_row = row
+        if len(chunk) >= CHUNK_ROWS:
+            yield ("," if count > len(chunk) else "") + ",".join(chunk)
+            chunk = []
+    if chunk:
+        yield ("," if count > len(chunk) else "") + ",".join(chunk)
+
+    summary = dict(trailer)
+    summary["total_count"] = count
+    summary["next_cursor"] = make_cursor(last_row) if limit and count == limit and last_row else None
+    yield "], " + json.dumps(summary, ensure_ascii=False)[1:]
@@ -0,0 +1,162 @@
+"""
+Append-only JSONL journal for the waitlist JSON backup.
+
+The legacy waitlist.json array is kept as a snapshot and every new signup
+is appended to waitlist.jsonl as one line, so a write no longer re-reads
+and re-serializes the whole list. The loader reads the snapshot followed
+by the journal; compaction folds the journal back into the snapshot.
+
+All writers (and the full loader) hold the advisory lock from file_storage
+on waitlist.json.lock, so appends from one worker can't land between
+another worker's compaction read and its journal truncate.
+
+Migration: existing deployments need no conversion step - the current
+waitlist.json simply becomes the first snapshot. To fold the journal back
+into waitlist.json by hand (e.g. before copying the file elsewhere) run:
+
+    python waitlist_journal.py compact
+"""
+import json
+import logging
+import os
+import sys
+from typing import Iterable, List, Optional
+
+from file_storage import atomic_write_json_unlocked, file_lock
+
+logger = logging.getLogger(__name__)
+
+
+class WaitlistJournal:
+    """waitlist.json snapshot + waitlist.jsonl append-only journal"""
+
+    def __init__(self, snapshot_path: str, journal_path: str):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self._count_cache: Optional[tuple] = None
+
+    def _ensure_directory(self):
+        os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+
+    def load_snapshot(self) -> List[dict]:
+        """Read the legacy JSON array"""
+        if not os.path.exists(self.snapshot_path):
+            return []
+        with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def load_journal(self) -> List[dict]:
+        """Read journal lines, skipping a torn or corrupt line"""
+        entries = []
+        if not os.path.exists(self.journal_path):
+            return entries
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"⚠️ Skipping corrupt journal line {line_number} in {self.journal_path}")
+        return entries
+
+    def load(self) -> List[dict]:
+        """Snapshot followed by journal, first occurrence of an email wins"""
+        with file_lock(self.snapshot_path, exclusive=False):
+            return self._load_unlocked()
+
+    def _load_unlocked(self) -> List[dict]:
+        entries = []
+        seen = set()
+        for entry in self.load_snapshot() + self.load_journal():
+            email = (entry.get("email") or "").lower()
+            if email in seen:
+                continue
+            seen.add(email)
+            entries.append(entry)
+        return entries
+
+    def append(self, entry: dict):
+        """O(1) write: one JSON line appended to the journal"""
+        self.append_many([entry])
+
+    def append_many(self, entries: Iterable[dict]):
+        """Append several entries with a single write"""
+        data = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+        if not data:
+            return
+        self._ensure_directory()
+        with file_lock(self.snapshot_path):
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(data)
+                f.flush()
+
+    def rewrite(self, entries: List[dict]):
+        """Replace the snapshot with entries and empty the journal"""
+        with file_lock(self.snapshot_path):
+            self._rewrite_unlocked(entries)
+
+    def _rewrite_unlocked(self, entries: List[dict]):
+        self._ensure_directory()
+        atomic_write_json_unlocked(self.snapshot_path, entries)
+        # A crash before this truncate only leaves duplicates that load() skips
+        if os.path.exists(self.journal_path):
+            open(self.journal_path, 'w').close()
+
+    def pending_entries(self) -> int:
+        """Number of journal lines not yet folded into the snapshot"""
+        if not os.path.exists(self.journal_path):
+            return 0
+        with open(self.journal_path, 'rb') as f:
+            return sum(1 for line in f if line.strip())
+
+    def compact(self) -> int:
+        """Fold the journal into the snapshot, returning the entries folded"""
+        with file_lock(self.snapshot_path):
+            pending = self.pending_entries()
+            if pending == 0:
+                return 0
+            self._rewrite_unlocked(self._load_unlocked())
+        logger.info(f"🗜️ Compacted {pending} journal entries into {self.snapshot_path}")
+        return pending
+
+    def remove(self, emails: Iterable[str]) -> int:
+        """Drop entries by email, returning how many were removed"""
+        emails = set(emails)
+        with file_lock(self.snapshot_path):
+            entries = self._load_unlocked()
+            kept = [entry for entry in entries if (entry.get("email") or "").lower() not in emails]
+            if len(kept) != len(entries):
+                self._rewrite_unlocked(kept)
+        return len(entries) - len(kept)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.journal_path)
+
+    def _stat_key(self, path: str) -> tuple:
+        try:
+            stat = os.stat(path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return (None, None)
+
+    def count(self) -> int:
+        """Distinct entries (what load() returns), cached until either file changes"""
+        with file_lock(self.snapshot_path, exclusive=False):
+            key = self._stat_key(self.snapshot_path) + self._stat_key(self.journal_path)
+            if self._count_cache and self._count_cache[0] == key:
+                return self._count_cache[1]
+            count = len(self._load_unlocked())
+        self._count_cache = (key, count)
+        return count
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    base = os.path.dirname(os.path.abspath(__file__))
+    journal = WaitlistJournal(os.path.join(base, "waitlist.json"), os.path.join(base, "waitlist.jsonl"))
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    if command == "compact":
+        print(f"✅ Compacted {journal.compact()} journal entries")
+    else:
+        print(f"📄 {journal.count()} entries, {journal.pending_entries()} pending in journal")
@@ -0,0 +1,153 @@
+"""
+Group-commit writer for waitlist joins.
+
+Concurrent joins are queued to a single in-process writer, which collects
+everything that arrives within a short linger window (or until the batch
+is full) and flushes it with one storage call. Each caller awaits a
+future resolved with its own entry's result.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, List, Optional
+
+from latency_stats import latency_summary
+
+logger = logging.getLogger(__name__)
+
+# flush(items) must return one result per item, in order
+BatchFlusher = Callable[[List[Any]], Awaitable[List[Any]]]
+
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500)
+
+# Queue sentinel telling the writer task to exit
+_STOP = object()
+
+
+class WriteBatcher:
+    """Collects submitted items into batches and flushes them together"""
+
+    def __init__(self, flush: BatchFlusher, max_batch_size: int = 100, linger_ms: float = 5.0):
+        self._flush = flush
+        self.max_batch_size = max(1, max_batch_size)
+        self.linger_seconds = max(0.0, linger_ms) / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.batches_flushed = 0
+        self.items_flushed = 0
+        self.flush_errors = 0
+        self.max_batch_seen = 0
+        self._batch_size_histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self._batch_size_histogram["+Inf"] = 0
+        self._flush_latencies = deque(maxlen=1000)
+
+    def start(self):
+        """Start the writer task (called from lifespan, or lazily on submit)"""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush anything still queued, then stop the writer"""
+        if self._task is None:
+            return
+        self._queue.put_nowait(_STOP)
+        await self._task
+        self._task = None
+        pending = []
+        while not self._queue.empty():
+            queued = self._queue.get_nowait()
+            if queued is not _STOP:
+                pending.append(queued)
+        if pending:
+            await self._flush_batch(pending)
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its own flush result"""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            queued = await self._queue.get()
+            if queued is _STOP:
+                break
+            batch = [queued]
+            deadline = time.monotonic() + self.linger_seconds
+
+            # Linger briefly so concurrent joins share one flush
+            while len(batch) < self.max_batch_size:
+                if self._queue.empty():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        queued = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    queued = self._queue.get_nowait()
+                if queued is _STOP:
+                    stopping = True
+                    break
+                batch.append(queued)
+
+            await self._flush_batch(batch)
+
+    async def _flush_batch(self, batch: list):
+        items = [item for item, _ in batch]
+        start = time.perf_counter()
+        try:
+            results = await self._flush(items)
+            if len(results) != len(items):
+                raise RuntimeError(f"flush returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            self.flush_errors += 1
+            logger.error(f"❌ Batch flush of {len(items)} items failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._record(len(items), time.perf_counter() - start)
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _record(self, size: int, latency: float):
+        self.batches_flushed += 1
+        self.items_flushed += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+        self._flush_latencies.append(latency)
+        for bucket in BATCH_SIZE_BUCKETS:
+            if size <= bucket:
+                self._batch_size_histogram[bucket] += 1
+                break
+        else:
+            self._batch_size_histogram["+Inf"] += 1
+
+    def metrics(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "linger_ms": self.linger_seconds * 1000,
+            "queue_depth": self.queue_depth,
+            "batches_flushed": self.batches_flushed,
+            "items_flushed": self.items_flushed,
+            "flush_errors": self.flush_errors,
+            "avg_batch_size": round(self.items_flushed / self.batches_flushed, 2) if self.batches_flushed else 0,
+            "max_batch_seen": self.max_batch_seen,
+            "batch_size_histogram": {f"le_{bucket}": count for bucket, count in self._batch_size_histogram.items()},
+            "flush_latency_ms": latency_summary(self._flush_latencies),
+        }